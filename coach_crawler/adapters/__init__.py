@@ -0,0 +1,13 @@
+from .base import PlatformAdapter
+from .registry import adapter_for, detect_adapter, register_adapter, registered_adapters
+
+# Registration order is detection order
+from .sidearm import SidearmAdapter
+from .prestosports import PrestoSportsAdapter
+from .sportsengine import SportsEngineAdapter
+from .leagueapps import LeagueAppsAdapter
+
+__all__ = [
+    "PlatformAdapter", "SidearmAdapter", "PrestoSportsAdapter", "SportsEngineAdapter", "LeagueAppsAdapter",
+    "adapter_for", "detect_adapter", "register_adapter", "registered_adapters",
+]
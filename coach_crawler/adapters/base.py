@@ -0,0 +1,184 @@
+"""Common interface for platform adapters."""
+
+import re
+from urllib.parse import unquote, urlparse
+
+from coach_crawler.extractors.email_extractor import _is_excluded
+from coach_crawler.extractors.page_classifier import PageClassifier
+from coach_crawler.utils.domain_budget import match_domain
+
+_MAILTO_RE = re.compile(r'^mailto:([^?]+)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_classifier = PageClassifier()
+
+
+def clean_text(value: str | None) -> str | None:
+    """Collapse whitespace; None for blank strings."""
+    if not value:
+        return None
+    value = _WHITESPACE_RE.sub(" ", value).strip()
+    return value or None
+
+
+def email_from_href(href: str | None) -> str | None:
+    match = _MAILTO_RE.match((href or "").strip())
+    if not match:
+        return None
+    email = unquote(match.group(1)).strip().lower()
+    return None if not email or "@" not in email or _is_excluded(email) else email
+
+
+def site_root(url: str) -> str:
+    parts = urlparse(url)
+    return f"{parts.scheme or 'https'}://{parts.netloc}"
+
+
+def first_text(selector, query: str) -> str | None:
+    """First non-blank text matched by `query` (CSS) under `selector`."""
+    for text in selector.css(query).getall():
+        text = clean_text(text)
+        if text:
+            return text
+    return None
+
+
+def first_email(selector) -> str | None:
+    for href in selector.css("a[href^='mailto:'], a[href^='MAILTO:']").xpath("@href").getall():
+        email = email_from_href(href)
+        if email:
+            return email
+    return None
+
+
+def unique_by_email(records) -> list[dict]:
+    by_email = {}
+    for record in records:
+        by_email.setdefault(record["email"], record)
+    return list(by_email.values())
+
+
+def staff_record(email: str, name: str | None, title: str | None, sport: str | None = None,
+                 confidence: float = 0.95, method: str = "adapter") -> dict:
+    """A contact in the shape EmailExtractor.extract_with_context returns."""
+    return {
+        "email": email,
+        "confidence": confidence,
+        "source_method": method,
+        "context_name": clean_text(name),
+        "context_title": clean_text(title),
+        "context_sport": clean_text(sport),
+    }
+
+
+class PlatformAdapter:
+    """Browserless staff extraction for one site platform.
+
+    An adapter knows how to recognise its platform's pages, which static URLs
+    carry a site's staff list, and how to read contacts out of them. Records
+    have the EmailExtractor.extract_with_context shape (plus context_sport),
+    so BaseStaffSpider.contact_items turns them into CoachItems.
+    """
+
+    platform = ""
+    # Staff pages linked from a site's own pages look like this (regex on the URL)
+    link_pattern: str | None = None
+    # Pages to fetch per site
+    max_pages = 2
+    # Render a page once when its static HTML has no staff, even if it doesn't look like an app shell
+    render_when_empty = False
+    # wait_until_rendered selector for that render
+    render_selector: str | None = None
+    # Structural evidence a page is served by the platform. A site that merely
+    # links to the platform (a registration button, a footer credit) shows none.
+    # Hosts the platform serves sites from, matched against the page's own URL
+    hosts: tuple[str, ...] = ()
+    # Substrings of <meta name="generator"> content
+    generators: tuple[str, ...] = ()
+    # Substrings of the page's script and stylesheet URLs
+    asset_markers: tuple[str, ...] = ()
+    # CSS selector for markup only the platform's templates emit
+    markup: str | None = None
+
+    def detect(self, response) -> bool:
+        host = urlparse(response.url).netloc
+        if self.hosts and match_domain(host, self.hosts):
+            return True
+        if self.generators:
+            generator = " ".join(response.xpath("//meta[@name='generator']/@content").getall()).lower()
+            if any(marker in generator for marker in self.generators):
+                return True
+        if self.asset_markers:
+            assets = [url.lower() for url in response.xpath("//script/@src | //link/@href").getall()]
+            if any(marker in url for url in assets for marker in self.asset_markers):
+                return True
+        return bool(self.markup and response.css(self.markup))
+
+    def staff_urls(self, site_url: str) -> list[str]:
+        """Static pages to fetch for a site's staff when none of its pages has been seen, best first."""
+        return []
+
+    def staff_links(self, response) -> list[str]:
+        """Staff pages the site links to from `response` (usually its homepage), best first.
+
+        Empty when the page links to none; staff_urls are only guesses, so the
+        spider discovers the site's pages itself instead of fetching them.
+        """
+        host = urlparse(response.url).hostname
+        ranked = []
+        for candidate in _classifier.find_staff_directory_links(response):
+            if urlparse(candidate["url"]).hostname != host:
+                continue
+            score = candidate["score"]
+            if self.link_pattern and re.search(self.link_pattern, candidate["url"], re.IGNORECASE):
+                score += 1.0
+            ranked.append((score, candidate["url"]))
+        ranked.sort(key=lambda pair: -pair[0])
+        urls = [url for _, url in ranked]
+        return urls[:self.max_pages]
+
+    def parse(self, response) -> list[dict]:
+        return []
+
+# Headings of the group (sport, department) a card sits in
+CARD_GROUP = "ancestor::*[contains(@class, 'group') or contains(@class, 'category')][1]"
+GROUP_HEADING = "./h2//text() | ./h3//text() | ./header//text() | ./*[contains(@class, 'title')]//text()"
+
+
+def parse_staff_table(selector) -> list[dict]:
+    """Contacts from directory tables: one row per person, category rows naming the sport in between.
+
+    Name and title come from td[headers] columns when the table labels them,
+    otherwise from the first two cells.
+    """
+    records = []
+    group = None
+    for row in selector.css("table tr"):
+        cells = row.css("td, th")
+        email = first_email(row)
+        if email is None:
+            if len(cells) == 1 or row.css("[colspan]") or "category" in (row.attrib.get("class") or ""):
+                group = clean_text(" ".join(row.css("::text").getall())) or group
+            continue
+        name = first_text(row, "td[headers*='name'] ::text, th[headers*='name'] ::text, th[scope='row'] ::text")
+        title = first_text(row, "td[headers*='title'] ::text, td[headers*='position'] ::text")
+        if name is None and cells:
+            name = first_text(cells[0], "::text")
+        if title is None and len(cells) > 1:
+            title = first_text(cells[1], "::text")
+        records.append(staff_record(email, name, title, group))
+    return records
+
+
+def parse_person_cards(selector, cards: str, name: str, title: str) -> list[dict]:
+    """Contacts from person cards (`cards`), reading `name` and `title` text queries inside each."""
+    records = []
+    for card in selector.css(cards):
+        email = first_email(card)
+        if email is None:
+            continue
+        group = None
+        for container in card.xpath(CARD_GROUP):
+            group = next(filter(None, map(clean_text, container.xpath(GROUP_HEADING).getall())), None)
+        records.append(staff_record(email, first_text(card, name), first_text(card, title), group))
+    return records
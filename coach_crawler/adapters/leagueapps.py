@@ -0,0 +1,36 @@
+"""LeagueApps club sites without a browser.
+
+LeagueApps sites ({org}.leagueapps.com or a custom domain) are
+server-rendered; staff, board and contact pages are custom pages linked from
+the site navigation, listing people as staff cards or in tables.
+"""
+
+from coach_crawler.adapters.base import (
+    PlatformAdapter,
+    parse_person_cards,
+    parse_staff_table,
+    site_root,
+    unique_by_email,
+)
+from coach_crawler.adapters.registry import register_adapter
+
+STAFF_CARDS = "[class*='staff-card'], [class*='staff-member'], [class*='coach-card'], .team-member, .person"
+CARD_NAME = "h3 ::text, h4 ::text, [class*='name'] ::text, strong::text"
+CARD_TITLE = "[class*='title'] ::text, [class*='position'] ::text, [class*='role'] ::text, p::text"
+
+
+@register_adapter
+class LeagueAppsAdapter(PlatformAdapter):
+    platform = "leagueapps"
+    link_pattern = r"/(staff|coaches|board|contact|about)"
+    hosts = ("leagueapps.com",)
+    asset_markers = ("leagueapps.com", "leagueapps.io")
+
+    def staff_urls(self, site_url: str) -> list[str]:
+        root = site_root(site_url)
+        return [root + "/staff", root + "/contacts"]
+
+    def parse(self, response) -> list[dict]:
+        return unique_by_email(
+            parse_person_cards(response, STAFF_CARDS, CARD_NAME, CARD_TITLE) + parse_staff_table(response)
+        )
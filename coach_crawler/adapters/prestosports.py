@@ -0,0 +1,43 @@
+"""PrestoSports staff directories without a browser.
+
+PrestoSports sites keep the department directory at
+/information/directory/index (older sites: /staff-directory) as a plain
+table with sport category rows; coach pages use .roster-coach / .coach-info
+blocks. Both are server-rendered.
+"""
+
+from coach_crawler.adapters.base import (
+    PlatformAdapter,
+    parse_person_cards,
+    parse_staff_table,
+    site_root,
+    unique_by_email,
+)
+from coach_crawler.adapters.registry import register_adapter
+
+STAFF_CARDS = (
+    ".staff-list-item, .roster-coach, [class*='staff-member'], "
+    "[class*='coach-card'], .coach-info"
+)
+CARD_NAME = "h3 ::text, h4 ::text, .coach-name ::text, [class*='name'] ::text, strong::text"
+CARD_TITLE = "[class*='title'] ::text, [class*='position'] ::text, .coach-title::text, em::text"
+
+
+@register_adapter
+class PrestoSportsAdapter(PlatformAdapter):
+    platform = "prestosports"
+    link_pattern = r"/information/directory|/staff-directory|/directory/index"
+    render_when_empty = True
+    render_selector = STAFF_CARDS
+    hosts = ("prestosports.com",)
+    generators = ("prestosports",)
+    asset_markers = ("prestosports.com", "presto-sports")
+
+    def staff_urls(self, site_url: str) -> list[str]:
+        root = site_root(site_url)
+        return [root + "/information/directory/index", root + "/staff-directory"]
+
+    def parse(self, response) -> list[dict]:
+        return unique_by_email(
+            parse_staff_table(response) + parse_person_cards(response, STAFF_CARDS, CARD_NAME, CARD_TITLE)
+        )
@@ -0,0 +1,35 @@
+"""Registry of platform adapters.
+
+Adapters register under their platform name (the School.website_platform
+value) and are looked up by name, or by detection against a page a spider
+actually received. Detection tries adapters in registration order.
+"""
+
+from coach_crawler.adapters.base import PlatformAdapter
+
+_ADAPTERS: dict[str, PlatformAdapter] = {}
+
+
+def register_adapter(cls):
+    """Class decorator: register one instance of a PlatformAdapter subclass under its platform."""
+    if not cls.platform:
+        raise ValueError(f"{cls.__name__} has no platform name")
+    _ADAPTERS[cls.platform] = cls()
+    return cls
+
+
+def registered_adapters() -> list[PlatformAdapter]:
+    return list(_ADAPTERS.values())
+
+
+def adapter_for(platform: str | None) -> PlatformAdapter | None:
+    """The adapter for a School.website_platform / detect_platform value, if there is one."""
+    return _ADAPTERS.get(platform or "")
+
+
+def detect_adapter(response) -> PlatformAdapter | None:
+    """The first registered adapter that recognises `response`'s page."""
+    for adapter in _ADAPTERS.values():
+        if adapter.detect(response):
+            return adapter
+    return None
@@ -0,0 +1,44 @@
+"""SIDEARM Sports staff directories without a browser.
+
+SIDEARM serves the staff directory server-side in one of two layouts: the
+classic table (one row per person, td[headers] naming the column, category
+rows between sports) and the newer person cards. Both are in the static HTML
+the Vue front end hydrates, so a plain fetch is enough; only sites that ship
+an empty shell need the rendered fallback.
+"""
+
+from coach_crawler.adapters.base import (
+    PlatformAdapter,
+    parse_person_cards,
+    parse_staff_table,
+    site_root,
+    unique_by_email,
+)
+from coach_crawler.adapters.registry import register_adapter
+
+PERSON_CARDS = ".s-person-card, .staff-member, [class*='person-card'], [class*='staff-member']"
+CARD_NAME = (
+    ".s-person-details__personal-single-line::text, .s-person-details__name::text, "
+    "h3 ::text, h4 ::text, [class*='name'] ::text, .staff-name::text"
+)
+CARD_TITLE = ".s-person-details__position ::text, .s-person-details__title::text, [class*='title']::text, [class*='position']::text"
+
+
+@register_adapter
+class SidearmAdapter(PlatformAdapter):
+    platform = "sidearm"
+    link_pattern = r"/staff-directory"
+    max_pages = 1
+    render_when_empty = True
+    render_selector = PERSON_CARDS
+    hosts = ("sidearmsports.com",)
+    asset_markers = ("sidearmsports.com", "/sidearm-scripts/", "sidearmstats")
+    markup = ".s-person-card, [class*='sidearm-']"
+
+    def staff_urls(self, site_url: str) -> list[str]:
+        return [site_root(site_url) + "/staff-directory"]
+
+    def parse(self, response) -> list[dict]:
+        return unique_by_email(
+            parse_staff_table(response) + parse_person_cards(response, PERSON_CARDS, CARD_NAME, CARD_TITLE)
+        )
@@ -0,0 +1,39 @@
+"""SportsEngine (formerly Sport Ngin) club and league sites without a browser.
+
+SportsEngine pages live at /page/show/<id>-<slug>, so a site's staff, board
+and contacts pages are found through its own navigation rather than a fixed
+path. Contacts are placed with the site builder's contact element (name
+heading, title, mailto) or in plain tables; both are server-rendered.
+"""
+
+from coach_crawler.adapters.base import (
+    PlatformAdapter,
+    parse_person_cards,
+    parse_staff_table,
+    site_root,
+    unique_by_email,
+)
+from coach_crawler.adapters.registry import register_adapter
+
+CONTACT_CARDS = ".contactElement, [class*='contact-element'], [class*='contactCard'], .staffElement, .user_mini"
+CARD_NAME = "h3 ::text, .name ::text, [class*='name'] ::text, h4 ::text, strong::text"
+CARD_TITLE = "h6 ::text, .title ::text, [class*='title'] ::text, [class*='position'] ::text, em::text"
+
+
+@register_adapter
+class SportsEngineAdapter(PlatformAdapter):
+    platform = "sportsengine"
+    link_pattern = r"/page/show/\d+-[\w-]*(staff|contact|board|coach|officer|director|leadership)"
+    hosts = ("sportngin.com", "sportsengine.com")
+    generators = ("sportsengine", "sport ngin")
+    asset_markers = ("sportngin.com", "sportsengine.com", "ngin.com")
+    markup = "body.se-page"
+
+    def staff_urls(self, site_url: str) -> list[str]:
+        root = site_root(site_url)
+        return [root + "/staff", root + "/contacts"]
+
+    def parse(self, response) -> list[dict]:
+        return unique_by_email(
+            parse_person_cards(response, CONTACT_CARDS, CARD_NAME, CARD_TITLE) + parse_staff_table(response)
+        )
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import func
+
+from coach_crawler.models import SessionLocal, NegativeCacheEntry
+
+app = typer.Typer()
+console = Console()
+
+
+@app.command("show")
+def show(
+    kind: str = typer.Option(None, help="Filter by kind: nxdomain, refused, http_404, http_410"),
+    host: str = typer.Option(None, help="Filter by host"),
+    limit: int = typer.Option(50, help="Max entries to list"),
+):
+    """Show the negative cache of dead hosts and missing pages."""
+    session = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+
+        counts = (
+            session.query(NegativeCacheEntry.kind, func.count(NegativeCacheEntry.id))
+            .filter(NegativeCacheEntry.expires_at > now)
+            .group_by(NegativeCacheEntry.kind)
+            .all()
+        )
+        expired = session.query(func.count(NegativeCacheEntry.id)).filter(NegativeCacheEntry.expires_at <= now).scalar()
+
+        summary = Table(title="Negative Cache")
+        summary.add_column("Kind", style="cyan")
+        summary.add_column("Active", justify="right")
+        for entry_kind, count in counts:
+            summary.add_row(entry_kind, str(count))
+        summary.add_row("expired", str(expired))
+        console.print(summary)
+
+        query = session.query(NegativeCacheEntry).filter(NegativeCacheEntry.expires_at > now)
+        if kind:
+            query = query.filter(NegativeCacheEntry.kind == kind)
+        if host:
+            query = query.filter(NegativeCacheEntry.host == host)
+        entries = query.order_by(NegativeCacheEntry.expires_at.desc()).limit(limit).all()
+
+        if entries:
+            table = Table(title=f"Entries (latest {len(entries)})")
+            table.add_column("Key", style="cyan")
+            table.add_column("Kind")
+            table.add_column("Expires")
+            for entry in entries:
+                table.add_row(entry.key, entry.kind, entry.expires_at.strftime("%Y-%m-%d %H:%M"))
+            console.print(table)
+    finally:
+        session.close()
+
+
+@app.command("purge")
+def purge(
+    kind: str = typer.Option(None, help="Only purge this kind: nxdomain, refused, http_404, http_410"),
+    host: str = typer.Option(None, help="Only purge entries for this host"),
+    expired_only: bool = typer.Option(False, help="Only purge entries that have already expired"),
+):
+    """Delete negative cache entries so those hosts/URLs are retried."""
+    session = SessionLocal()
+    try:
+        query = session.query(NegativeCacheEntry)
+        if kind:
+            query = query.filter(NegativeCacheEntry.kind == kind)
+        if host:
+            query = query.filter(NegativeCacheEntry.host == host)
+        if expired_only:
+            query = query.filter(NegativeCacheEntry.expires_at <= datetime.now(timezone.utc))
+        removed = query.delete(synchronize_session=False)
+        session.commit()
+        console.print(f"[bold green]Purged {removed} negative cache entries[/bold green]")
+    finally:
+        session.close()
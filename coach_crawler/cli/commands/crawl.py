@@ -15,14 +15,14 @@ def extract(
     division: str = typer.Option(None, help="Division filter: NCAA_D1_FBS, NCAA_D2, etc."),
     state: str = typer.Option(None, help="State filter: 2-letter code"),
     limit: int = typer.Option(None, help="Max schools to crawl"),
+    refresh: bool = typer.Option(False, help="Recrawl already crawled schools picked by the recrawl planner"),
+    budget: int = typer.Option(None, help="Request budget for --refresh (default RECRAWL_DAILY_REQUESTS)"),
+    shards: int = typer.Option(1, help="Crawler processes to run, each on its own partition of the schools by domain"),
 ):
     """Run email extraction crawl."""
     import os
     os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coach_crawler.scrapy_project.settings")
 
-    settings = get_project_settings()
-    process = CrawlerProcess(settings)
-
     # Pick spider based on platform
     spider_map = {
         "sidearm": "sidearm_staff",
@@ -46,14 +46,51 @@ def extract(
         kwargs["limit"] = limit
     if sub_level:
         kwargs["sub_level"] = sub_level
+    if refresh:
+        kwargs["refresh"] = True
+        if budget:
+            kwargs["refresh_budget"] = budget
     kwargs["level"] = level
 
+    if shards > 1:
+        _extract_sharded(spider_name, kwargs, shards)
+        return
+
+    settings = get_project_settings()
+    process = CrawlerProcess(settings)
+
     console.print(f"[bold green]Starting {spider_name} spider...[/bold green]")
     process.crawl(spider_name, **kwargs)
     process.start()
     console.print("[bold green]Crawl complete.[/bold green]")
 
 
+def _extract_sharded(spider_name: str, kwargs: dict, shards: int):
+    """Run an extract as `shards` processes, tracked as one crawl job with a child job per shard."""
+    from coach_crawler.models import SessionLocal, CrawlJob
+    from coach_crawler.web.crawl_runner import run_sharded_spider
+
+    session = SessionLocal()
+    try:
+        job = CrawlJob(spider_name=spider_name, status="starting", config_snapshot={**kwargs, "shards": shards})
+        session.add(job)
+        session.commit()
+        crawl_id = job.id
+    finally:
+        session.close()
+
+    console.print(f"[bold green]Starting {spider_name} spider in {shards} shards (crawl {crawl_id})...[/bold green]")
+    run_sharded_spider(crawl_id, spider_name, kwargs, shards, web_settings=False)
+
+    session = SessionLocal()
+    try:
+        job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
+        console.print(f"[bold green]Crawl {job.status}: {job.urls_completed} of {job.urls_total} schools, "
+                      f"{job.coaches_found} coaches.[/bold green]")
+    finally:
+        session.close()
+
+
 @app.command("discover")
 def discover(
     level: str = typer.Option("college", help="Level: college, high_school, youth"),
@@ -62,14 +99,20 @@ def discover(
     state: str = typer.Option(None, help="State filter"),
     limit: int = typer.Option(None, help="Max schools"),
 ):
-    """Discover staff directory URLs from athletics homepages."""
+    """Discover homepages, staff directory URLs and platforms without extracting contacts.
+
+    Facts are written back to the schools table, so later extract runs go
+    straight to the known staff directory instead of guessing again.
+    """
     import os
     os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coach_crawler.scrapy_project.settings")
 
     settings = get_project_settings()
     process = CrawlerProcess(settings)
 
-    kwargs = {"level": level}
+    spider_name = {"high_school": "hs_staff", "youth": "youth_staff"}.get(level, "college_staff")
+
+    kwargs = {"level": level, "discover_only": True}
     if sub_level:
         kwargs["sub_level"] = sub_level
     if division:
@@ -80,11 +123,59 @@ def discover(
         kwargs["limit"] = limit
 
     console.print(f"[bold green]Starting directory discovery for {level}...[/bold green]")
-    process.crawl("college_staff", **kwargs)
+    process.crawl(spider_name, **kwargs)
     process.start()
     console.print("[bold green]Discovery complete.[/bold green]")
 
 
+@app.command("refresh-plan")
+def refresh_plan(
+    level: str = typer.Option(None, help="Level: college, high_school, youth"),
+    state: str = typer.Option(None, help="State filter"),
+    budget: int = typer.Option(None, help="Daily request budget (default RECRAWL_DAILY_REQUESTS)"),
+    show: int = typer.Option(25, help="Schools to list"),
+):
+    """Show which crawled schools a --refresh crawl would recrawl within the request budget."""
+    import os
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coach_crawler.scrapy_project.settings")
+
+    from rich.table import Table
+
+    from coach_crawler.models import SessionLocal, School
+    from coach_crawler.planning import load_recrawl_plan
+
+    budget = budget or get_project_settings().getint("RECRAWL_DAILY_REQUESTS")
+    session = SessionLocal()
+    try:
+        query = session.query(School)
+        if level:
+            query = query.filter(School.level == level)
+        if state:
+            query = query.filter(School.state == state)
+        plan = load_recrawl_plan(query, budget)
+
+        names = dict(
+            session.query(School.id, School.name).filter(School.id.in_([c.school_id for c in plan[:show]]))
+        )
+        table = Table(title=f"Recrawl plan: {len(plan)} schools, {sum(c.cost for c in plan):g} of {budget} requests")
+        table.add_column("School", style="cyan")
+        table.add_column("Days since crawl", justify="right")
+        table.add_column("Changes/day", justify="right")
+        table.add_column("Stale coaches", justify="right")
+        table.add_column("Requests", justify="right")
+        for candidate in plan[:show]:
+            table.add_row(
+                names.get(candidate.school_id, str(candidate.school_id)),
+                f"{candidate.age_days:.0f}",
+                f"{candidate.change_rate:.3f}",
+                f"{candidate.value:.1f}",
+                f"{candidate.cost:g}",
+            )
+        console.print(table)
+    finally:
+        session.close()
+
+
 @app.command("seed-discover")
 def seed_discover(
     source: str = typer.Argument(help="Source: maxpreps, state_athletic, us_club_soccer, aau, pop_warner, little_league, ymca, usa_swimming, sportsengine, leagueapps, usa_football, usssa, babe_ruth, us_youth_soccer, usa_hockey, usa_wrestling, us_lacrosse, pony_baseball, ayso, i9_sports, upward_sports, usa_volleyball, usatf"),
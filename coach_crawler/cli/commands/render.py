@@ -0,0 +1,49 @@
+import typer
+from rich.console import Console
+
+app = typer.Typer()
+console = Console()
+
+
+@app.command("serve")
+def serve(
+    workers: int = typer.Option(None, help="Worker processes (default: one per CPU)"),
+    contexts: int = typer.Option(4, help="Warm browser contexts per worker"),
+    pages_per_context: int = typer.Option(50, help="Pages rendered before a context is recycled"),
+    browser: str = typer.Option("chromium", help="Browser type: chromium, firefox, webkit"),
+    redis_url: str = typer.Option(None, help="Job queue Redis URL (default RENDER_FARM_REDIS_URL)"),
+):
+    """Run the render farm: long-lived browser workers that render pages for every crawl."""
+    import os
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coach_crawler.scrapy_project.settings")
+
+    from scrapy.utils.project import get_project_settings
+
+    from coach_crawler.render.farm import serve as serve_farm
+
+    redis_url = redis_url or get_project_settings().get("RENDER_FARM_REDIS_URL")
+    console.print(f"[bold green]Starting render farm on {redis_url}...[/bold green]")
+    serve_farm(redis_url, workers=workers, contexts=contexts, pages_per_context=pages_per_context, browser_type=browser)
+    console.print("[bold green]Render farm stopped.[/bold green]")
+
+
+@app.command("status")
+def status(
+    redis_url: str = typer.Option(None, help="Job queue Redis URL (default RENDER_FARM_REDIS_URL)"),
+):
+    """Show live render workers and queued jobs."""
+    import os
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coach_crawler.scrapy_project.settings")
+
+    from scrapy.utils.project import get_project_settings
+
+    from coach_crawler.render.queue import JOBS_KEY, RedisRenderQueue
+
+    redis_url = redis_url or get_project_settings().get("RENDER_FARM_REDIS_URL")
+    try:
+        queue = RedisRenderQueue.from_url(redis_url)
+    except Exception as e:
+        console.print(f"[red]Redis unavailable at {redis_url}: {e}[/red]")
+        raise typer.Exit(1)
+    console.print(f"Live workers: {queue.live_workers()}")
+    console.print(f"Queued jobs: {queue.client.llen(JOBS_KEY)}")
@@ -1,7 +1,9 @@
 import typer
 
+from coach_crawler.cli.commands.cache import app as cache_app
 from coach_crawler.cli.commands.crawl import app as crawl_app
 from coach_crawler.cli.commands.export import app as export_app
+from coach_crawler.cli.commands.render import app as render_app
 from coach_crawler.cli.commands.seed import app as seed_app
 from coach_crawler.cli.commands.status import app as status_app
 from coach_crawler.cli.commands.validate import app as validate_app
@@ -17,6 +19,8 @@ app.add_typer(export_app, name="export", help="Export collected data")
 app.add_typer(seed_app, name="seed", help="Populate seed data")
 app.add_typer(status_app, name="status", help="View crawl progress")
 app.add_typer(validate_app, name="validate", help="Validate collected data")
+app.add_typer(cache_app, name="cache", help="Inspect or purge the dead host/page cache")
+app.add_typer(render_app, name="render", help="Run the out-of-process render farm")
 
 
 @app.callback()
@@ -3,5 +3,9 @@ from .page_classifier import PageClassifier
 from .name_extractor import NameExtractor
 from .role_extractor import RoleExtractor
 from .sport_classifier import SportClassifier
+from .json_staff_extractor import JsonStaffExtractor
 
-__all__ = ["EmailExtractor", "email_hash", "PageClassifier", "NameExtractor", "RoleExtractor", "SportClassifier"]
+__all__ = [
+    "EmailExtractor", "email_hash", "PageClassifier", "NameExtractor", "RoleExtractor", "SportClassifier",
+    "JsonStaffExtractor",
+]
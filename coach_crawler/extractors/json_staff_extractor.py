@@ -0,0 +1,96 @@
+import re
+
+from .email_extractor import _is_excluded
+
+# Field names compared after lowercasing and dropping "_", "-" and spaces
+NAME_KEYS = ("name", "fullname", "displayname", "staffname", "personname")
+FIRST_NAME_KEYS = ("firstname", "first", "givenname")
+LAST_NAME_KEYS = ("lastname", "last", "surname", "familyname")
+TITLE_KEYS = ("title", "position", "jobtitle", "stafftitle", "positiontitle", "role")
+EMAIL_KEYS = ("email", "emailaddress", "mail", "contactemail")
+SPORT_KEYS = ("sport", "sportname", "sporttitle", "department", "category", "group")
+
+_EMAIL_RE = re.compile(r'^(?:mailto:)?([a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,})$', re.IGNORECASE)
+
+
+def _normalize_key(key) -> str:
+    return re.sub(r"[_\-\s]", "", str(key)).lower()
+
+
+def _first_text(fields: dict, keys) -> str | None:
+    for key in keys:
+        value = fields.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+        if isinstance(value, dict):
+            # e.g. {"sport": {"title": "Football"}}
+            nested = _first_text({_normalize_key(k): v for k, v in value.items()}, ("title", "name"))
+            if nested:
+                return nested
+    return None
+
+
+class JsonStaffExtractor:
+    """Extract staff contacts from a JSON payload, whatever its shape.
+
+    Staff directories that render client-side load their people from a data
+    call; the payload is walked for objects with an email field and a name.
+    Results have the shape EmailExtractor.extract_with_context returns, plus
+    context_sport when the record (or an enclosing group) names a sport.
+    """
+
+    def __init__(self, max_depth: int = 8):
+        self.max_depth = max_depth
+
+    def extract(self, payload) -> list[dict]:
+        results: dict[str, dict] = {}
+        self._walk(payload, 0, None, results)
+        return list(results.values())
+
+    def _walk(self, node, depth: int, group: str | None, results: dict):
+        if depth > self.max_depth:
+            return
+        if isinstance(node, list):
+            for child in node:
+                self._walk(child, depth + 1, group, results)
+            return
+        if not isinstance(node, dict):
+            return
+
+        fields = {_normalize_key(k): v for k, v in node.items()}
+        record = self._record(fields, group)
+        if record and record["email"] not in results:
+            results[record["email"]] = record
+
+        # Groups like {"title": "Football", "staff": [...]} label their members
+        label = group
+        if any(isinstance(v, list) for v in node.values()):
+            label = _first_text(fields, SPORT_KEYS + ("title", "name")) or group
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                self._walk(value, depth + 1, label, results)
+
+    @staticmethod
+    def _record(fields: dict, group: str | None) -> dict | None:
+        email = None
+        for key in EMAIL_KEYS:
+            value = fields.get(key)
+            match = _EMAIL_RE.match(value.strip()) if isinstance(value, str) else None
+            if match:
+                email = match.group(1).lower()
+                break
+        if not email or _is_excluded(email):
+            return None
+
+        name = _first_text(fields, NAME_KEYS)
+        if not name:
+            first, last = _first_text(fields, FIRST_NAME_KEYS), _first_text(fields, LAST_NAME_KEYS)
+            name = " ".join(part for part in (first, last) if part) or None
+        return {
+            "email": email,
+            "confidence": 0.95,
+            "source_method": "json",
+            "context_name": name,
+            "context_title": _first_text(fields, TITLE_KEYS),
+            "context_sport": _first_text(fields, SPORT_KEYS) or group,
+        }
@@ -92,6 +92,35 @@ class PageClassifier:
 
         return unique
 
+    def score_sitemap_url(self, url: str) -> float:
+        """Return 0.0-1.0 for how likely a bare URL (no link text) is a staff directory.
+
+        Paths ending in a staff pattern score highest; paths that merely contain
+        one (e.g. /staff/john-smith bio pages) score lower, and deep paths are
+        penalized.
+        """
+        path = urlparse(url).path.lower().rstrip("/")
+        score = 0.0
+        for pattern in STAFF_URL_PATTERNS:
+            if path.endswith(pattern):
+                score = 1.0
+                break
+            if pattern + "/" in path:
+                score = 0.5
+        if score:
+            score -= 0.1 * max(path.count("/") - 2, 0)
+        return max(score, 0.0)
+
+    def rank_sitemap_urls(self, urls, limit: int = 3) -> list[dict]:
+        """Score sitemap URLs and return the best `limit` as {url, score}, best first."""
+        scored = {}
+        for url in urls:
+            score = self.score_sitemap_url(url)
+            if score > 0:
+                scored[url] = max(score, scored.get(url, 0.0))
+        ranked = sorted(scored.items(), key=lambda x: (-x[1], len(x[0])))
+        return [{"url": url, "score": score} for url, score in ranked[:limit]]
+
     def is_staff_directory_page(self, response) -> float:
         """Return confidence 0.0-1.0 that this page IS a staff directory.
 
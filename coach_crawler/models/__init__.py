@@ -3,5 +3,7 @@ from .school import School
 from .coach import Coach
 from .crawl_url import CrawlUrl
 from .crawl_job import CrawlJob
+from .domain_profile import DomainProfile
+from .negative_cache import NegativeCacheEntry
 
-__all__ = ["Base", "engine", "SessionLocal", "get_session", "init_db", "School", "Coach", "CrawlUrl", "CrawlJob"]
+__all__ = ["Base", "engine", "SessionLocal", "get_session", "init_db", "School", "Coach", "CrawlUrl", "CrawlJob", "DomainProfile", "NegativeCacheEntry"]
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, Integer, DateTime, JSON, func
+from sqlalchemy import String, Integer, DateTime, JSON, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -19,6 +19,9 @@ class CrawlJob(Base):
     urls_failed: Mapped[int] = mapped_column(Integer, default=0)
     coaches_found: Mapped[int] = mapped_column(Integer, default=0)
     config_snapshot: Mapped[dict | None] = mapped_column(JSON)
+    # Sharded crawls: one child row per shard process, progress summed into the parent
+    parent_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("crawl_jobs.id"), index=True)
+    shard: Mapped[int | None] = mapped_column(Integer)
 
     def __repr__(self):
         return f"<CrawlJob {self.spider_name} ({self.status})>"
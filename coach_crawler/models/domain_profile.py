@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import String, Integer, Float, DateTime, JSON, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class DomainProfile(Base):
+    """Per-domain crawl behaviour learned across runs."""
+
+    __tablename__ = "domain_profiles"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    domain: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    concurrency: Mapped[float | None] = mapped_column(Float)  # learned AIMD concurrency limit, unset until learned
+    backoff_count: Mapped[int] = mapped_column(Integer, default=0)  # 429/503/timeouts seen over all runs
+    render_tier: Mapped[str | None] = mapped_column(String(10))  # static or render, see RenderTierMiddleware
+    render_seconds: Mapped[float | None] = mapped_column(Float)  # typical render completion time
+    staff_json: Mapped[dict | None] = mapped_column(JSON(none_as_null=True))  # {"page", "endpoint"}, see JsonCaptureMiddleware
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DomainProfile {self.domain} (concurrency={self.concurrency}, render_tier={self.render_tier})>"
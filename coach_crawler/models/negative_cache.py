@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import String, Integer, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class NegativeCacheEntry(Base):
+    """A host or URL known to be dead, skipped until the entry expires."""
+
+    __tablename__ = "negative_cache"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    key: Mapped[str] = mapped_column(String(1000), unique=True, nullable=False, index=True)  # hostname or full URL
+    host: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    kind: Mapped[str] = mapped_column(String(30), nullable=False, index=True)  # nxdomain, refused, http_404, http_410
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<NegativeCacheEntry {self.key} ({self.kind})>"
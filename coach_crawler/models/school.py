@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, Integer, DateTime, func
+from sqlalchemy import String, Integer, Float, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -24,6 +24,7 @@ class School(Base):
     organization_type: Mapped[str | None] = mapped_column(String(100))  # club_team, rec_league, academy, camp, ymca, pop_warner, little_league, aau
     crawl_status: Mapped[str] = mapped_column(String(30), default="pending", index=True)
     last_crawled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    change_rate: Mapped[float | None] = mapped_column(Float)  # EWMA of coach changes per day between crawls
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,11 @@
+from .dag import CrawlDag
+from .priority import expected_yield, request_priority, school_priority
+from .recrawl import RecrawlCandidate, load_recrawl_plan, plan_recrawl, staleness, update_change_rate
+from .shards import canonical_domain, is_aggregator_url, school_shard_key, shard_limit, shard_of
+
+__all__ = [
+    "CrawlDag",
+    "expected_yield", "request_priority", "school_priority",
+    "RecrawlCandidate", "load_recrawl_plan", "plan_recrawl", "staleness", "update_change_rate",
+    "canonical_domain", "is_aggregator_url", "school_shard_key", "shard_limit", "shard_of",
+]
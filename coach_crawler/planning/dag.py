@@ -0,0 +1,62 @@
+"""Dependency graph of crawl jobs for a full refresh.
+
+A job may start once every job it depends on has finished, successfully or
+not (a failed seed spider still leaves whatever it discovered in the schools
+table). Independent jobs run side by side up to a concurrency cap, so a
+refresh takes as long as its longest chain rather than the sum of its jobs.
+"""
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class CrawlDag:
+    """Jobs keyed by id, each with the ids it depends on; jobs start in the order they were added."""
+
+    def __init__(self):
+        self.depends_on: dict = {}
+        self.state: dict = {}
+
+    def add(self, key, depends_on=()):
+        if key in self.depends_on:
+            raise ValueError(f"Duplicate job {key!r}")
+        missing = [dep for dep in depends_on if dep not in self.depends_on]
+        if missing:
+            # Dependencies must be added first, which also rules out cycles
+            raise ValueError(f"Job {key!r} depends on unknown jobs {missing!r}")
+        self.depends_on[key] = tuple(depends_on)
+        self.state[key] = PENDING
+
+    def __len__(self):
+        return len(self.depends_on)
+
+    def ready(self) -> list:
+        """Pending jobs whose dependencies have all finished."""
+        return [
+            key for key, deps in self.depends_on.items()
+            if self.state[key] == PENDING and all(self.state[dep] in (DONE, FAILED) for dep in deps)
+        ]
+
+    def running(self) -> list:
+        return [key for key, state in self.state.items() if state == RUNNING]
+
+    def start(self, key):
+        if self.state[key] != PENDING:
+            raise ValueError(f"Job {key!r} is {self.state[key]}, not pending")
+        self.state[key] = RUNNING
+
+    def finish(self, key, ok: bool = True):
+        if self.state[key] != RUNNING:
+            raise ValueError(f"Job {key!r} is {self.state[key]}, not running")
+        self.state[key] = DONE if ok else FAILED
+
+    def next_jobs(self, max_running: int) -> list:
+        """Start and return as many ready jobs as the concurrency cap allows."""
+        free = max(max_running - len(self.running()), 0)
+        jobs = self.ready()[:free]
+        for key in jobs:
+            self.start(key)
+        return jobs
+
+    def finished(self) -> bool:
+        return all(state in (DONE, FAILED) for state in self.state.values())
+
@@ -0,0 +1,65 @@
+"""Expected-yield scoring of schools and Scrapy request priorities.
+
+A school's score is the number of coaches a crawl of it is expected to
+produce: how many it produced before (or a prior for its platform/level)
+times the chance the crawl finds the staff page at all. Scores are turned
+into Scrapy priorities so that, with limited time, the schools and pages
+most likely to yield many coaches are crawled first.
+"""
+
+import math
+
+# Typical coaches per staff directory when a school has no history yet
+PLATFORM_COACHES = {
+    "sidearm": 60.0,
+    "prestosports": 45.0,
+    "sportsengine": 12.0,
+    "leagueapps": 10.0,
+    "wix": 6.0,
+    "squarespace": 6.0,
+    "custom": 15.0,
+}
+LEVEL_COACHES = {"college": 40.0, "high_school": 15.0, "youth": 6.0}
+
+# Chance of reaching the staff page, by what is known about the site
+FIND_PROBABILITY = {"staff_directory": 0.9, "homepage": 0.6, "guessed": 0.2}
+FAILED_PENALTY = 0.5
+
+# Added to the school's priority for each kind of request within a school
+REQUEST_BONUS = {
+    "staff_directory": 20,  # known staff directory URL
+    "scored_link": 10,  # link or sitemap URL the page classifier scored
+    "homepage": 0,
+    "keyword_link": 0,
+    "suffix_probe": -10,  # blind /staff, /coaches... guesses
+}
+DEPTH_PENALTY = 5
+
+
+def expected_yield(level: str | None, platform: str | None = None, coaches_found: int = 0,
+                   has_staff_directory: bool = False, has_homepage: bool = False,
+                   crawl_status: str | None = None) -> float:
+    """Expected number of coaches a crawl of this school produces."""
+    if coaches_found:
+        coaches = float(coaches_found)
+    else:
+        coaches = PLATFORM_COACHES.get(platform or "", LEVEL_COACHES.get(level or "", 10.0))
+    if has_staff_directory:
+        p_find = FIND_PROBABILITY["staff_directory"]
+    elif has_homepage:
+        p_find = FIND_PROBABILITY["homepage"]
+    else:
+        p_find = FIND_PROBABILITY["guessed"]
+    if crawl_status == "failed":
+        p_find *= FAILED_PENALTY
+    return coaches * p_find
+
+
+def school_priority(expected: float) -> int:
+    """Scrapy priority for a school's requests; log-scaled so 150 vs 15 coaches is 40 vs 20."""
+    return int(round(10 * math.log2(1 + max(expected, 0.0))))
+
+
+def request_priority(school_prio: int, kind: str, depth: int = 0) -> int:
+    """Priority of one request: its school's priority, adjusted by request kind and link depth."""
+    return school_prio + REQUEST_BONUS.get(kind, 0) - DEPTH_PENALTY * depth
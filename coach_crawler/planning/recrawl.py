@@ -0,0 +1,103 @@
+"""Freshness-driven recrawl planning.
+
+Each crawled school has a change rate (coach changes per day), an EWMA of the
+changes observed between consecutive crawls. Modelling changes as a Poisson
+process, the chance a school's data is stale `age` days after its last crawl
+is 1 - exp(-rate * age). The planner greedily picks the schools with the most
+expected stale coaches per request until a daily request budget is spent.
+"""
+
+import math
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+
+from coach_crawler.models import Coach, School
+
+# Changes per day assumed for a school with no observed history
+DEFAULT_CHANGE_RATE = {"college": 1 / 60, "high_school": 1 / 90, "youth": 1 / 45}
+CHANGE_RATE_ALPHA = 0.3
+
+# Typical requests spent recrawling a school, by what is known about its site
+REQUEST_COST = {"staff_directory": 2.0, "homepage": 6.0}
+
+
+def update_change_rate(previous: float | None, changes: int, interval_days: float,
+                       alpha: float = CHANGE_RATE_ALPHA) -> float:
+    """Fold the changes seen over `interval_days` into the EWMA change rate."""
+    observed = changes / max(interval_days, 1.0)
+    if previous is None:
+        return observed
+    return alpha * observed + (1 - alpha) * previous
+
+
+def staleness(rate: float, age_days: float) -> float:
+    """Probability that at least one change happened in `age_days`."""
+    return 1.0 - math.exp(-max(rate, 0.0) * max(age_days, 0.0))
+
+
+def days_since(when: datetime | None, now: datetime) -> float:
+    if when is None:
+        return 0.0
+    if when.tzinfo is None:
+        # SQLite hands back naive datetimes; they are stored in UTC
+        when = when.replace(tzinfo=timezone.utc)
+    return (now - when).total_seconds() / 86400
+
+
+class RecrawlCandidate:
+    """One crawled school with what the planner needs to value and cost its recrawl."""
+
+    __slots__ = ("school_id", "value", "cost", "age_days", "change_rate")
+
+    def __init__(self, school_id: int, value: float, cost: float, age_days: float, change_rate: float):
+        self.school_id = school_id
+        self.value = value
+        self.cost = cost
+        self.age_days = age_days
+        self.change_rate = change_rate
+
+    def __repr__(self):
+        return f"<RecrawlCandidate school={self.school_id} value={self.value:.2f} cost={self.cost:g}>"
+
+
+def candidate_for(row, now: datetime) -> RecrawlCandidate:
+    """Value a school row: expected stale coaches (at least one) per expected request."""
+    rate = row.change_rate if row.change_rate is not None else DEFAULT_CHANGE_RATE.get(row.level, 1 / 60)
+    age = days_since(row.last_crawled_at, now)
+    cost = REQUEST_COST["staff_directory"] if row.staff_directory_url else REQUEST_COST["homepage"]
+    value = staleness(rate, age) * max(row.coaches or 0, 1)
+    return RecrawlCandidate(row.id, value, cost, age, rate)
+
+
+def plan_recrawl(candidates, daily_requests: int) -> list[RecrawlCandidate]:
+    """Greedy knapsack: best value per request first, skipping what no longer fits."""
+    plan = []
+    remaining = float(daily_requests)
+    for candidate in sorted(candidates, key=lambda c: (-c.value / c.cost, c.school_id)):
+        if candidate.value <= 0 or candidate.cost > remaining:
+            continue
+        plan.append(candidate)
+        remaining -= candidate.cost
+    return plan
+
+
+def load_recrawl_plan(query, daily_requests: int, now: datetime | None = None) -> list[RecrawlCandidate]:
+    """Plan the recrawl of the crawled schools in `query` within `daily_requests`."""
+    now = now or datetime.now(timezone.utc)
+    session = query.session
+    coach_counts = (
+        session.query(Coach.school_id, func.count(Coach.id).label("coaches"))
+        .group_by(Coach.school_id)
+        .subquery()
+    )
+    rows = (
+        query.filter(School.crawl_status == "crawled")
+        .order_by(None)
+        .outerjoin(coach_counts, coach_counts.c.school_id == School.id)
+        .with_entities(
+            School.id, School.level, School.change_rate, School.last_crawled_at,
+            School.staff_directory_url, coach_counts.c.coaches,
+        )
+    )
+    return plan_recrawl((candidate_for(row, now) for row in rows), daily_requests)
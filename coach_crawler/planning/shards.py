@@ -0,0 +1,54 @@
+"""Partition schools across crawler processes by the domain they are crawled on.
+
+A sharded extract runs one crawler process per shard. Every school whose
+site lives on the same domain lands in the same shard, so a domain's
+per-process politeness (download slots, AIMD concurrency, circuit breaker)
+is only ever spent by one process. Subdomains of a shared platform listed in
+DOMAIN_RATE_LIMITS (club.leagueapps.com, ...) fold into that platform domain.
+Directory sites a school was seeded from (MaxPreps) are never crawled for
+its staff, so they do not count as the school's site.
+"""
+
+import hashlib
+
+from coach_crawler.utils.domain_budget import match_domain
+from coach_crawler.utils.url_utils import normalize_url
+
+# Hosts of directory listings schools were seeded from, not of the schools' own sites
+AGGREGATOR_DOMAINS = ("maxpreps.com",)
+
+
+def canonical_domain(url: str, shared_domains=()) -> str:
+    """Host `url` is crawled on, without "www." or port; a shared platform's subdomains map to the platform."""
+    host = normalize_url(url).partition("://")[2].split("/")[0].split(":")[0]
+    return match_domain(host, shared_domains) or host
+
+
+def is_aggregator_url(url: str) -> bool:
+    """Whether `url` is a school's listing on a directory site rather than its own site."""
+    return match_domain(canonical_domain(url), AGGREGATOR_DOMAINS) is not None
+
+
+def school_shard_key(staff_directory_url: str | None, athletics_url: str | None, slug: str,
+                     shared_domains=()) -> str:
+    """What a school is partitioned on: the domain of the site it is crawled on, or its slug.
+
+    Schools without a URL of their own (none, or only a MaxPreps listing) are
+    crawled on domains guessed from their name, so the slug keeps their
+    probes in one shard as well.
+    """
+    url = staff_directory_url or (athletics_url if athletics_url and not is_aggregator_url(athletics_url) else None)
+    return canonical_domain(url, shared_domains) if url else slug
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Stable shard index for `key`; Python's hash() is salted per process, so use a digest."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def shard_limit(limit: int | None, shard: int, shards: int) -> int | None:
+    """This shard's part of an overall school limit; the parts add up to `limit`."""
+    if not limit:
+        return None
+    return limit // shards + (1 if shard < limit % shards else 0)
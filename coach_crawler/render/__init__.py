@@ -0,0 +1,4 @@
+from .queue import LocalRenderQueue, RedisRenderQueue, make_job
+from .worker import ContextPool, RenderWorker
+
+__all__ = ["LocalRenderQueue", "RedisRenderQueue", "make_job", "ContextPool", "RenderWorker"]
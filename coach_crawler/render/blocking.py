@@ -0,0 +1,78 @@
+"""Resource blocking for rendered pages.
+
+Staff extraction only needs the DOM, so a rendered page's images, media,
+fonts, stylesheets and third-party trackers are aborted through page.route.
+Per-platform allowlists keep the hosts whose scripts or data calls inject the
+staff list. Counts of what was blocked are kept on the request so the crawl
+stats show the saving.
+"""
+
+from urllib.parse import urlparse
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet", "imageset", "texttrack"})
+
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+    "googleadservices.com", "adservice.google.com", "facebook.net", "connect.facebook.net",
+    "hotjar.com", "segment.io", "segment.com", "newrelic.com", "nr-data.net", "quantserve.com",
+    "scorecardresearch.com", "adsrvr.org", "amazon-adsystem.com", "taboola.com", "outbrain.com",
+    "criteo.com", "krxd.net", "chartbeat.com", "twitter.com", "platform.twitter.com", "tiktok.com",
+)
+
+# Hosts never blocked on a platform's sites: they serve the scripts and data calls that render staff
+PLATFORM_ALLOWLIST = {
+    "sidearm": ("sidearmsports.com", "sidearmdev.com", "sidearmstats.com"),
+    "prestosports": ("prestosports.com", "presto-sports.com"),
+    "sportsengine": ("sportngin.com", "sportsengine.com", "ngin.com"),
+    "leagueapps": ("leagueapps.com", "leagueapps.io"),
+    "wix": ("wixstatic.com", "parastorage.com", "wix.com"),
+    "squarespace": ("squarespace.com", "sqspcdn.com"),
+}
+
+# Context options for rendering: no service workers (they bypass page.route) and a modest viewport
+LEAN_CONTEXT_OPTIONS = {
+    "service_workers": "block",
+    "viewport": {"width": 1280, "height": 900},
+}
+
+REASON_RESOURCE_TYPE = "resource_type"
+REASON_TRACKER = "tracker"
+
+
+def _host_matches(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def block_reason(resource_type: str, url: str, platform: str | None = None) -> str | None:
+    """Why a page subrequest should be aborted, or None to let it through."""
+    host = (urlparse(url).hostname or "").lower()
+    if platform and _host_matches(host, PLATFORM_ALLOWLIST.get(platform, ())):
+        return None
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return REASON_RESOURCE_TYPE
+    if _host_matches(host, TRACKER_HOSTS):
+        return REASON_TRACKER
+    return None
+
+
+async def install_blocking(page, platform: str | None, counts: dict):
+    """Route every subrequest of `page` through block_reason, tallying into `counts`."""
+
+    async def handle(route, request):
+        reason = block_reason(request.resource_type, request.url, platform)
+        if reason is None:
+            counts["allowed"] = counts.get("allowed", 0) + 1
+            await route.fallback()
+            return
+        key = f"blocked/{request.resource_type if reason == REASON_RESOURCE_TYPE else reason}"
+        counts[key] = counts.get(key, 0) + 1
+        await route.abort()
+
+    await page.route("**/*", handle)
+
+
+async def block_resources(page, request):
+    """scrapy-playwright page init callback; see ResourceBlockingMiddleware."""
+    settings = request.meta.get("resource_blocking")
+    if settings is not None:
+        await install_blocking(page, settings.get("platform"), settings.setdefault("counts", {}))
@@ -0,0 +1,76 @@
+"""Capture the JSON data calls a rendered page makes.
+
+Client-side staff directories (SIDEARM's Vue pages, SportsEngine) fetch their
+people as JSON and then build the DOM from it. Recording those XHR/fetch
+responses lets the staff list be read from the payload itself, and the
+endpoint that served it can be fetched directly on later crawls.
+"""
+
+import asyncio
+import json
+
+from coach_crawler.render.blocking import block_resources
+
+CAPTURE_RESOURCE_TYPES = frozenset({"xhr", "fetch"})
+
+# Bounds on what one page may record
+MAX_CAPTURED_RESPONSES = 20
+MAX_CAPTURED_BYTES = 2_000_000
+
+
+def is_json_candidate(resource_type: str, content_type: str, status: int) -> bool:
+    """Whether a page subresponse is a successful JSON data call."""
+    return resource_type in CAPTURE_RESOURCE_TYPES and status == 200 and "json" in (content_type or "").lower()
+
+
+async def _read_json(response, captured: list):
+    try:
+        body = await response.body()
+    except Exception:
+        # Page closed or the body was evicted; nothing to keep
+        return
+    if len(body) > MAX_CAPTURED_BYTES:
+        return
+    try:
+        captured.append({"url": response.url, "data": json.loads(body)})
+    except ValueError:
+        pass
+
+
+def install_json_capture(page, captured: list, pending: set):
+    """Append {url, data} to `captured` for each JSON data call `page` receives.
+
+    Bodies are read in tasks tracked in `pending`; await drain_pending before
+    reading `captured` or closing the page.
+    """
+
+    def on_response(response):
+        if len(captured) + len(pending) >= MAX_CAPTURED_RESPONSES:
+            return
+        if not is_json_candidate(response.request.resource_type, response.headers.get("content-type", ""),
+                                 response.status):
+            return
+        task = asyncio.ensure_future(_read_json(response, captured))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    page.on("response", on_response)
+
+
+async def drain_pending(pending: set):
+    if pending:
+        await asyncio.gather(*list(pending), return_exceptions=True)
+
+
+async def collect_json(page, capture: dict) -> int:
+    """Last page method of a capturing render: wait for captured bodies to be read."""
+    await drain_pending(capture.get("pending", set()))
+    return len(capture.get("responses", ()))
+
+
+async def init_page(page, request):
+    """scrapy-playwright page init callback for ResourceBlockingMiddleware and JsonCaptureMiddleware."""
+    await block_resources(page, request)
+    capture = request.meta.get("json_capture")
+    if capture is not None:
+        install_json_capture(page, capture.setdefault("responses", []), capture.setdefault("pending", set()))
@@ -0,0 +1,99 @@
+"""Adaptive render completion: stop waiting as soon as a rendered page is usable.
+
+wait_until_rendered() races three signals and returns on the first:
+contacts or person cards in the DOM, network idle, or a DOM that has not
+changed for a short quiet window. It never raises; when nothing fires within
+the timeout the page is parsed as it is. RenderTimeouts learns per-domain
+timeouts from how long pages of that domain took to complete, so a slow
+host gets the time it needs and a fast one does not hold a render slot.
+"""
+
+import asyncio
+import time
+
+OUTCOME_CONTACTS = "contacts"
+OUTCOME_NETWORK_IDLE = "network_idle"
+OUTCOME_DOM_STABLE = "dom_stable"
+OUTCOME_TIMEOUT = "timeout"
+
+CONTACT_SELECTOR = "a[href^='mailto:']"
+
+# True once the DOM has not changed for `quietMs` after the document loaded
+DOM_STABLE_JS = """
+(quietMs) => {
+  if (!window.__ccLastChange) {
+    window.__ccLastChange = performance.now();
+    new MutationObserver(() => { window.__ccLastChange = performance.now(); })
+      .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    return false;
+  }
+  return document.readyState === "complete" && performance.now() - window.__ccLastChange > quietMs;
+}
+"""
+
+
+async def wait_until_rendered(page, selector: str | None = None, timeout: float = 10.0, quiet_ms: int = 750) -> dict:
+    """Wait for contacts/cards, network idle or a stable DOM; return the outcome and seconds waited.
+
+    Used as a scrapy-playwright PageMethod (the page is passed first), so the
+    result dict ends up on PageMethod.result for RenderCompletionMiddleware.
+    """
+    started = time.monotonic()
+    ms = timeout * 1000
+    contacts = CONTACT_SELECTOR if not selector else f"{CONTACT_SELECTOR}, {selector}"
+    waits = {
+        asyncio.ensure_future(page.wait_for_selector(contacts, state="attached", timeout=ms)): OUTCOME_CONTACTS,
+        asyncio.ensure_future(page.wait_for_load_state("networkidle", timeout=ms)): OUTCOME_NETWORK_IDLE,
+        asyncio.ensure_future(page.wait_for_function(DOM_STABLE_JS, arg=quiet_ms, polling=100, timeout=ms)):
+            OUTCOME_DOM_STABLE,
+    }
+    outcome = OUTCOME_TIMEOUT
+    pending = set(waits)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=max(timeout - (time.monotonic() - started), 0),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            finished = [task for task in done if not task.cancelled() and task.exception() is None]
+            if finished:
+                # Several may finish together; contacts is the most useful signal
+                outcomes = {waits[task] for task in finished}
+                outcome = OUTCOME_CONTACTS if OUTCOME_CONTACTS in outcomes else outcomes.pop()
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return {"outcome": outcome, "seconds": round(time.monotonic() - started, 3)}
+
+
+class RenderTimeouts:
+    """Per-domain render timeout from an EWMA of observed completion times.
+
+    The timeout is `headroom` times the typical completion time, clamped to
+    [min_timeout, max_timeout]. Timed-out renders count as max_timeout so a
+    host that never settles is not given ever shorter waits.
+    """
+
+    def __init__(self, default: float = 10.0, min_timeout: float = 3.0, max_timeout: float = 20.0,
+                 headroom: float = 2.0, alpha: float = 0.3, known: dict[str, float] | None = None):
+        self.default = default
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.headroom = headroom
+        self.alpha = alpha
+        self.typical: dict[str, float] = dict(known or {})
+        self.updated: set[str] = set()
+
+    def timeout(self, host: str) -> float:
+        typical = self.typical.get(host)
+        if typical is None:
+            return self.default
+        return min(max(typical * self.headroom, self.min_timeout), self.max_timeout)
+
+    def record(self, host: str, seconds: float, timed_out: bool = False):
+        observed = self.max_timeout if timed_out else seconds
+        previous = self.typical.get(host)
+        self.typical[host] = observed if previous is None else self.alpha * observed + (1 - self.alpha) * previous
+        self.updated.add(host)
@@ -0,0 +1,69 @@
+"""Render farm supervisor: run render workers in separate processes, one per core.
+
+Workers that exit (browser crash, out of memory) are restarted so the farm
+keeps its size; stopping the farm lets every worker finish its current pages.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(redis_url: str, options: dict):
+    from coach_crawler.render.queue import RedisRenderQueue
+    from coach_crawler.render.worker import RenderWorker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        await RenderWorker(RedisRenderQueue.from_url(redis_url), **options).run(stop)
+
+    asyncio.run(main())
+
+
+def serve(redis_url: str, workers: int | None = None, contexts: int = 4, pages_per_context: int = 50,
+          browser_type: str = "chromium", nav_timeout: float = 30.0, restart_delay: float = 2.0):
+    """Run `workers` render worker processes (default: one per CPU) until interrupted."""
+    workers = workers or multiprocessing.cpu_count()
+    options = {
+        "contexts": contexts,
+        "pages_per_context": pages_per_context,
+        "browser_type": browser_type,
+        "nav_timeout": nav_timeout,
+    }
+    ctx = multiprocessing.get_context("spawn")
+    procs: list = [None] * workers
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        for i, proc in enumerate(procs):
+            if proc is not None and proc.is_alive():
+                continue
+            if proc is not None:
+                logger.warning(f"Render worker {i} exited with code {proc.exitcode}, restarting")
+            procs[i] = ctx.Process(target=_worker_main, args=(redis_url, options), name=f"render-{i}", daemon=True)
+            procs[i].start()
+        time.sleep(restart_delay)
+
+    for proc in procs:
+        if proc is not None and proc.is_alive():
+            proc.terminate()
+    for proc in procs:
+        if proc is not None:
+            proc.join(timeout=30)
+    logger.info("Render farm stopped")
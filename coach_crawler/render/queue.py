@@ -0,0 +1,129 @@
+"""Job queue between crawler processes and the render farm.
+
+Crawlers push render jobs onto one Redis list; farm workers pop them, render
+the page and push the result onto a per-job reply list that the submitting
+crawler blocks on. Workers also keep a heartbeat key alive so crawlers can
+tell whether a farm is running before routing anything to it.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+
+JOBS_KEY = "coach_crawler:render:jobs"
+RESULT_PREFIX = "coach_crawler:render:result:"
+WORKER_PREFIX = "coach_crawler:render:worker:"
+
+# Results nobody collected (the crawler gave up) expire after this many seconds
+RESULT_TTL = 120
+
+# Page methods a job may ask the worker to run after navigation; wait_until_rendered
+# is coach_crawler.render.completion's adaptive wait rather than a Page method
+ALLOWED_PAGE_METHODS = (
+    "wait_for_selector", "wait_for_load_state", "wait_for_timeout", "wait_for_function", "wait_until_rendered",
+)
+
+
+def make_job(url: str, timeout: float, page_methods=(), headers: dict | None = None,
+             resource_blocking: dict | None = None, json_capture: bool = False) -> dict:
+    """A render job for `url`; `page_methods` are scrapy-playwright PageMethod objects.
+
+    `resource_blocking` ({"platform": ...}) makes the worker abort subresources
+    the way ResourceBlockingMiddleware does in-process; `json_capture` makes
+    it return the page's JSON data calls as JsonCaptureMiddleware records them.
+    """
+    methods = []
+    for m in page_methods:
+        name = getattr(m.method, "__name__", m.method) if hasattr(m, "method") else None
+        if name in ALLOWED_PAGE_METHODS:
+            methods.append([name, list(m.args), dict(m.kwargs)])
+    return {
+        "id": uuid.uuid4().hex,
+        "url": url,
+        "page_methods": methods,
+        "headers": headers or {},
+        "resource_blocking": {"platform": resource_blocking.get("platform")} if resource_blocking else None,
+        "json_capture": json_capture,
+        "deadline": time.time() + timeout,
+    }
+
+
+class RedisRenderQueue:
+    """Render jobs and results on Redis lists."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str, socket_timeout: float | None = None):
+        import redis
+        client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=0.5)
+        client.ping()
+        return cls(client)
+
+    def submit(self, job: dict) -> str:
+        self.client.lpush(JOBS_KEY, json.dumps(job))
+        return job["id"]
+
+    def wait_result(self, job_id: str, timeout: float) -> dict | None:
+        reply = self.client.blpop([RESULT_PREFIX + job_id], timeout=max(int(timeout), 1))
+        return json.loads(reply[1]) if reply else None
+
+    def pop_job(self, timeout: float = 1.0) -> dict | None:
+        reply = self.client.brpop([JOBS_KEY], timeout=max(int(timeout), 1))
+        return json.loads(reply[1]) if reply else None
+
+    def put_result(self, job_id: str, result: dict):
+        key = RESULT_PREFIX + job_id
+        pipe = self.client.pipeline()
+        pipe.rpush(key, json.dumps(result))
+        pipe.expire(key, RESULT_TTL)
+        pipe.execute()
+
+    def heartbeat(self, worker_id: str, ttl: int = 15):
+        self.client.set(WORKER_PREFIX + worker_id, int(time.time()), ex=ttl)
+
+    def live_workers(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=WORKER_PREFIX + "*", count=100))
+
+
+class LocalRenderQueue:
+    """In-process render queue, used for tests."""
+
+    def __init__(self):
+        self.jobs: queue.Queue = queue.Queue()
+        self.results: dict[str, queue.Queue] = {}
+        self.workers: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _results(self, job_id: str) -> queue.Queue:
+        with self._lock:
+            return self.results.setdefault(job_id, queue.Queue())
+
+    def submit(self, job: dict) -> str:
+        self.jobs.put(job)
+        return job["id"]
+
+    def wait_result(self, job_id: str, timeout: float) -> dict | None:
+        try:
+            return self._results(job_id).get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def pop_job(self, timeout: float = 1.0) -> dict | None:
+        try:
+            return self.jobs.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put_result(self, job_id: str, result: dict):
+        self._results(job_id).put(result)
+
+    def heartbeat(self, worker_id: str, ttl: int = 15):
+        self.workers[worker_id] = time.time() + ttl
+
+    def live_workers(self) -> int:
+        now = time.time()
+        return sum(1 for expires in self.workers.values() if expires > now)
@@ -0,0 +1,186 @@
+"""Render worker: one long-lived browser with a pool of warm contexts.
+
+Each worker process launches Chromium once and keeps `contexts` browser
+contexts open, rendering one job per context at a time. A context is closed
+and replaced after `pages_per_context` pages, which bounds the memory a
+long-running Chromium can accumulate.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from coach_crawler.render.blocking import LEAN_CONTEXT_OPTIONS, install_blocking
+from coach_crawler.render.capture import drain_pending, install_json_capture
+from coach_crawler.render.completion import wait_until_rendered
+from coach_crawler.render.queue import ALLOWED_PAGE_METHODS
+
+logger = logging.getLogger(__name__)
+
+
+class ContextSlot:
+    __slots__ = ("context", "pages")
+
+    def __init__(self, context):
+        self.context = context
+        self.pages = 0
+
+
+class ContextPool:
+    """Fixed number of browser contexts, each recycled after `pages_per_context` pages."""
+
+    def __init__(self, browser, size: int = 4, pages_per_context: int = 50, context_options: dict | None = None):
+        self.browser = browser
+        self.size = size
+        self.pages_per_context = pages_per_context
+        self.context_options = LEAN_CONTEXT_OPTIONS if context_options is None else context_options
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self.recycled = 0
+
+    async def start(self):
+        for _ in range(self.size):
+            self.idle.put_nowait(ContextSlot(await self.browser.new_context(**self.context_options)))
+
+    async def acquire(self) -> ContextSlot:
+        return await self.idle.get()
+
+    async def release(self, slot: ContextSlot):
+        slot.pages += 1
+        if slot.pages >= self.pages_per_context:
+            await slot.context.close()
+            slot = ContextSlot(await self.browser.new_context(**self.context_options))
+            self.recycled += 1
+        self.idle.put_nowait(slot)
+
+    async def close(self):
+        while not self.idle.empty():
+            await self.idle.get_nowait().context.close()
+
+
+async def render_page(context, job: dict, nav_timeout: float) -> dict:
+    """Render one job in `context` and return its result message."""
+    page = await context.new_page()
+    started = time.monotonic()
+    blocked: dict = {}
+    completion = None
+    captured: list = []
+    pending: set = set()
+    try:
+        if job.get("resource_blocking"):
+            await install_blocking(page, job["resource_blocking"].get("platform"), blocked)
+        if job.get("json_capture"):
+            install_json_capture(page, captured, pending)
+        if job.get("headers"):
+            await page.set_extra_http_headers(job["headers"])
+        response = await page.goto(job["url"], timeout=nav_timeout * 1000, wait_until="domcontentloaded")
+        for method, args, kwargs in job.get("page_methods", ()):
+            if method == "wait_until_rendered":
+                completion = await wait_until_rendered(page, *args, **kwargs)
+            elif method in ALLOWED_PAGE_METHODS:
+                await getattr(page, method)(*args, **kwargs)
+        html = await page.content()
+        await drain_pending(pending)
+        return {
+            "id": job["id"],
+            "url": page.url,
+            "status": response.status if response else 200,
+            "html": html,
+            "render_seconds": round(time.monotonic() - started, 3),
+            "blocked": blocked,
+            "completion": completion,
+            "captured_json": captured,
+        }
+    finally:
+        await page.close()
+
+
+class RenderWorker:
+    """Pop render jobs from the queue and render them on a warm context pool.
+
+    The worker's heartbeat is refreshed every `heartbeat_interval` seconds by a
+    task of its own, so it stays alive while every context is busy with long
+    renders; crawlers treat a farm with no heartbeat as gone.
+    """
+
+    def __init__(self, queue, contexts: int = 4, pages_per_context: int = 50, browser_type: str = "chromium",
+                 launch_options: dict | None = None, nav_timeout: float = 30.0, worker_id: str | None = None,
+                 heartbeat_interval: float = 5.0, heartbeat_ttl: int = 15):
+        self.queue = queue
+        self.contexts = contexts
+        self.pages_per_context = pages_per_context
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {"headless": True}
+        self.nav_timeout = nav_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_ttl = heartbeat_ttl
+        self.worker_id = worker_id or f"{os.uname().nodename}:{os.getpid()}"
+        self.rendered = 0
+        self.failed = 0
+        self.expired = 0
+
+    async def run(self, stop: asyncio.Event | None = None):
+        from playwright.async_api import async_playwright
+
+        stop = stop or asyncio.Event()
+        async with async_playwright() as playwright:
+            browser = await getattr(playwright, self.browser_type).launch(**self.launch_options)
+            pool = ContextPool(browser, self.contexts, self.pages_per_context)
+            await pool.start()
+            logger.info(f"Render worker {self.worker_id}: {self.contexts} warm contexts")
+            try:
+                await self.serve(pool, stop, is_alive=browser.is_connected)
+            finally:
+                await pool.close()
+                await browser.close()
+
+    async def serve(self, pool: ContextPool, stop: asyncio.Event, is_alive=lambda: True):
+        """Render jobs until `stop` is set or the browser dies; one job per free context."""
+        heartbeats = asyncio.create_task(self._heartbeat(stop))
+        try:
+            await self._serve(pool, stop, is_alive)
+        finally:
+            heartbeats.cancel()
+            await asyncio.gather(heartbeats, return_exceptions=True)
+
+    async def _heartbeat(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                await asyncio.to_thread(self.queue.heartbeat, self.worker_id, self.heartbeat_ttl)
+            except Exception as e:
+                # A missed beat is retried next interval; the TTL covers a few of them
+                logger.warning(f"Render worker {self.worker_id}: heartbeat failed: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), self.heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _serve(self, pool: ContextPool, stop: asyncio.Event, is_alive):
+        tasks: set[asyncio.Task] = set()
+        while not stop.is_set() and is_alive():
+            slot = await pool.acquire()
+            job = await asyncio.to_thread(self.queue.pop_job, 1.0)
+            if job is None:
+                pool.idle.put_nowait(slot)
+                continue
+            if job.get("deadline", float("inf")) < time.time():
+                # The crawler stopped waiting for this one
+                self.expired += 1
+                pool.idle.put_nowait(slot)
+                continue
+            task = asyncio.create_task(self._render(pool, slot, job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _render(self, pool: ContextPool, slot: ContextSlot, job: dict):
+        try:
+            result = await render_page(slot.context, job, self.nav_timeout)
+            self.rendered += 1
+        except Exception as e:
+            self.failed += 1
+            result = {"id": job["id"], "url": job["url"], "error": f"{type(e).__name__}: {e}"}
+        finally:
+            await pool.release(slot)
+        await asyncio.to_thread(self.queue.put_result, job["id"], result)
@@ -33,3 +33,13 @@ class SchoolItem(scrapy.Item):
     staff_directory_url = scrapy.Field()
     website_platform = scrapy.Field()
     organization_type = scrapy.Field()
+
+
+class SchoolFactsItem(scrapy.Item):
+    """Facts discovered about a school's website, written back to its School row."""
+
+    school_id = scrapy.Field()
+    athletics_url = scrapy.Field()
+    staff_directory_url = scrapy.Field()
+    staff_directory_contacts = scrapy.Field()  # strong contacts on staff_directory_url; the best page wins
+    website_platform = scrapy.Field()
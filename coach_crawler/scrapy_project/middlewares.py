@@ -1,8 +1,63 @@
+import asyncio
+import json
 import random
+import re
 import logging
+from collections import deque
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from scrapy import exceptions as scrapy_exceptions
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.http import HtmlResponse, Request
+from scrapy.spidermiddlewares.base import BaseSpiderMiddleware
+from scrapy_playwright.page import PageMethod
+from twisted.internet import defer
+from twisted.internet.error import (
+    ConnectError,
+    ConnectionRefusedError,
+    DNSLookupError,
+    TCPTimedOutError,
+    TimeoutError,
+)
+from twisted.web.client import ResponseNeverReceived
+from twisted.internet.task import deferLater
+
+from coach_crawler.extractors import JsonStaffExtractor
+from coach_crawler.render.capture import collect_json, init_page
+from coach_crawler.render.completion import OUTCOME_TIMEOUT, RenderTimeouts, wait_until_rendered
+from coach_crawler.render.queue import RedisRenderQueue, make_job
+from coach_crawler.utils.circuit_breaker import HALF_OPEN, CircuitBreaker
+from coach_crawler.utils.aimd import AIMDController, parse_retry_after
+from coach_crawler.utils.domain_budget import SharedDomainBudget, RedisSlotStore, LocalSlotStore
+from coach_crawler.utils.negative_cache import NegativeCache
+from coach_crawler.utils.render_tier import TIER_RENDER, TIER_STATIC, RenderTierPolicy, needs_js_render
+from coach_crawler.utils.simhash import hamming_distance, simhash
+from coach_crawler.utils.url_utils import site_key
 
 logger = logging.getLogger(__name__)
 
+
+def _scrapy_exceptions(*names):
+    # Scrapy >= 2.14 wraps Twisted download errors in its own exception types
+    return tuple(getattr(scrapy_exceptions, n) for n in names if hasattr(scrapy_exceptions, n))
+
+
+TIMEOUT_EXCEPTIONS = (
+    TimeoutError, TCPTimedOutError, defer.TimeoutError,
+) + _scrapy_exceptions("DownloadTimeoutError")
+
+DNS_EXCEPTIONS = (DNSLookupError,) + _scrapy_exceptions("CannotResolveHostError")
+
+REFUSED_EXCEPTIONS = (ConnectionRefusedError,) + _scrapy_exceptions("DownloadConnectionRefusedError")
+
+CONNECTION_FAILURE_EXCEPTIONS = TIMEOUT_EXCEPTIONS + DNS_EXCEPTIONS + REFUSED_EXCEPTIONS + (
+    ConnectError, ResponseNeverReceived,
+)
+
 USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -40,3 +95,967 @@ class ProxyRotationMiddleware:
             proxy = self.proxies[self.index % len(self.proxies)]
             request.meta["proxy"] = proxy
             self.index += 1
+
+
+async def _sleep(seconds: float):
+    from twisted.internet import reactor
+    await maybe_deferred_to_future(deferLater(reactor, seconds, lambda: None))
+
+
+class SharedDomainBudgetMiddleware:
+    """Space out requests per domain across every crawler process on this node.
+
+    Each request reserves a dispatch slot in the shared budget (Redis) and
+    waits until that slot comes up, so parallel crawls hitting the same host
+    split its rate limit instead of multiplying it. The Redis round trip runs
+    in a thread and the wait is a reactor delay, so neither blocks the crawl.
+    """
+
+    def __init__(self, budget, stats):
+        self.budget = budget
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("SHARED_BUDGET_ENABLED"):
+            raise NotConfigured
+
+        redis_url = settings.get("SHARED_BUDGET_REDIS_URL")
+        try:
+            store = RedisSlotStore.from_url(redis_url)
+            logger.info(f"Shared domain budget using Redis at {redis_url}")
+        except Exception as e:
+            logger.warning(f"Shared domain budget: Redis unavailable ({e}), using per-process budget")
+            store = LocalSlotStore()
+
+        budget = SharedDomainBudget(
+            store,
+            rate_limits=settings.getdict("DOMAIN_RATE_LIMITS"),
+            default_delay=settings.getfloat("DOWNLOAD_DELAY"),
+            default_concurrency=settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN"),
+        )
+        return cls(budget, crawler.stats)
+
+    async def process_request(self, request, spider):
+        wait = await maybe_deferred_to_future(self.budget.reserve_deferred(request.url))
+        if wait > 0:
+            self.stats.inc_value("shared_budget/delayed")
+            self.stats.inc_value("shared_budget/wait_seconds", round(wait, 3))
+            await _sleep(wait)
+
+
+class AdaptiveConcurrencyMiddleware:
+    """Per-domain AIMD concurrency control that honors Retry-After.
+
+    Healthy responses raise a domain's concurrency additively; 429/503 and
+    timeouts halve it. A Retry-After header blocks the domain until it expires
+    (requests longer than ADAPTIVE_CONCURRENCY_MAX_RETRY_AFTER are dropped).
+    Learned limits are stored in the domain_profiles table so the next crawl
+    starts where this one left off.
+    """
+
+    BACKOFF_STATUSES = (429, 503)
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.min_concurrency = settings.getfloat("ADAPTIVE_CONCURRENCY_MIN")
+        self.max_concurrency = settings.getfloat("ADAPTIVE_CONCURRENCY_MAX")
+        self.start_concurrency = settings.getfloat("CONCURRENT_REQUESTS_PER_DOMAIN")
+        self.target_latency = settings.getfloat("ADAPTIVE_CONCURRENCY_TARGET_LATENCY")
+        self.max_retry_after = settings.getfloat("ADAPTIVE_CONCURRENCY_MAX_RETRY_AFTER")
+        self.controllers: dict[str, AIMDController] = {}
+        self.learned: dict[str, float] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("ADAPTIVE_CONCURRENCY_ENABLED"):
+            raise NotConfigured
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        from coach_crawler.models import SessionLocal, DomainProfile
+
+        session = SessionLocal()
+        try:
+            for profile in session.query(DomainProfile).filter(DomainProfile.concurrency.isnot(None)):
+                self.learned[profile.domain] = profile.concurrency
+            logger.info(f"Adaptive concurrency: loaded {len(self.learned)} domain profiles")
+        except Exception:
+            logger.exception("Adaptive concurrency: failed to load domain profiles")
+        finally:
+            session.close()
+
+    def spider_closed(self, spider):
+        from coach_crawler.models import SessionLocal, DomainProfile
+
+        session = SessionLocal()
+        try:
+            existing = {
+                p.domain: p for p in
+                session.query(DomainProfile).filter(DomainProfile.domain.in_(list(self.controllers))).all()
+            }
+            for domain, controller in self.controllers.items():
+                profile = existing.get(domain)
+                if profile is None:
+                    profile = DomainProfile(domain=domain, backoff_count=0)
+                    session.add(profile)
+                profile.concurrency = controller.concurrency
+                profile.backoff_count = (profile.backoff_count or 0) + controller.backoffs
+            session.commit()
+            logger.info(f"Adaptive concurrency: saved {len(self.controllers)} domain profiles")
+        except Exception:
+            session.rollback()
+            logger.exception("Adaptive concurrency: failed to save domain profiles")
+        finally:
+            session.close()
+
+    def _controller(self, domain: str) -> AIMDController:
+        controller = self.controllers.get(domain)
+        if controller is None:
+            controller = AIMDController(
+                concurrency=self.learned.get(domain, self.start_concurrency),
+                min_concurrency=self.min_concurrency,
+                max_concurrency=self.max_concurrency,
+                target_latency=self.target_latency,
+            )
+            self.controllers[domain] = controller
+        return controller
+
+    def _apply(self, request, controller):
+        """Push the controller's limit onto the Scrapy downloader slot for this domain."""
+        key = request.meta.get("download_slot")
+        slot = self.crawler.engine.downloader.slots.get(key) if key else None
+        if slot is not None:
+            slot.concurrency = controller.limit
+
+    async def process_request(self, request, spider):
+        controller = self._controller(urlparse_cached(request).hostname or "")
+        wait = controller.wait_time()
+        if wait > self.max_retry_after:
+            self.stats.inc_value("adaptive_concurrency/dropped_retry_after")
+            raise IgnoreRequest(f"{request.url}: domain asked us to back off for {wait:.0f}s")
+        if wait > 0:
+            self.stats.inc_value("adaptive_concurrency/retry_after_waits")
+            await _sleep(wait)
+
+    def process_response(self, request, response, spider):
+        controller = self._controller(urlparse_cached(request).hostname or "")
+        if response.status in self.BACKOFF_STATUSES:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            controller.on_backoff(retry_after)
+            self.stats.inc_value(f"adaptive_concurrency/backoff/{response.status}")
+        else:
+            controller.on_success(request.meta.get("download_latency"))
+        self._apply(request, controller)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        if isinstance(exception, TIMEOUT_EXCEPTIONS):
+            controller = self._controller(urlparse_cached(request).hostname or "")
+            controller.on_backoff()
+            self._apply(request, controller)
+            self.stats.inc_value("adaptive_concurrency/backoff/timeout")
+
+
+class CircuitBreakerMiddleware:
+    """Stop sending requests to hosts that keep failing to connect.
+
+    After CIRCUIT_BREAKER_THRESHOLD consecutive connection failures or timeouts
+    a host's circuit opens: its remaining queued requests (suffix probes,
+    retries) are dropped as the scheduler hands them out, before they reach
+    the network. After CIRCUIT_BREAKER_COOLDOWN seconds one probe is let
+    through to see whether the host came back; if a later middleware ignores
+    it, the next request to the host probes instead, and a probe that never
+    comes back is given up on after CIRCUIT_BREAKER_PROBE_TIMEOUT seconds.
+    """
+
+    def __init__(self, breaker, stats):
+        self.breaker = breaker
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("CIRCUIT_BREAKER_ENABLED"):
+            raise NotConfigured
+        breaker = CircuitBreaker(
+            threshold=settings.getint("CIRCUIT_BREAKER_THRESHOLD"),
+            cooldown=settings.getfloat("CIRCUIT_BREAKER_COOLDOWN"),
+            probe_timeout=settings.getfloat("CIRCUIT_BREAKER_PROBE_TIMEOUT"),
+        )
+        return cls(breaker, crawler.stats)
+
+    def process_request(self, request, spider):
+        host = urlparse_cached(request).hostname or ""
+        if not self.breaker.allow(host):
+            self.stats.inc_value("circuit_breaker/requests_saved")
+            raise IgnoreRequest(f"Circuit open for {host}")
+        if self.breaker.state(host) == HALF_OPEN:
+            request.meta["circuit_probe"] = True
+
+    def process_response(self, request, response, spider):
+        request.meta.pop("circuit_probe", None)
+        self.breaker.record_success(urlparse_cached(request).hostname or "")
+        return response
+
+    def process_exception(self, request, exception, spider):
+        host = urlparse_cached(request).hostname or ""
+        probe = request.meta.pop("circuit_probe", False)
+        if not isinstance(exception, CONNECTION_FAILURE_EXCEPTIONS):
+            # Ignored by a later middleware (soft 404, duplicate, cancelled probe) or another error
+            if probe:
+                self.breaker.release_probe(host)
+            return None
+        if self.breaker.record_failure(host):
+            self.stats.inc_value("circuit_breaker/opened")
+            logger.info(f"Circuit breaker: opened for {host} after {type(exception).__name__}")
+        return None
+
+
+class NegativeCacheMiddleware:
+    """Skip hosts and URLs that failed in earlier runs, and remember new failures.
+
+    NXDOMAIN and connection-refused hosts, and URLs that returned 404/410, are
+    stored in the negative_cache table with an expiry (see NEGATIVE_CACHE_TTLS,
+    in days). Matching requests are dropped before any network or politeness
+    wait. Failures are recorded only once retries are exhausted, and written
+    back when the spider closes; entries the database still rejects are
+    counted in negative_cache/unsaved. Set `dont_negative_cache` in request
+    meta to bypass the cache.
+    """
+
+    def __init__(self, cache, stats):
+        self.cache = cache
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("NEGATIVE_CACHE_ENABLED"):
+            raise NotConfigured
+        ttls = {kind: timedelta(days=days) for kind, days in settings.getdict("NEGATIVE_CACHE_TTLS").items()}
+        middleware = cls(NegativeCache(ttls), crawler.stats)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        from coach_crawler.models import SessionLocal
+
+        session = SessionLocal()
+        try:
+            logger.info(f"Negative cache: loaded {self.cache.load(session)} entries")
+        except Exception:
+            logger.exception("Negative cache: failed to load entries")
+        finally:
+            session.close()
+
+    def spider_closed(self, spider):
+        from coach_crawler.models import SessionLocal
+
+        session = SessionLocal()
+        try:
+            logger.info(f"Negative cache: saved {self.cache.flush(session)} new entries")
+            if self.cache.pending:
+                self.stats.set_value("negative_cache/unsaved", self.cache.pending)
+                logger.warning(f"Negative cache: dropped {self.cache.pending} entries that could not be saved")
+        except Exception:
+            session.rollback()
+            logger.exception("Negative cache: failed to save entries")
+        finally:
+            session.close()
+
+    def process_request(self, request, spider):
+        if request.meta.get("dont_negative_cache"):
+            return None
+        kind = self.cache.lookup(request.url)
+        if kind:
+            self.stats.inc_value(f"negative_cache/skipped/{kind}")
+            raise IgnoreRequest(f"Known-bad ({kind}): {request.url}")
+
+    def process_response(self, request, response, spider):
+        if response.status in (404, 410) and not request.meta.get("dont_negative_cache"):
+            self.cache.add_url(response.url, f"http_{response.status}")
+            self.stats.inc_value(f"negative_cache/recorded/http_{response.status}")
+        return response
+
+    def process_exception(self, request, exception, spider):
+        if request.meta.get("dont_negative_cache"):
+            return None
+        host = urlparse_cached(request).hostname or ""
+        if isinstance(exception, DNS_EXCEPTIONS):
+            self.cache.add_host(host, "nxdomain")
+            self.stats.inc_value("negative_cache/recorded/nxdomain")
+        elif isinstance(exception, REFUSED_EXCEPTIONS):
+            self.cache.add_host(host, "refused")
+            self.stats.inc_value("negative_cache/recorded/refused")
+        return None
+
+
+class ProbeCancellationMiddleware:
+    """Drop outstanding domain probes once another probe for the same school has won."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats)
+
+    def process_request(self, request, spider):
+        group = request.meta.get("probe_group")
+        if group is None:
+            return None
+        state = getattr(spider, "probe_groups", {}).get(group)
+        if state and state["winner"]:
+            self.stats.inc_value("probe/cancelled")
+            raise IgnoreRequest(f"Probe superseded by {state['winner']}")
+
+
+class SchoolBudgetMiddleware:
+    """Enforce the spider's per-school budget (see SchoolBudget).
+
+    Requests carrying meta["school"] are counted against that school; once it
+    is out of requests or bytes, or a page has already yielded a full staff
+    list, its remaining requests are dropped.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("SCHOOL_BUDGET_ENABLED"):
+            raise NotConfigured
+        mw = cls(crawler.stats)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    @staticmethod
+    def _target(request, spider):
+        budget = getattr(spider, "school_budget", None)
+        school_id = (request.meta.get("school") or {}).get("id")
+        return (budget, school_id) if budget is not None and school_id else (None, None)
+
+    def process_request(self, request, spider):
+        budget, school_id = self._target(request, spider)
+        if budget is None:
+            return None
+        already_stopped = budget.stop_reason(school_id)
+        if budget.admit(school_id):
+            return None
+        reason = budget.stop_reason(school_id)
+        if not already_stopped:
+            self.stats.inc_value(f"school_budget/stopped/{reason}")
+            logger.info(f"School budget: school {school_id} stopped ({reason})")
+        self.stats.inc_value("school_budget/requests_saved")
+        raise IgnoreRequest(f"School {school_id} stopped: {reason}")
+
+    def process_response(self, request, response, spider):
+        budget, school_id = self._target(request, spider)
+        if budget is not None and budget.record_bytes(school_id, len(response.body)):
+            self.stats.inc_value("school_budget/stopped/byte_budget")
+            logger.info(f"School budget: school {school_id} stopped (byte_budget)")
+        return response
+
+    def spider_closed(self, spider):
+        budget = getattr(spider, "school_budget", None)
+        if budget is not None and budget.states:
+            reasons = ", ".join(f"{reason}={n}" for reason, n in budget.stop_reasons().most_common()) or "none"
+            logger.info(f"School budget: {len(budget.states)} schools crawled, stopped early: {reasons}")
+
+
+class SoftNotFoundMiddleware:
+    """Drop staff-page probes that just return the homepage or a "not found" template.
+
+    Many CMSs answer HTTP 200 for any path. For each host this keeps SimHash
+    fingerprints of the visible text of pages already fetched (homepage and
+    other non-probe pages), of 404/410 templates, and of earlier probes.
+    A response to a request marked meta["staff_probe"] that is within
+    SOFT_404_MAX_DISTANCE bits of one of them is dropped before extraction.
+
+    With SOFT_404_FINGERPRINT_PROBE on, the first staff probe to a host waits
+    for one request to a random path there, so the host's "not found" page
+    (served as 200, 404 or a redirect) is known before any probe is judged.
+    Other probes to the host wait for the same request.
+    """
+
+    MAILTO_RE = re.compile(rb"mailto:([^\"'?>\s]+)", re.IGNORECASE)
+
+    def __init__(self, stats, max_distance: int = 6, per_host: int = 32, crawler=None):
+        self.stats = stats
+        self.max_distance = max_distance
+        self.per_host = per_host
+        # Only set when hosts are actively fingerprinted; its engine downloads the random-path request
+        self.crawler = crawler
+        self.pages: dict[str, deque] = {}
+        self.templates: dict[str, set] = {}
+        self.fingerprinted: set[str] = set()
+        self._fingerprinting: dict[str, list] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("SOFT_404_ENABLED"):
+            raise NotConfigured
+        return cls(
+            crawler.stats,
+            max_distance=settings.getint("SOFT_404_MAX_DISTANCE", 6),
+            crawler=crawler if settings.getbool("SOFT_404_FINGERPRINT_PROBE") else None,
+        )
+
+    @staticmethod
+    def fingerprint(response) -> int:
+        text = response.xpath(
+            "//body//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]"
+        ).getall()
+        return simhash(" ".join(text))
+
+    def _matches(self, fp, fingerprints) -> bool:
+        return any(hamming_distance(fp, other) <= self.max_distance for other in fingerprints)
+
+    async def process_request(self, request, spider):
+        if self.crawler is None or not request.meta.get("staff_probe"):
+            return None
+        host = urlparse_cached(request).hostname or ""
+        if host in self.fingerprinted:
+            return None
+        waiters = self._fingerprinting.get(host)
+        if waiters is not None:
+            waiter = defer.Deferred()
+            waiters.append(waiter)
+            await maybe_deferred_to_future(waiter)
+            return None
+
+        self._fingerprinting[host] = []
+        try:
+            await self._fingerprint_host(request)
+        finally:
+            self.fingerprinted.add(host)
+            for waiter in self._fingerprinting.pop(host):
+                waiter.callback(None)
+        return None
+
+    async def _fingerprint_host(self, request):
+        parsed = urlparse_cached(request)
+        probe = Request(
+            f"{parsed.scheme}://{parsed.netloc}/{random.getrandbits(64):016x}",
+            meta={"soft404_fingerprint": True, "dont_retry": True, "dont_negative_cache": True},
+            priority=request.priority,
+            dont_filter=True,
+        )
+        self.stats.inc_value("soft404/fingerprint_probes")
+        try:
+            await self.crawler.engine.download_async(probe)
+        except Exception as e:
+            self.stats.inc_value("soft404/fingerprint_failed")
+            logger.debug(f"Soft 404: could not fingerprint {parsed.netloc}: {e}")
+
+    def process_response(self, request, response, spider):
+        if not isinstance(response, HtmlResponse):
+            return response
+        host = urlparse_cached(response).hostname or ""
+
+        if response.status in (404, 410):
+            self.templates.setdefault(host, set()).add(self.fingerprint(response))
+            return response
+        if response.status != 200:
+            return response
+        if request.meta.get("soft404_fingerprint"):
+            # A random path answered 200: this is the host's "not found" page
+            self.templates.setdefault(host, set()).add(self.fingerprint(response))
+            return response
+
+        fp = self.fingerprint(response)
+        seen = self.pages.setdefault(host, deque(maxlen=self.per_host))
+        if request.meta.get("staff_probe"):
+            if self._matches(fp, self.templates.get(host, ())):
+                self._drop(response, "not_found_template")
+            if self._matches(fp, seen):
+                self._drop(response, "duplicate_page")
+        seen.append(fp)
+        return response
+
+    def _drop(self, response, reason):
+        self.stats.inc_value(f"soft404/dropped/{reason}")
+        self.stats.inc_value("soft404/bytes_skipped", len(response.body))
+        # Contacts that would have been re-extracted and deduped by the pipelines
+        self.stats.inc_value("soft404/emails_skipped", len(set(self.MAILTO_RE.findall(response.body))))
+        raise IgnoreRequest(f"Soft 404 ({reason}): {response.url}")
+
+
+class CanonicalDedupMiddleware:
+    """Fetch and parse each canonical page at most once per school, even with dont_filter.
+
+    Guessed URLs ({slug}.org, www.{slug}.org, http/https...) often redirect
+    to the same final page. Once a page has been fetched for a school, the
+    canonical form (see normalize_url) of its final URL and of every URL
+    that redirected to it is remembered, keyed with the school id. Later
+    requests for any of them are dropped, and so are responses that
+    redirected onto a page already fetched.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.seen: set[tuple[str, int]] = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CANONICAL_DEDUP_ENABLED"):
+            raise NotConfigured
+        return cls(crawler.stats)
+
+    @staticmethod
+    def _school_id(request):
+        return (request.meta.get("school") or {}).get("id")
+
+    def process_request(self, request, spider):
+        school_id = self._school_id(request)
+        if school_id and (site_key(request.url), school_id) in self.seen:
+            self.stats.inc_value("canonical_dedup/requests_skipped")
+            raise IgnoreRequest(f"Already fetched for school {school_id}: {request.url}")
+        return None
+
+    def process_response(self, request, response, spider):
+        school_id = self._school_id(request)
+        if not school_id or not 200 <= response.status < 300:
+            return response
+        key = (site_key(response.url), school_id)
+        if key in self.seen:
+            self.stats.inc_value("canonical_dedup/responses_dropped")
+            raise IgnoreRequest(f"Redirected onto a page already fetched for school {school_id}: {response.url}")
+        self.seen.add(key)
+        for url in request.meta.get("redirect_urls", []):
+            self.seen.add((site_key(url), school_id))
+        return response
+
+
+def _load_domain_values(column: str) -> dict:
+    """Non-null values of one domain_profiles column, by domain."""
+    from coach_crawler.models import SessionLocal, DomainProfile
+
+    session = SessionLocal()
+    try:
+        field = getattr(DomainProfile, column)
+        return dict(session.query(DomainProfile.domain, field).filter(field.isnot(None)))
+    except Exception:
+        logger.exception(f"Failed to load domain_profiles.{column}")
+        return {}
+    finally:
+        session.close()
+
+
+def _save_domain_values(column: str, values: dict):
+    """Write one domain_profiles column for each domain in `values`, creating missing profiles."""
+    from coach_crawler.models import SessionLocal, DomainProfile
+
+    session = SessionLocal()
+    try:
+        existing = {
+            p.domain: p for p in
+            session.query(DomainProfile).filter(DomainProfile.domain.in_(list(values))).all()
+        }
+        for domain, value in values.items():
+            profile = existing.get(domain)
+            if profile is None:
+                # concurrency stays unset so AdaptiveConcurrency keeps its own default
+                profile = DomainProfile(domain=domain, backoff_count=0)
+                session.add(profile)
+            setattr(profile, column, value)
+        session.commit()
+    except Exception:
+        session.rollback()
+        logger.exception(f"Failed to save domain_profiles.{column}")
+    finally:
+        session.close()
+
+
+def _page_key(url: str) -> str:
+    return url.split("#", 1)[0].rstrip("/")
+
+
+class JsonCaptureMiddleware:
+    """Read staff from the JSON a rendered page loads, and fetch that JSON directly next time.
+
+    Rendered requests record the XHR/fetch JSON their page receives
+    (coach_crawler.render.capture). Payloads JsonStaffExtractor finds at least
+    `min_records` contacts in are put on meta["captured_json"] for the spider,
+    and the endpoint is remembered with its page in domain_profiles.staff_json.
+    A later parse_staff_directory request for that page goes to the endpoint
+    as a plain HTTP fetch, before RenderTierMiddleware considers it; when the
+    endpoint stops returning staff it is forgotten and the page is rendered
+    as before. Follow-up requests start without this state (see
+    RenderStateResetMiddleware).
+    """
+
+    def __init__(self, stats, min_records: int = 2):
+        self.stats = stats
+        self.min_records = min_records
+        self.extractor = JsonStaffExtractor()
+        self.endpoints: dict[str, dict] = {}
+        self.updated: dict[str, dict | None] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("JSON_CAPTURE_ENABLED"):
+            raise NotConfigured
+        middleware = cls(crawler.stats, min_records=crawler.settings.getint("JSON_CAPTURE_MIN_RECORDS", 2))
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.endpoints = _load_domain_values("staff_json")
+        logger.info(f"JSON capture: loaded {len(self.endpoints)} staff endpoints")
+
+    def spider_closed(self, spider):
+        if self.updated:
+            _save_domain_values("staff_json", self.updated)
+            logger.info(f"JSON capture: saved {len(self.updated)} staff endpoints")
+
+    def _remember(self, host: str, entry: dict | None):
+        if entry is None:
+            self.endpoints.pop(host, None)
+        else:
+            self.endpoints[host] = entry
+        self.updated[host] = entry
+
+    def _staff_payloads(self, responses) -> list[dict]:
+        found = []
+        for captured in responses:
+            records = self.extractor.extract(captured["data"])
+            if len(records) >= self.min_records:
+                found.append({"url": captured["url"], "records": records})
+        return found
+
+    def process_request(self, request, spider):
+        meta = request.meta
+        if not meta.get("playwright") or "json_capture" in meta or "staff_json" in meta:
+            return None
+        known = self.endpoints.get(urlparse_cached(request).hostname or "")
+        # Only callbacks that read meta["captured_json"] in place of the DOM can take the endpoint's answer
+        staff_page = getattr(request.callback, "__name__", None) == "parse_staff_directory"
+        if known and staff_page and _page_key(known["page"]) == _page_key(request.url):
+            self.stats.inc_value("json_capture/direct/requests")
+            return request.replace(url=known["endpoint"], meta={**meta, "playwright": False, "staff_json": known},
+                                   dont_filter=True)
+        meta["json_capture"] = {}
+        meta["playwright_page_methods"] = [
+            *meta.get("playwright_page_methods", ()), PageMethod(collect_json, meta["json_capture"]),
+        ]
+        meta.setdefault("playwright_page_init_callback", init_page)
+        return None
+
+    def process_response(self, request, response, spider):
+        known = request.meta.get("staff_json")
+        if known is not None:
+            return self._direct_response(request, response, known)
+        capture = request.meta.get("json_capture")
+        if capture is None or not request.meta.get("playwright"):
+            return response
+        capture.pop("pending", None)
+        found = self._staff_payloads(capture.pop("responses", []))
+        if not found:
+            return response
+        request.meta["captured_json"] = found
+        best = max(found, key=lambda f: len(f["records"]))
+        entry = {"page": request.url, "endpoint": best["url"]}
+        host = urlparse_cached(request).hostname or ""
+        if self.endpoints.get(host) != entry:
+            self._remember(host, entry)
+        self.stats.inc_value("json_capture/pages")
+        self.stats.inc_value("json_capture/records", sum(len(f["records"]) for f in found))
+        return response
+
+    def _direct_response(self, request, response, known: dict):
+        records = []
+        if response.status == 200:
+            try:
+                records = self.extractor.extract(json.loads(response.body))
+            except ValueError:
+                pass
+        if len(records) >= self.min_records:
+            request.meta["captured_json"] = [{"url": response.url, "records": records}]
+            self.stats.inc_value("json_capture/direct/ok")
+            return response
+        # The endpoint moved or stopped serving the staff list: render the page again
+        self.stats.inc_value("json_capture/direct/stale")
+        self._remember(urlparse(known["page"]).hostname or "", None)
+        meta = {k: v for k, v in request.meta.items() if k != "staff_json"}
+        return request.replace(url=known["page"], meta={**meta, "playwright": True}, dont_filter=True)
+
+
+class RenderStateResetMiddleware(BaseSpiderMiddleware):
+    """Spider middleware: requests a callback yields start without their parent's per-fetch render state.
+
+    Callbacks hand response.meta on to the pages they follow. The JSON a page
+    captured, the capture and resource-blocking dicts its render filled in and
+    a remembered staff endpoint describe that one fetch: inherited, they make
+    a child re-emit its parent's records instead of reading its own DOM, and
+    count its parent's blocked requests again.
+    """
+
+    KEYS = ("captured_json", "json_capture", "staff_json", "resource_blocking")
+
+    def get_processed_request(self, request, response):
+        methods = request.meta.get("playwright_page_methods") or ()
+        stale_methods = any(getattr(pm, "method", None) is collect_json for pm in methods)
+        if not stale_methods and not any(key in request.meta for key in self.KEYS):
+            return request
+        meta = {k: v for k, v in request.meta.items() if k not in self.KEYS}
+        if stale_methods:
+            meta["playwright_page_methods"] = [pm for pm in methods if getattr(pm, "method", None) is not collect_json]
+        return request.replace(meta=meta)
+
+
+class RenderTierMiddleware:
+    """Fetch Playwright requests statically first and render only pages that need it.
+
+    A request marked meta["playwright"] is downgraded to a plain HTTP fetch
+    unless its host is known to need rendering. When needs_js_render() finds
+    the static HTML is an app shell without contacts, the request is re-issued
+    through Playwright with its original page methods. Per-host decisions are
+    loaded from and saved to domain_profiles.render_tier.
+
+    Runs below HttpCompressionMiddleware, so needs_js_render() reads the
+    decoded body, and above SoftNotFound and CanonicalDedup, so they only ever
+    see the final (static or rendered) response.
+    """
+
+    def __init__(self, stats, min_samples: int = 2):
+        self.stats = stats
+        self.policy = RenderTierPolicy(min_samples=min_samples)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("RENDER_TIER_ENABLED"):
+            raise NotConfigured
+        middleware = cls(crawler.stats, min_samples=crawler.settings.getint("RENDER_TIER_MIN_SAMPLES", 2))
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.policy.known = _load_domain_values("render_tier")
+        logger.info(f"Render tier: loaded {len(self.policy.known)} domain decisions")
+
+    def spider_closed(self, spider):
+        decisions = self.policy.decisions()
+        if decisions:
+            _save_domain_values("render_tier", decisions)
+            logger.info(f"Render tier: saved {len(decisions)} domain decisions")
+
+    def process_request(self, request, spider):
+        if not request.meta.get("playwright") or "render_tier" in request.meta:
+            return None
+        host = urlparse_cached(request).hostname or ""
+        if self.policy.tier(host) == TIER_RENDER:
+            request.meta["render_tier"] = TIER_RENDER
+            self.stats.inc_value("render_tier/rendered_directly")
+            return None
+        request.meta["render_tier"] = TIER_STATIC
+        request.meta["playwright"] = False
+        return None
+
+    def process_response(self, request, response, spider):
+        if request.meta.get("render_tier") != TIER_STATIC or response.status != 200 or not isinstance(response, HtmlResponse):
+            return response
+        host = urlparse_cached(request).hostname or ""
+        reason = needs_js_render(response.body)
+        self.policy.record(host, needed_render=reason is not None)
+        if reason is None:
+            self.stats.inc_value("render_tier/static_ok")
+            return response
+        self.stats.inc_value(f"render_tier/escalated/{reason}")
+        return request.replace(meta={**request.meta, "playwright": True, "render_tier": TIER_RENDER}, dont_filter=True)
+
+
+class ResourceBlockingMiddleware:
+    """Abort images, media, fonts, stylesheets and trackers on every rendered page.
+
+    Installs coach_crawler.render.blocking's routing through the page init
+    callback of requests that will be rendered (after RenderTierMiddleware has
+    sent the static ones on their way), with the site's platform allowlist
+    taken from meta["website_platform"] or the spider's render_platform. The
+    render farm applies the same policy. Blocked subrequests per type and the
+    render time of each page are added to the crawl stats so the saving can be
+    compared against a run with RESOURCE_BLOCKING_ENABLED off.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("RESOURCE_BLOCKING_ENABLED"):
+            raise NotConfigured
+        return cls(crawler.stats)
+
+    def process_request(self, request, spider):
+        if not request.meta.get("playwright") or "resource_blocking" in request.meta:
+            return None
+        platform = request.meta.get("website_platform") or getattr(spider, "render_platform", None)
+        request.meta["resource_blocking"] = {"platform": platform}
+        request.meta.setdefault("playwright_page_init_callback", init_page)
+        return None
+
+    def process_response(self, request, response, spider):
+        blocking = request.meta.get("resource_blocking")
+        if blocking is None or not request.meta.get("playwright"):
+            return response
+        self.stats.inc_value("resource_blocking/pages")
+        self.stats.inc_value("resource_blocking/page_bytes", len(response.body))
+        if request.meta.get("download_latency"):
+            self.stats.inc_value("resource_blocking/render_seconds", round(request.meta["download_latency"], 3))
+        for key, count in blocking.get("counts", {}).items():
+            self.stats.inc_value(f"resource_blocking/{key}", count)
+        return response
+
+
+class RenderCompletionMiddleware:
+    """Give each rendered page a per-domain wait_until_rendered() timeout and learn from the outcome.
+
+    Requests whose page methods include coach_crawler.render.completion.
+    wait_until_rendered get that method's timeout from RenderTimeouts. After
+    the render, the method's result (which signal fired, how long it took)
+    updates the domain's typical completion time and the crawl stats. Learned
+    times are kept in domain_profiles.render_seconds.
+    """
+
+    def __init__(self, stats, timeouts: RenderTimeouts):
+        self.stats = stats
+        self.timeouts = timeouts
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("RENDER_COMPLETION_ENABLED"):
+            raise NotConfigured
+        middleware = cls(crawler.stats, RenderTimeouts(
+            default=settings.getfloat("RENDER_COMPLETION_TIMEOUT", 10.0),
+            min_timeout=settings.getfloat("RENDER_COMPLETION_MIN_TIMEOUT", 3.0),
+            max_timeout=settings.getfloat("RENDER_COMPLETION_MAX_TIMEOUT", 20.0),
+        ))
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.timeouts.typical = _load_domain_values("render_seconds")
+        logger.info(f"Render completion: loaded {len(self.timeouts.typical)} domain render times")
+
+    def spider_closed(self, spider):
+        if self.timeouts.updated:
+            _save_domain_values("render_seconds", {d: self.timeouts.typical[d] for d in self.timeouts.updated})
+
+    @staticmethod
+    def _completion_methods(request):
+        return [
+            pm for pm in request.meta.get("playwright_page_methods") or ()
+            if getattr(pm, "method", None) is wait_until_rendered
+        ]
+
+    def process_request(self, request, spider):
+        if not request.meta.get("playwright"):
+            return None
+        if not self._completion_methods(request):
+            return None
+        timeout = self.timeouts.timeout(urlparse_cached(request).hostname or "")
+        # Page methods are often shared between requests (a spider-level list):
+        # give this request its own copies rather than changing everyone's timeout
+        request.meta["playwright_page_methods"] = [
+            PageMethod(pm.method, *pm.args, **{**pm.kwargs, "timeout": timeout})
+            if getattr(pm, "method", None) is wait_until_rendered else pm
+            for pm in request.meta["playwright_page_methods"]
+        ]
+        return None
+
+    def process_response(self, request, response, spider):
+        if not request.meta.get("playwright"):
+            return response
+        host = urlparse_cached(request).hostname or ""
+        for pm in self._completion_methods(request):
+            if not isinstance(pm.result, dict):
+                continue
+            outcome = pm.result["outcome"]
+            self.timeouts.record(host, pm.result["seconds"], timed_out=outcome == OUTCOME_TIMEOUT)
+            self.stats.inc_value(f"render_completion/outcome/{outcome}")
+            self.stats.inc_value("render_completion/wait_seconds", pm.result["seconds"])
+        return response
+
+
+class RenderFarmMiddleware:
+    """Send Playwright requests to the out-of-process render farm (`render serve`).
+
+    Requests still marked meta["playwright"] after RenderTierMiddleware are
+    submitted as render jobs and answered with the farm's HTML, so the crawl
+    process never launches a browser. The middleware only turns on when farm
+    workers are alive; if the farm stops answering mid-crawl, requests fall
+    back to the in-process scrapy-playwright handler. Needs the asyncio reactor.
+    """
+
+    def __init__(self, queue, stats, timeout: float = 45.0):
+        self.queue = queue
+        self.stats = stats
+        self.timeout = timeout
+        self.available = True
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("RENDER_FARM_ENABLED"):
+            raise NotConfigured
+        redis_url = settings.get("RENDER_FARM_REDIS_URL")
+        try:
+            queue = RedisRenderQueue.from_url(redis_url)
+            workers = queue.live_workers()
+        except Exception as e:
+            raise NotConfigured(f"Render farm: Redis unavailable ({e})")
+        if not workers:
+            raise NotConfigured("Render farm: no live workers, rendering in-process")
+        logger.info(f"Render farm: {workers} workers at {redis_url}")
+        return cls(queue, crawler.stats, timeout=settings.getfloat("RENDER_FARM_TIMEOUT", 45.0))
+
+    def _roundtrip(self, job):
+        self.queue.submit(job)
+        return self.queue.wait_result(job["id"], self.timeout)
+
+    async def process_request(self, request, spider):
+        if not self.available or not request.meta.get("playwright") or request.meta.get("playwright_include_page"):
+            return None
+        user_agent = request.headers.get("User-Agent")
+        job = make_job(
+            request.url, self.timeout, request.meta.get("playwright_page_methods", ()),
+            headers={"User-Agent": user_agent.decode()} if user_agent else None,
+            resource_blocking=request.meta.get("resource_blocking"),
+            json_capture="json_capture" in request.meta,
+        )
+        result = await asyncio.to_thread(self._roundtrip, job)
+        if result is None:
+            self.stats.inc_value("render_farm/timeouts")
+            if not await asyncio.to_thread(self.queue.live_workers):
+                self.available = False
+                logger.warning("Render farm: no live workers left, rendering in-process")
+            return None
+        if "error" in result:
+            self.stats.inc_value("render_farm/failed")
+            raise IgnoreRequest(f"{request.url}: render farm failed: {result['error']}")
+        if "resource_blocking" in request.meta:
+            request.meta["resource_blocking"]["counts"] = result.get("blocked", {})
+        if "json_capture" in request.meta:
+            request.meta["json_capture"]["responses"] = result.get("captured_json", [])
+        for pm in request.meta.get("playwright_page_methods") or ():
+            if getattr(pm, "method", None) is wait_until_rendered:
+                pm.result = result.get("completion")
+        self.stats.inc_value("render_farm/rendered")
+        self.stats.inc_value("render_farm/render_seconds", result.get("render_seconds", 0))
+        return HtmlResponse(
+            result["url"], status=result["status"], body=result["html"].encode("utf-8"), encoding="utf-8",
+            request=request, flags=["render_farm"],
+        )
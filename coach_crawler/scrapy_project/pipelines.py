@@ -4,8 +4,12 @@ import re
 from datetime import datetime, timezone
 
 from scrapy.exceptions import DropItem
+from twisted.internet import defer, threads
 
 from coach_crawler.models import SessionLocal, Coach, School, CrawlJob
+from coach_crawler.planning import update_change_rate
+from coach_crawler.planning.recrawl import days_since
+from coach_crawler.scrapy_project.items import CoachItem, SchoolFactsItem
 from coach_crawler.utils.url_utils import make_slug
 
 logger = logging.getLogger(__name__)
@@ -17,6 +21,9 @@ class EmailValidationPipeline:
     """Validate and normalize email addresses."""
 
     def process_item(self, item, spider):
+        if not isinstance(item, CoachItem):
+            return item
+
         email = item.get("email", "").strip().lower()
         if not email or not _EMAIL_RE.match(email):
             raise DropItem(f"Invalid email: {email}")
@@ -33,6 +40,9 @@ class DeduplicationPipeline:
         self.seen: set[tuple[str, int | None]] = set()
 
     def process_item(self, item, spider):
+        if not isinstance(item, CoachItem):
+            return item
+
         key = (item["email_hash"], item.get("school_id"))
         if key in self.seen:
             raise DropItem(f"Duplicate: {item['email']}")
@@ -41,7 +51,12 @@ class DeduplicationPipeline:
 
 
 class DatabasePipeline:
-    """Write validated, deduplicated coach items to the database."""
+    """Write validated, deduplicated coach items to the database.
+
+    Also diffs each recrawled school's coaches against its previous crawl
+    (added, changed, no longer listed) and folds the result into the school's
+    change_rate, which the recrawl planner uses to decide what to refresh.
+    """
 
     def open_spider(self, spider):
         self.session = SessionLocal()
@@ -49,8 +64,18 @@ class DatabasePipeline:
         self.items_saved = 0
         self.items_found = 0
         self.crawled_schools: set[int] = set()
+        # Per school: when it was last crawled before this run, coaches seen, and changes so far
+        self.previous_crawl: dict[int, datetime] = {}
+        self.seen_coaches: dict[int, set[str]] = {}
+        self.seen_pages: dict[int, set[str]] = {}
+        self.coach_changes: dict[int, int] = {}
 
     def close_spider(self, spider):
+        try:
+            self._update_change_rates(spider)
+        except Exception:
+            self.session.rollback()
+            logger.exception("Failed to update school change rates")
         if self.crawl_job_id:
             try:
                 job = self.session.query(CrawlJob).filter(CrawlJob.id == self.crawl_job_id).first()
@@ -64,6 +89,9 @@ class DatabasePipeline:
         logger.info(f"Pipeline: found {self.items_found} coaches, {self.items_saved} new saves, {len(self.crawled_schools)} schools processed")
 
     def process_item(self, item, spider):
+        if not isinstance(item, CoachItem):
+            return item
+
         self.items_found += 1
         school_id = item.get("school_id")
 
@@ -72,6 +100,8 @@ class DatabasePipeline:
             try:
                 school = self.session.query(School).filter(School.id == school_id).first()
                 if school:
+                    if school.last_crawled_at:
+                        self.previous_crawl[school_id] = school.last_crawled_at
                     school.crawl_status = "crawled"
                     school.last_crawled_at = datetime.now(timezone.utc)
                     self.session.commit()
@@ -85,8 +115,12 @@ class DatabasePipeline:
             Coach.school_id == school_id,
         ).first()
 
+        self.seen_coaches.setdefault(school_id, set()).add(item["email_hash"])
+        self.seen_pages.setdefault(school_id, set()).add(item["source_url"])
         try:
             if existing:
+                if (item.get("title") or existing.title) != existing.title:
+                    self.coach_changes[school_id] = self.coach_changes.get(school_id, 0) + 1
                 # Update existing record with fresh data
                 if item.get("full_name"):
                     existing.full_name = item["full_name"]
@@ -101,6 +135,7 @@ class DatabasePipeline:
                     existing.sport_normalized = item["sport_normalized"]
                 existing.source_url = item["source_url"]
                 existing.confidence_score = item.get("confidence_score", 0.0)
+                existing.crawled_at = datetime.now(timezone.utc)
             else:
                 coach = Coach(
                     email=item["email"],
@@ -121,6 +156,7 @@ class DatabasePipeline:
                 )
                 self.session.add(coach)
                 self.items_saved += 1
+                self.coach_changes[school_id] = self.coach_changes.get(school_id, 0) + 1
 
             self.session.commit()
 
@@ -138,6 +174,31 @@ class DatabasePipeline:
 
         return item
 
+    def _update_change_rates(self, spider):
+        """Fold this run's coach diff into change_rate for every school crawled before."""
+        if not self.previous_crawl:
+            return
+        budget = getattr(spider, "school_budget", None)
+        now = datetime.now(timezone.utc)
+        schools = self.session.query(School).filter(School.id.in_(list(self.previous_crawl))).all()
+        for school in schools:
+            previous = self.previous_crawl[school.id]
+            changes = self.coach_changes.get(school.id, 0)
+            # Coaches seen last crawl but not this one have left
+            departed = self.session.query(Coach).filter(
+                Coach.school_id == school.id,
+                Coach.crawled_at >= previous,
+                Coach.email_hash.notin_(self.seen_coaches.get(school.id, set())),
+            )
+            if budget and budget.stop_reason(school.id):
+                # A crawl stopped early (budget spent, enough coaches found) may simply
+                # not have reached the rest; only pages it read again can show a departure
+                departed = departed.filter(Coach.source_url.in_(self.seen_pages.get(school.id, set())))
+            changes += departed.count()
+            school.change_rate = update_change_rate(school.change_rate, changes, days_since(previous, now))
+        self.session.commit()
+        logger.info(f"Pipeline: updated change rates for {len(schools)} recrawled schools")
+
 
 class SchoolSeedPipeline:
     """Write discovered school/organization records to the schools table."""
@@ -185,3 +246,77 @@ class SchoolSeedPipeline:
             logger.exception(f"Failed to save school: {item['name']}")
 
         return item
+
+
+class SchoolFactsPipeline:
+    """Write discovered site facts (homepage, staff directory, platform) back to School rows.
+
+    Updates are merged per school and written in batches on a worker thread so
+    the reactor never waits on the database. The next crawl's start_requests
+    then takes the direct path instead of guessing and probing again. A
+    school's staff directory is only replaced by a page with more strong
+    contacts than the one already recorded in this run.
+    """
+
+    FIELDS = ("athletics_url", "staff_directory_url", "website_platform")
+
+    def __init__(self, batch_size: int = 50):
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(batch_size=crawler.settings.getint("SCHOOL_FACTS_BATCH_SIZE", 50))
+
+    def open_spider(self, spider):
+        self.pending: dict[int, dict] = {}
+        self.directory_contacts: dict[int, int] = {}
+        self.writes: set = set()
+        self.items_saved = 0
+
+    def close_spider(self, spider):
+        self._flush()
+        d = defer.DeferredList(list(self.writes))
+        d.addBoth(lambda _: logger.info(f"SchoolFactsPipeline: updated {self.items_saved} schools"))
+        return d
+
+    def process_item(self, item, spider):
+        if not isinstance(item, SchoolFactsItem):
+            return item
+
+        facts = {field: item[field] for field in self.FIELDS if item.get(field)}
+        if "staff_directory_url" in facts:
+            contacts = item.get("staff_directory_contacts") or 0
+            if contacts <= self.directory_contacts.get(item["school_id"], 0):
+                # A weaker page than the directory already chosen, possibly already written
+                del facts["staff_directory_url"]
+            else:
+                self.directory_contacts[item["school_id"]] = contacts
+        if facts:
+            self.pending.setdefault(item["school_id"], {}).update(facts)
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+        return item
+
+    def _flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        d = threads.deferToThread(self._write, batch)
+        self.writes.add(d)
+        d.addErrback(lambda f: logger.error(f"SchoolFactsPipeline: batch write failed: {f.value}"))
+        d.addBoth(lambda _: self.writes.discard(d))
+
+    def _write(self, batch: dict[int, dict]):
+        session = SessionLocal()
+        try:
+            schools = session.query(School).filter(School.id.in_(list(batch))).all()
+            for school in schools:
+                for field, value in batch[school.id].items():
+                    setattr(school, field, value)
+            session.commit()
+            self.items_saved += len(schools)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -1,3 +1,5 @@
+import os
+
 BOT_NAME = "coach_crawler"
 SPIDER_MODULES = ["coach_crawler.scrapy_project.spiders"]
 NEWSPIDER_MODULE = "coach_crawler.scrapy_project.spiders"
@@ -30,14 +32,161 @@ ITEM_PIPELINES = {
     "coach_crawler.scrapy_project.pipelines.EmailValidationPipeline": 100,
     "coach_crawler.scrapy_project.pipelines.DeduplicationPipeline": 200,
     "coach_crawler.scrapy_project.pipelines.DatabasePipeline": 300,
+    "coach_crawler.scrapy_project.pipelines.SchoolFactsPipeline": 400,
 }
 
 # Middlewares
 DOWNLOADER_MIDDLEWARES = {
+    "coach_crawler.scrapy_project.middlewares.ProbeCancellationMiddleware": 240,
+    "coach_crawler.scrapy_project.middlewares.SchoolBudgetMiddleware": 245,
+    # Below RetryMiddleware (550) so failures are recorded only after retries are exhausted
+    "coach_crawler.scrapy_project.middlewares.NegativeCacheMiddleware": 250,
+    "coach_crawler.scrapy_project.middlewares.SharedDomainBudgetMiddleware": 300,
     "coach_crawler.scrapy_project.middlewares.ProxyRotationMiddleware": 350,
     "coach_crawler.scrapy_project.middlewares.UserAgentRotationMiddleware": 400,
+    # Above RetryMiddleware (550) so it sees 429/503 before they are retried,
+    # and clear of AjaxCrawlMiddleware (560)
+    "coach_crawler.scrapy_project.middlewares.AdaptiveConcurrencyMiddleware": 555,
+    # Below HttpCompression (590) and Redirect (600) so they see decoded, final responses.
+    # SoftNotFound is also below MetaRefresh (580): a meta-refresh stub is followed
+    # before it is fingerprinted, so only the page it leads to is judged
+    "coach_crawler.scrapy_project.middlewares.SoftNotFoundMiddleware": 579,
+    "coach_crawler.scrapy_project.middlewares.CanonicalDedupMiddleware": 582,
+    "coach_crawler.scrapy_project.middlewares.JsonCaptureMiddleware": 584,
+    # Render group: still below HttpCompression, and above the middlewares that
+    # should only see the final static or rendered page
+    "coach_crawler.scrapy_project.middlewares.RenderTierMiddleware": 585,
+    "coach_crawler.scrapy_project.middlewares.ResourceBlockingMiddleware": 586,
+    "coach_crawler.scrapy_project.middlewares.RenderCompletionMiddleware": 587,
+    "coach_crawler.scrapy_project.middlewares.RenderFarmMiddleware": 589,
+    # Above RedirectMiddleware (600) and the render group so every response the
+    # host sends counts as a success before those swap it for a new request or drop it
+    "coach_crawler.scrapy_project.middlewares.CircuitBreakerMiddleware": 610,
+}
+
+SPIDER_MIDDLEWARES = {
+    "coach_crawler.scrapy_project.middlewares.RenderStateResetMiddleware": 950,
 }
 
+# Per-domain AIMD concurrency (learned limits persist in domain_profiles)
+ADAPTIVE_CONCURRENCY_ENABLED = True
+ADAPTIVE_CONCURRENCY_MIN = 1.0
+ADAPTIVE_CONCURRENCY_MAX = 8.0
+ADAPTIVE_CONCURRENCY_TARGET_LATENCY = 3.0
+ADAPTIVE_CONCURRENCY_MAX_RETRY_AFTER = 300
+
+# Per-host circuit breaker for unreachable sites
+CIRCUIT_BREAKER_ENABLED = True
+CIRCUIT_BREAKER_THRESHOLD = 3
+CIRCUIT_BREAKER_COOLDOWN = 300
+CIRCUIT_BREAKER_PROBE_TIMEOUT = 120  # seconds before an unanswered half-open probe is given up on
+
+# Resolve guessed school domains in bulk before crawling them
+LIVENESS_PREFILTER_ENABLED = True
+LIVENESS_CONCURRENCY = 100
+LIVENESS_TIMEOUT = 3.0
+LIVENESS_TCP_CHECK = False
+LIVENESS_CACHE_TTL = 3600
+
+# Persistent cache of dead hosts and 404/410 pages (TTLs in days)
+NEGATIVE_CACHE_ENABLED = True
+NEGATIVE_CACHE_TTLS = {"nxdomain": 7, "refused": 1, "http_404": 14, "http_410": 30}
+
+# School facts (homepage, staff directory, platform) are written back in batches
+SCHOOL_FACTS_BATCH_SIZE = 50
+
+# Guessed domains: "parallel" probes every candidate at once (first success wins),
+# "sequential" tries them one after another
+GUESSED_DOMAIN_PROBE_MODE = "parallel"
+PROBE_DOWNLOAD_TIMEOUT = 8
+
+# Read each host's sitemaps before probing staff page suffixes
+SITEMAP_DISCOVERY_ENABLED = True
+SITEMAP_MAX_FOLLOW = 5  # sitemap files fetched per host, including index children
+SITEMAP_MAX_CANDIDATES = 3  # best-scoring sitemap URLs requested per school
+SITEMAP_MAX_SIZE = 10 * 1024 * 1024
+
+# Per-school crawl budget; a school also stops once one page yields
+# SCHOOL_ENOUGH_COACHES contacts at SCHOOL_ENOUGH_CONFIDENCE or better
+SCHOOL_BUDGET_ENABLED = True
+SCHOOL_MAX_REQUESTS = 25
+SCHOOL_MAX_BYTES = 20 * 1024 * 1024
+SCHOOL_ENOUGH_COACHES = 10
+SCHOOL_ENOUGH_CONFIDENCE = 0.8
+
+# A page is recorded as a school's staff directory only with this many contacts
+# at STAFF_DIRECTORY_MIN_CONFIDENCE or better, and only if it beats the page
+# recorded so far
+STAFF_DIRECTORY_MIN_CONTACTS = 2
+STAFF_DIRECTORY_MIN_CONFIDENCE = 0.8
+
+# Drop staff-page probes whose text matches the host's homepage, 404 template
+# or an earlier probe (SimHash distance in bits)
+SOFT_404_ENABLED = True
+SOFT_404_MAX_DISTANCE = 6
+# Request one random path per host before its first staff probe to learn its "not found" page
+SOFT_404_FINGERPRINT_PROBE = True
+
+# Fetch each canonical URL (after redirects) once per school, even with dont_filter
+CANONICAL_DEDUP_ENABLED = True
+
+# Fetch Playwright requests statically first and escalate to a browser render
+# only for app shells without contacts; a host is rendered directly once most
+# of its first RENDER_TIER_MIN_SAMPLES pages needed it (kept in domain_profiles)
+RENDER_TIER_ENABLED = True
+RENDER_TIER_MIN_SAMPLES = 2
+
+# Render pages on the out-of-process render farm (coach-crawler render serve)
+# when its workers are running; otherwise scrapy-playwright renders in-process
+RENDER_FARM_ENABLED = True
+RENDER_FARM_REDIS_URL = os.environ.get("RENDER_FARM_REDIS_URL", os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+RENDER_FARM_TIMEOUT = 45.0
+
+# Abort images, media, fonts, stylesheets and known trackers on rendered pages
+# (platform allowlists in coach_crawler/render/blocking.py); contexts block
+# service workers, which would otherwise bypass the routing
+RESOURCE_BLOCKING_ENABLED = True
+PLAYWRIGHT_CONTEXTS = {
+    "default": {"service_workers": "block", "viewport": {"width": 1280, "height": 900}},
+}
+
+# Rendered pages wait for contacts/person cards, network idle or a quiet DOM,
+# whichever comes first (render.completion.wait_until_rendered); the timeout
+# per domain is learned from past render times, within the min/max bounds
+RENDER_COMPLETION_ENABLED = True
+RENDER_COMPLETION_TIMEOUT = 10.0
+RENDER_COMPLETION_MIN_TIMEOUT = 3.0
+RENDER_COMPLETION_MAX_TIMEOUT = 20.0
+
+# Rendered pages record their JSON data calls; staff found in one is used
+# instead of the DOM and its endpoint is fetched without a browser next crawl
+# (domain_profiles.staff_json)
+JSON_CAPTURE_ENABLED = True
+JSON_CAPTURE_MIN_RECORDS = 2
+
+# Staff spiders read schools in id-ordered chunks and only hand the engine a new
+# start request while fewer than START_ADMISSION_WINDOW requests are queued or
+# downloading (0 disables the window)
+START_CHUNK_SIZE = 500
+START_ADMISSION_WINDOW = 200
+
+# Start schools in order of expected coach yield (past coaches, platform and what
+# is known about the site) and give each request its school's priority, adjusted
+# by request kind: known staff pages first, blind suffix probes last
+PRIORITIZE_SCHOOLS = True
+
+# Requests a --refresh crawl may spend per day; the recrawl planner fills it with
+# the crawled schools most likely to have changed since their last crawl
+RECRAWL_DAILY_REQUESTS = 20000
+
+# Spiders a full refresh (POST /api/crawl-all) runs at once in its process; jobs
+# start as soon as the jobs they depend on finish (youth_staff waits for the seeds)
+CRAWL_ALL_MAX_SPIDERS = 6
+
+# Node-wide per-domain budget shared by all crawler processes (see DOMAIN_RATE_LIMITS)
+SHARED_BUDGET_ENABLED = True
+SHARED_BUDGET_REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
 # Playwright (for JS-rendered sites)
 DOWNLOAD_HANDLERS = {
     "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
@@ -1,11 +1,53 @@
+import re
 import scrapy
 import logging
+from sqlalchemy import func
+from urllib.parse import urlparse
 
+from scrapy.http import TextResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy_playwright.page import PageMethod
+from twisted.internet.task import deferLater
+
+from coach_crawler.adapters import adapter_for, detect_adapter
 from coach_crawler.extractors import EmailExtractor, NameExtractor, RoleExtractor, SportClassifier, PageClassifier, email_hash
-from coach_crawler.scrapy_project.items import CoachItem
+from coach_crawler.models import Coach, School
+from coach_crawler.planning import (
+    expected_yield, load_recrawl_plan, request_priority, school_priority, school_shard_key, shard_of,
+)
+from coach_crawler.render.completion import wait_until_rendered
+from coach_crawler.scrapy_project.items import CoachItem, SchoolFactsItem
+from coach_crawler.utils.liveness import LivenessChecker
+from coach_crawler.utils.render_tier import TIER_RENDER, needs_js_render
+from coach_crawler.utils.school_budget import SchoolBudget
+from coach_crawler.utils.sitemap import iter_sitemap, sitemaps_from_robots
+from coach_crawler.utils.url_utils import site_key
 
 logger = logging.getLogger(__name__)
 
+# Schools read from the DB per chunk; each chunk's guessed domains are resolved
+# together in one liveness batch (START_CHUNK_SIZE overrides)
+LIVENESS_BATCH_SIZE = 500
+
+# Words dropped from a school name when matching it against a contact's context
+SCHOOL_NAME_NOISE = re.compile(
+    r"\b(high school|middle school|junior high|senior high|school|academy|hs|ms|isd|usd|the|of)\b", re.IGNORECASE,
+)
+
+# Request meta that only applies to a domain probe, not to the pages found from it
+PROBE_META_KEYS = ("probe_group", "probe_callback", "download_timeout", "dont_retry")
+
+
+class GuessedBatch:
+    """Guessed-domain schools whose candidate hosts start() resolves before requesting them."""
+
+    __slots__ = ("batch", "callback", "errback")
+
+    def __init__(self, batch, callback, errback):
+        self.batch = batch
+        self.callback = callback
+        self.errback = errback
+
 
 class BaseStaffSpider(scrapy.Spider):
     """Abstract base spider for crawling staff directories across any level."""
@@ -20,7 +62,9 @@ class BaseStaffSpider(scrapy.Spider):
         "ROBOTSTXT_OBEY": True,
     }
 
-    def __init__(self, level=None, sub_level=None, state=None, division=None, limit=None, crawl_job_id=None, *args, **kwargs):
+    def __init__(self, level=None, sub_level=None, state=None, division=None, limit=None, crawl_job_id=None,
+                 probe_mode=None, discover_only=None, refresh=None, refresh_budget=None, shard=None, shards=None,
+                 *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.level = level
         self.sub_level = sub_level
@@ -28,24 +72,686 @@ class BaseStaffSpider(scrapy.Spider):
         self.division = division
         self.limit = int(limit) if limit else None
         self.crawl_job_id = int(crawl_job_id) if crawl_job_id else None
+        self.probe_mode = probe_mode
+        self.probe_groups: dict[int, dict] = {}
+        # Discover-only mode records site facts without extracting coaches
+        self.discover_only = str(discover_only).lower() in ("1", "true", "yes") if discover_only else False
+        # Refresh mode recrawls already crawled schools picked by the recrawl planner
+        self.refresh = str(refresh).lower() in ("1", "true", "yes") if refresh else False
+        self.refresh_budget = int(refresh_budget) if refresh_budget else None
+        # Sharded extract: this process only starts the schools whose domain hashes to `shard`
+        self.shards = int(shards) if shards else 1
+        self.shard = int(shard) if shard else 0
+        if not 0 <= self.shard < self.shards:
+            raise ValueError(f"shard must be between 0 and {self.shards - 1}, got {self.shard}")
+        self._shard_ids: set[int] | None = None
+        self._refresh_plan: list[tuple[int, int]] | None = None
+        self._facts_recorded: set[tuple] = set()
+        # School id -> strong contacts on its best staff directory page so far, see record_staff_directory
+        self._directory_contacts: dict[int, int] = {}
+        # Per-host sitemap discovery state, see discover_staff_pages
+        self._sitemaps: dict[str, dict] = {}
+        self._school_budget = None
+        # School id -> planned priority for the chunk being started, see stream_schools
+        self._school_priorities: dict[int, int] = {}
 
         self.email_extractor = EmailExtractor()
         self.name_extractor = NameExtractor()
         self.role_extractor = RoleExtractor()
         self.sport_classifier = SportClassifier()
         self.page_classifier = PageClassifier()
+        self._liveness = None
+        # Set by start(): guessed batches are then resolved off the reactor thread
+        self._resolve_in_start = False
+
+    async def start(self):
+        """Scrapy >= 2.13 entry point: feed start_requests() through the admission window.
+
+        A new request is only handed to the engine while fewer than
+        START_ADMISSION_WINDOW requests are queued or downloading, so schools
+        are admitted as earlier ones finish instead of all being scheduled up
+        front. Older Scrapy versions call start_requests() directly.
+
+        Guessed-domain batches (see start_guessed_requests) come out of
+        start_requests() as GuessedBatch and are resolved here in a thread, so
+        the reactor keeps downloading while a DNS batch is in flight.
+        """
+        self._resolve_in_start = True
+        for item in self.start_requests():
+            requests = await self.resolve_guessed(item) if isinstance(item, GuessedBatch) else (item,)
+            for request in requests:
+                await self.wait_for_admission()
+                yield request
+
+    async def wait_for_admission(self):
+        window = self.settings.getint("START_ADMISSION_WINDOW", 0)
+        if not window:
+            return
+        from twisted.internet import reactor
+
+        while self.requests_in_flight() >= window:
+            self.crawler.stats.inc_value("start/admission_waits")
+            await maybe_deferred_to_future(deferLater(reactor, 0.25, lambda: None))
+
+    def requests_in_flight(self) -> int:
+        """Requests waiting in the scheduler plus those being downloaded."""
+        engine = self.crawler.engine
+        # Engine.scheduler is public from Scrapy 2.19; earlier versions keep it on the slot
+        scheduler = getattr(engine, "scheduler", None) or getattr(getattr(engine, "slot", None), "scheduler", None)
+        queued = len(scheduler) if scheduler is not None and hasattr(scheduler, "__len__") else 0
+        return queued + len(engine.downloader.active)
+
+    def school_query(self, session):
+        """Query for the schools this spider starts, before sharding, the limit and the refresh plan.
+
+        Also used to size a crawl job before it runs (see crawl_runner).
+        """
+        raise NotImplementedError
+
+    def status_filter(self):
+        """Schools to start: pending and failed ones, or the crawled ones in refresh mode."""
+        if self.refresh:
+            return School.crawl_status == "crawled"
+        return School.crawl_status.in_(["pending", "failed"])
+
+    def count_schools(self, query) -> int:
+        """How many schools stream_schools(query) will start."""
+        if self.refresh:
+            return len(self._planned(query, self.refresh_plan(query)))
+        shard_ids = self.shard_school_ids(query)
+        total = query.order_by(None).count() if shard_ids is None else len(shard_ids)
+        return min(total, self.limit) if self.limit else total
+
+    def in_shard(self, school) -> bool:
+        """Whether `school` belongs to this spider's shard (always true when not sharded)."""
+        if self.shards == 1:
+            return True
+        return self.shard_for(school.staff_directory_url, school.athletics_url, school.slug) == self.shard
+
+    def shard_for(self, staff_directory_url, athletics_url, slug) -> int:
+        settings = getattr(self, "settings", None)
+        shared_domains = list(settings.getdict("DOMAIN_RATE_LIMITS")) if settings is not None else ()
+        return shard_of(school_shard_key(staff_directory_url, athletics_url, slug, shared_domains), self.shards)
+
+    def shard_school_ids(self, query) -> set[int] | None:
+        """Ids of the schools in `query` in this spider's shard, or None when not sharded.
+
+        Read once from the few columns the shard key needs and kept for the
+        rest of the run, since the partition is done in Python.
+        """
+        if self.shards == 1:
+            return None
+        if self._shard_ids is None:
+            rows = query.order_by(None).with_entities(
+                School.id, School.staff_directory_url, School.athletics_url, School.slug,
+            )
+            self._shard_ids = {
+                row.id for row in rows
+                if self.shard_for(row.staff_directory_url, row.athletics_url, row.slug) == self.shard
+            }
+        return self._shard_ids
+
+    def stream_schools(self, query):
+        """Yield the schools matching `query` in id-ordered chunks of START_CHUNK_SIZE.
+
+        Uses keyset pagination (id > last id seen) so each chunk is a short,
+        independent query, and expunges every chunk from the session once the
+        caller is done with it: memory stays flat however many schools match,
+        and the first requests go out right after the first chunk is read.
+        Honors self.limit across chunks. A sharded spider only yields the
+        schools in its shard.
+
+        With PRIORITIZE_SCHOOLS the chunks follow rank_schools() instead, so
+        the schools expected to yield the most coaches are started first. In
+        refresh mode only the schools in the recrawl plan are started, in plan
+        order.
+        """
+        chunk_size = self.settings.getint("START_CHUNK_SIZE", LIVENESS_BATCH_SIZE)
+        if self.refresh:
+            yield from self._stream_ordered_schools(query, self.refresh_plan(query), chunk_size)
+            return
+        if self.settings.getbool("PRIORITIZE_SCHOOLS"):
+            yield from self._stream_ordered_schools(query, self.rank_schools(query), chunk_size)
+            return
+        shard_ids = self.shard_school_ids(query)
+        remaining = self.limit
+        last_id = 0
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None or shard_ids is not None else min(chunk_size, remaining)
+            chunk = query.filter(School.id > last_id).order_by(School.id).limit(size).all()
+            if not chunk:
+                return
+            last_id = chunk[-1].id
+            if shard_ids is not None:
+                chunk = [school for school in chunk if school.id in shard_ids][:remaining]
+            if remaining is not None:
+                remaining -= len(chunk)
+            if chunk:
+                yield chunk
+            query.session.expunge_all()
+
+    def _planned(self, query, ranked):
+        """The part of a ranked (school id, priority) list in this shard and within the limit."""
+        shard_ids = self.shard_school_ids(query)
+        if shard_ids is not None:
+            ranked = [item for item in ranked if item[0] in shard_ids]
+        return ranked[:self.limit] if self.limit else ranked
+
+    def _stream_ordered_schools(self, query, ranked, chunk_size):
+        ranked = self._planned(query, ranked)
+        for i in range(0, len(ranked), chunk_size):
+            self._school_priorities = dict(ranked[i:i + chunk_size])
+            rows = {s.id: s for s in query.filter(School.id.in_(self._school_priorities)).order_by(None)}
+            yield [rows[school_id] for school_id in self._school_priorities if school_id in rows]
+            query.session.expunge_all()
+        self._school_priorities = {}
+
+    def rank_schools(self, query) -> list[tuple[int, int]]:
+        """(school id, priority) for every school in `query`, highest expected yield first.
+
+        Reads only the columns expected_yield() needs plus each school's coach
+        count, so ranking even a large table stays cheap.
+        """
+        session = query.session
+        coach_counts = (
+            session.query(Coach.school_id, func.count(Coach.id).label("coaches"))
+            .group_by(Coach.school_id)
+            .subquery()
+        )
+        rows = (
+            query.order_by(None)
+            .outerjoin(coach_counts, coach_counts.c.school_id == School.id)
+            .with_entities(
+                School.id, School.level, School.website_platform, School.staff_directory_url,
+                School.athletics_url, School.crawl_status, coach_counts.c.coaches,
+            )
+        )
+        ranked = [
+            (row.id, school_priority(expected_yield(
+                row.level, row.website_platform, row.coaches or 0,
+                has_staff_directory=bool(row.staff_directory_url), has_homepage=bool(row.athletics_url),
+                crawl_status=row.crawl_status,
+            )))
+            for row in rows
+        ]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked
+
+    def refresh_plan(self, query) -> list[tuple[int, int]]:
+        """(school id, priority) of the schools due for a recrawl within the daily request budget."""
+        if self._refresh_plan is not None:
+            # Counted before being streamed; plan once per run
+            return self._refresh_plan
+        budget = self.refresh_budget or self.settings.getint("RECRAWL_DAILY_REQUESTS", 20000)
+        plan = load_recrawl_plan(query, budget)
+        priorities = dict(self.rank_schools(query)) if plan else {}
+        logger.warning(f"Recrawl plan: {len(plan)} schools within {budget} requests")
+        self._refresh_plan = [(candidate.school_id, priorities.get(candidate.school_id, 0)) for candidate in plan]
+        return self._refresh_plan
+
+    def planned_priority(self, school) -> int:
+        """Priority of a school being started: its rank from stream_schools, else estimated from the row."""
+        if school.id in self._school_priorities:
+            return self._school_priorities[school.id]
+        return school_priority(expected_yield(
+            school.level, school.website_platform,
+            has_staff_directory=bool(school.staff_directory_url), has_homepage=bool(school.athletics_url),
+            crawl_status=school.crawl_status,
+        ))
+
+    @staticmethod
+    def priority_for(meta, kind) -> int:
+        """Scrapy priority of a `kind` request made for the school in `meta`."""
+        return request_priority(meta.get("school_priority", 0), kind, meta.get("depth", 0))
+
+    @property
+    def liveness(self) -> LivenessChecker | None:
+        """Liveness checker for guessed domains, or None when the prefilter is disabled."""
+        settings = getattr(self, "settings", None)
+        if settings is None or not settings.getbool("LIVENESS_PREFILTER_ENABLED"):
+            return None
+        if self._liveness is None:
+            self._liveness = LivenessChecker(
+                concurrency=settings.getint("LIVENESS_CONCURRENCY"),
+                timeout=settings.getfloat("LIVENESS_TIMEOUT"),
+                tcp_check=settings.getbool("LIVENESS_TCP_CHECK"),
+                ttl=settings.getfloat("LIVENESS_CACHE_TTL"),
+            )
+        return self._liveness
+
+    @property
+    def school_budget(self) -> SchoolBudget | None:
+        """Per-school crawl state enforced by SchoolBudgetMiddleware, or None when disabled."""
+        settings = getattr(self, "settings", None)
+        if settings is None or not settings.getbool("SCHOOL_BUDGET_ENABLED"):
+            return None
+        if self._school_budget is None:
+            self._school_budget = SchoolBudget(
+                max_requests=settings.getint("SCHOOL_MAX_REQUESTS"),
+                max_bytes=settings.getint("SCHOOL_MAX_BYTES"),
+                enough_coaches=settings.getint("SCHOOL_ENOUGH_COACHES"),
+                min_confidence=settings.getfloat("SCHOOL_ENOUGH_CONFIDENCE"),
+            )
+        return self._school_budget
+
+    def start_guessed_requests(self, batch, callback, errback):
+        """Start a batch of schools that only have guessed candidate URLs.
+
+        `batch` is a list of (meta, candidate_urls). Every candidate host in the
+        batch is resolved concurrently first; unresolvable candidates are pruned
+        and schools with no live candidate are skipped. Under start() the batch
+        is yielded as a GuessedBatch for start() to resolve without blocking the
+        reactor; older Scrapy versions resolve it here.
+
+        In "parallel" probe mode all survivors are probed at once (see
+        probe_in_parallel); in "sequential" mode the first survivor is requested
+        and the rest are kept in meta["fallback_urls"] for `errback`.
+        """
+        if self.liveness is not None and batch and self._resolve_in_start:
+            yield GuessedBatch(batch, callback, errback)
+            return
+        candidate_lists = [urls for _, urls in batch]
+        if self.liveness is not None and candidate_lists:
+            pruned = self.liveness.prune(candidate_lists)
+            self._record_pruned(candidate_lists, pruned)
+            candidate_lists = pruned
+        yield from self.guessed_requests(batch, candidate_lists, callback, errback)
+
+    async def resolve_guessed(self, pending: GuessedBatch) -> list:
+        """Prune a GuessedBatch's candidates in a thread and return its requests."""
+        candidate_lists = [urls for _, urls in pending.batch]
+        pruned = await maybe_deferred_to_future(self.liveness.prune_deferred(candidate_lists))
+        self._record_pruned(candidate_lists, pruned)
+        return list(self.guessed_requests(pending.batch, pruned, pending.callback, pending.errback))
+
+    def _record_pruned(self, candidate_lists, pruned):
+        before = sum(len(urls) for urls in candidate_lists)
+        dropped = before - sum(len(urls) for urls in pruned)
+        self.crawler.stats.inc_value("liveness/candidates_checked", before)
+        self.crawler.stats.inc_value("liveness/candidates_pruned", dropped)
+        logger.info(f"Liveness prefilter: pruned {dropped} of {before} guessed URLs")
+
+    def guessed_requests(self, batch, candidate_lists, callback, errback):
+        """Requests for each school in `batch` from its (pruned) candidate URLs."""
+        probe_mode = self.probe_mode or self.settings.get("GUESSED_DOMAIN_PROBE_MODE", "sequential")
+        for (meta, _), urls in zip(batch, candidate_lists):
+            if not urls:
+                logger.debug(f"No resolvable domain for {meta['school']['name']}")
+                continue
+            if probe_mode == "parallel":
+                yield from self.probe_in_parallel(meta, urls, callback)
+                continue
+            meta["fallback_urls"] = urls[1:]
+            yield scrapy.Request(
+                urls[0],
+                callback=callback,
+                meta=meta,
+                priority=self.priority_for(meta, "homepage"),
+                errback=errback,
+                dont_filter=True,
+            )
+
+    def probe_in_parallel(self, meta, urls, callback):
+        """Probe every candidate homepage for a school at once; the first success wins.
+
+        Probes use a short download timeout and no retries. Once one succeeds,
+        ProbeCancellationMiddleware drops the school's remaining probes and any
+        late responses are ignored.
+        """
+        group = meta["school"]["id"]
+        self.probe_groups[group] = {"winner": None, "pending": len(urls)}
+        for url in urls:
+            yield scrapy.Request(
+                url,
+                callback=self.accept_probe,
+                errback=self.probe_failed,
+                meta={
+                    **meta,
+                    "probe_group": group,
+                    "probe_callback": callback.__name__,
+                    "download_timeout": self.settings.getfloat("PROBE_DOWNLOAD_TIMEOUT", 8),
+                    "dont_retry": True,
+                },
+                priority=self.priority_for(meta, "homepage"),
+                dont_filter=True,
+            )
+
+    def accept_probe(self, response):
+        """First successful probe for a school: record it and parse it as the homepage."""
+        group = self.probe_groups.get(response.meta["probe_group"])
+        if group is None or group["winner"]:
+            self.crawler.stats.inc_value("probe/late_responses")
+            return
+        group["winner"] = response.url
+        self.crawler.stats.inc_value("probe/winners")
+
+        callback = getattr(self, response.meta["probe_callback"])
+        for key in PROBE_META_KEYS:
+            response.meta.pop(key, None)
+
+        logger.info(f"Probe: {response.meta['school']['name']} lives at {response.url}")
+        yield from self.record_facts(response, athletics_url=response.url)
+        yield from callback(response)
+
+    def accept_guessed_home(self, response):
+        """Record a sequentially probed guessed homepage that answered, so later crawls skip the guessing.
+
+        Only guessed requests carry meta["fallback_urls"]; it is dropped here so
+        the pages found from this homepage do not inherit it.
+        """
+        if response.meta.pop("fallback_urls", None) is None:
+            return
+        logger.info(f"Guessed homepage: {response.meta['school']['name']} lives at {response.url}")
+        yield from self.record_facts(response, athletics_url=response.url)
+
+    def probe_failed(self, failure):
+        group = self.probe_groups.get(failure.request.meta.get("probe_group"))
+        if group is None:
+            return
+        group["pending"] -= 1
+        if group["pending"] == 0 and not group["winner"]:
+            self.crawler.stats.inc_value("probe/no_live_homepage")
+            logger.debug(f"Probe: no candidate answered for {failure.request.meta['school']['name']}")
+
+    def collapse_shared_sites(self, requests):
+        """Merge start requests of schools that share one site into a single request.
+
+        District sites (ISD/USD) and platform-hosted parents (SportsEngine,
+        LeagueApps) are often the known URL of many schools. Requests with the
+        same callback and site_key are fetched once; meta["schools"] lists every
+        school sharing it and parse_staff_directory attributes contacts to them.
+        """
+        groups: dict[tuple, list] = {}
+        for request in requests:
+            groups.setdefault((site_key(request.url), request.callback), []).append(request)
+        for group in groups.values():
+            request = group[0]
+            if len(group) > 1:
+                request.meta["schools"] = [r.meta["school"] for r in group]
+                self.crawler.stats.inc_value("shared_sites/groups")
+                self.crawler.stats.inc_value("shared_sites/requests_saved", len(group) - 1)
+                logger.info(f"Shared site: {request.url} serves {len(group)} schools")
+            yield request
+
+    @staticmethod
+    def schools_for(response) -> list[dict]:
+        """Every school a response is crawled for (more than one on a shared site)."""
+        schools = response.meta.get("schools")
+        if schools:
+            return schools
+        school = response.meta.get("school")
+        return [school] if school else []
+
+    @staticmethod
+    def attribute_contact(result, schools) -> list[dict]:
+        """Schools a contact on a shared page belongs to.
+
+        A contact whose title/name context mentions a school's name is given to
+        that school only; anything unmatched goes to every school on the page.
+        """
+        if len(schools) < 2:
+            return schools
+        context = f"{result.get('context_title') or ''} {result.get('context_name') or ''}".lower()
+        matched = []
+        for school in schools:
+            stem = " ".join(SCHOOL_NAME_NOISE.sub(" ", school.get("name", "")).lower().split())
+            if stem and stem in context:
+                matched.append(school)
+        return matched or schools
+
+    def record_facts(self, response, **facts):
+        """Yield a SchoolFactsItem per school for facts not yet recorded for it in this run."""
+        for school in self.schools_for(response):
+            school_id = school.get("id")
+            if not school_id:
+                continue
+            new = {k: v for k, v in facts.items() if v and (school_id, k, v) not in self._facts_recorded}
+            if not new:
+                continue
+            self._facts_recorded.update((school_id, k, v) for k, v in new.items())
+            yield SchoolFactsItem(school_id=school_id, **new)
+
+    def record_staff_directory(self, response, results, page_url):
+        """Record `page_url` as a school's staff directory if it is the best page seen for the school.
+
+        Pages are ranked by their strong contacts (STAFF_DIRECTORY_MIN_CONFIDENCE
+        or better), and one needs STAFF_DIRECTORY_MIN_CONTACTS of them: a
+        contact page with the athletic director's address must not replace the
+        coaches' directory, as the next crawl fetches only that page.
+        """
+        settings = getattr(self, "settings", None)
+        min_contacts = settings.getint("STAFF_DIRECTORY_MIN_CONTACTS", 2) if settings is not None else 2
+        min_confidence = settings.getfloat("STAFF_DIRECTORY_MIN_CONFIDENCE", 0.8) if settings is not None else 0.8
+        strong = sum(1 for r in results if r["confidence"] >= min_confidence)
+        if strong < min_contacts:
+            return
+        for school in self.schools_for(response):
+            school_id = school.get("id")
+            if not school_id or strong <= self._directory_contacts.get(school_id, 0):
+                continue
+            self._directory_contacts[school_id] = strong
+            yield SchoolFactsItem(school_id=school_id, staff_directory_url=page_url, staff_directory_contacts=strong)
+
+    def discover_staff_pages(self, response, suffixes):
+        """Request the likely staff pages of a site whose homepage had no staff link.
+
+        The host's sitemaps (from robots.txt, else /sitemap.xml) are fetched once
+        and their URLs ranked by PageClassifier.score_sitemap_url; the best few
+        are requested. Blind `suffixes` probing is only used when the sitemaps
+        are missing or contain nothing that looks like a staff page. Schools on
+        a host whose sitemaps are still being read wait for the same result.
+        """
+        base = response.url.rstrip("/")
+        fallback = [
+            scrapy.Request(base + suffix, callback=self.parse_staff_directory,
+                           meta={**response.meta, "staff_probe": True}, errback=self.handle_error,
+                           priority=self.priority_for(response.meta, "suffix_probe"))
+            for suffix in suffixes
+        ]
+        if not self.settings.getbool("SITEMAP_DISCOVERY_ENABLED", True):
+            yield from fallback
+            return
+
+        parsed = urlparse(response.url)
+        host = parsed.hostname or ""
+        state = self._sitemaps.get(host)
+        if state is None:
+            # Sitemap fetches run at the priority of the staff pages they stand in for
+            state = self._sitemaps[host] = {
+                "pending": 1, "followed": 0, "urls": set(), "waiters": [],
+                "priority": self.priority_for(response.meta, "scored_link"),
+            }
+            origin = f"{parsed.scheme}://{parsed.netloc}"
+            yield scrapy.Request(
+                origin + "/robots.txt",
+                callback=self.parse_robots_sitemaps,
+                errback=self.sitemap_failed,
+                meta={"sitemap_host": host, "sitemap_origin": origin, "sitemap_robots": True},
+                priority=state["priority"],
+                dont_filter=True,
+            )
+        if state["pending"]:
+            state["waiters"].append((response.meta, fallback))
+        else:
+            yield from self._sitemap_staff_requests(state, response.meta, fallback)
+
+    def _sitemap_request(self, url, host):
+        return scrapy.Request(
+            url,
+            callback=self.parse_sitemap,
+            errback=self.sitemap_failed,
+            meta={"sitemap_host": host, "download_maxsize": self.settings.getint("SITEMAP_MAX_SIZE", 10 * 1024 * 1024)},
+            priority=self._sitemaps[host]["priority"],
+            dont_filter=True,
+        )
+
+    def parse_robots_sitemaps(self, response):
+        host = response.meta["sitemap_host"]
+        state = self._sitemaps[host]
+        urls = sitemaps_from_robots(response.text)[:self.settings.getint("SITEMAP_MAX_FOLLOW", 5)]
+        if not urls:
+            urls = [response.meta["sitemap_origin"] + "/sitemap.xml"]
+        state["pending"] += len(urls)
+        state["followed"] += len(urls)
+        for url in urls:
+            yield self._sitemap_request(url, host)
+        yield from self._sitemap_done(host)
+
+    def parse_sitemap(self, response):
+        host = response.meta["sitemap_host"]
+        state = self._sitemaps[host]
+        self.crawler.stats.inc_value("sitemap/fetched")
+        children = []
+        for kind, loc in iter_sitemap(response.body):
+            if kind == "sitemap":
+                children.append(loc)
+            elif (urlparse(loc).hostname or "").removeprefix("www.") == host.removeprefix("www."):
+                if self.page_classifier.score_sitemap_url(loc) > 0:
+                    state["urls"].add(loc)
+
+        # Page sitemaps first; post/news/event/product sitemaps rarely list staff pages
+        children.sort(key=lambda url: any(word in url.lower() for word in ("post", "news", "event", "product", "tag")))
+        budget = self.settings.getint("SITEMAP_MAX_FOLLOW", 5) - state["followed"]
+        for url in children[:max(budget, 0)]:
+            state["pending"] += 1
+            state["followed"] += 1
+            yield self._sitemap_request(url, host)
+        yield from self._sitemap_done(host)
+
+    def sitemap_failed(self, failure):
+        meta = failure.request.meta
+        host = meta["sitemap_host"]
+        if meta.get("sitemap_robots"):
+            # No robots.txt — try the conventional location instead
+            self._sitemaps[host]["pending"] += 1
+            self._sitemaps[host]["followed"] += 1
+            yield self._sitemap_request(meta["sitemap_origin"] + "/sitemap.xml", host)
+        yield from self._sitemap_done(host)
+
+    def _sitemap_done(self, host):
+        """Count one finished robots/sitemap fetch; once none are left, release waiting schools."""
+        state = self._sitemaps[host]
+        state["pending"] -= 1
+        if state["pending"]:
+            return
+        waiters, state["waiters"] = state["waiters"], []
+        for meta, fallback in waiters:
+            yield from self._sitemap_staff_requests(state, meta, fallback)
+
+    def _sitemap_staff_requests(self, state, meta, fallback):
+        ranked = self.page_classifier.rank_sitemap_urls(state["urls"], self.settings.getint("SITEMAP_MAX_CANDIDATES", 3))
+        if not ranked:
+            self.crawler.stats.inc_value("sitemap/fallback_to_suffixes")
+            yield from fallback
+            return
+        self.crawler.stats.inc_value("sitemap/hits")
+        self.crawler.stats.inc_value("sitemap/requests_saved", max(len(fallback) - len(ranked), 0))
+        for candidate in ranked:
+            yield scrapy.Request(candidate["url"], callback=self.parse_staff_directory, meta=meta,
+                                 errback=self.handle_error, priority=self.priority_for(meta, "scored_link"))
+
+    def handle_error(self, failure):
+        logger.debug(f"Request failed: {failure.request.url}")
+
+    @staticmethod
+    def page_adapter(response):
+        """The adapter for the page as received: the one it was fetched for, else whichever recognises it."""
+        if not isinstance(response, TextResponse):
+            return None
+        return adapter_for(response.meta.get("adapter")) or detect_adapter(response)
+
+    def platform_site_requests(self, response, adapter, min_confidence=0.15):
+        """For a platform site's homepage: its adapter's contacts, or its one or two staff pages without a browser.
+
+        Returns False, having yielded nothing, when the adapter finds no staff
+        pages to plan; the caller then discovers them as for any other site.
+        """
+        records = adapter.parse(response)
+        if records:
+            # The homepage itself lists the contacts
+            yield from self.contact_items(response, records, response.url)
+            return True
+        urls = adapter.staff_links(response)
+        if not urls:
+            return False
+        yield self.adapter_request(adapter, urls, response.meta, kind="scored_link")
+        # Also check if the homepage itself has contacts
+        if self.page_classifier.is_staff_directory_page(response) > min_confidence:
+            yield from self.parse_staff_directory(response)
+        return True
+
+    def adapter_request(self, adapter, urls, meta, kind="staff_directory"):
+        """Plain-HTTP request for a platform adapter's first planned staff page; the rest are fallbacks."""
+        first, *rest = urls
+        meta = {**meta, "playwright": False, "adapter": adapter.platform, "adapter_urls": rest}
+        return scrapy.Request(first, callback=self.parse_adapter_page, errback=self.adapter_page_failed,
+                              meta=meta, priority=self.priority_for(meta, kind))
+
+    @staticmethod
+    def next_adapter_request(request):
+        urls = request.meta.get("adapter_urls")
+        if not urls:
+            return None
+        meta = {k: v for k, v in request.meta.items() if k not in ("render_tier", "playwright_page_methods")}
+        return request.replace(url=urls[0], meta={**meta, "playwright": False, "adapter_urls": urls[1:]})
+
+    def parse_adapter_page(self, response):
+        """Contacts read by the page's platform adapter, without a browser where possible.
+
+        When the adapter finds nothing, an app shell is rendered once (as is
+        the last planned page of an adapter with render_when_empty); otherwise
+        the page gets generic extraction, and if that finds nothing too the
+        adapter's next planned page is fetched.
+        """
+        if response.meta.get("captured_json"):
+            yield from self.parse_staff_directory(response)
+            return
+        adapter = adapter_for(response.meta.get("adapter"))
+        rendered = bool(response.meta.get("playwright"))
+        records = adapter.parse(response) if adapter else []
+        if records:
+            self.crawler.stats.inc_value(f"adapters/{adapter.platform}/{'rendered' if rendered else 'static'}")
+            logger.info(f"{adapter.platform}: {len(records)} contacts at {response.url}")
+            yield from self.contact_items(response, records, response.url)
+            return
+
+        last = not response.meta.get("adapter_urls")
+        if adapter and not rendered and (needs_js_render(response.body) or (adapter.render_when_empty and last)):
+            self.crawler.stats.inc_value(f"adapters/{adapter.platform}/render_fallback")
+            yield response.request.replace(
+                meta={
+                    **response.meta,
+                    "playwright": True,
+                    "playwright_page_methods": [PageMethod(wait_until_rendered, adapter.render_selector)],
+                    # Already fetched statically; don't let RenderTierMiddleware try again
+                    "render_tier": TIER_RENDER,
+                },
+                dont_filter=True,
+            )
+            return
+
+        found = False
+        for item in self.parse_staff_directory(response):
+            found = found or isinstance(item, CoachItem)
+            yield item
+        if not found:
+            following = self.next_adapter_request(response.request)
+            if following is not None:
+                yield following
+
+    def adapter_page_failed(self, failure):
+        following = self.next_adapter_request(failure.request)
+        if following is not None:
+            yield following
+        else:
+            self.handle_error(failure)
 
     def detect_platform(self, response) -> str:
-        """Detect if page is SIDEARM, PrestoSports, SportsEngine, or other."""
+        """Detect the site platform: a registered adapter's (SIDEARM, PrestoSports, ...), Wix, Squarespace or custom."""
+        adapter = detect_adapter(response)
+        if adapter is not None:
+            return adapter.platform
         body = response.text[:5000].lower()
-        if "sidearm" in body or "sidearmsports" in body:
-            return "sidearm"
-        if "prestosports" in body or "presto" in body:
-            return "prestosports"
-        if "sportsengine" in body or "se-page" in body or ".sportsengine.com" in body:
-            return "sportsengine"
-        if "leagueapps" in body or ".leagueapps.com" in body:
-            return "leagueapps"
         if "wix.com" in body or "wixsite" in body:
             return "wix"
         if "squarespace" in body or "sqsp" in body:
@@ -55,36 +761,73 @@ class BaseStaffSpider(scrapy.Spider):
     def parse_staff_directory(self, response):
         """Extract coaches from a staff directory page.
 
-        Override in subclasses for platform-specific parsing.
+        Staff that JsonCaptureMiddleware read from the page's JSON data calls
+        (or from the remembered endpoint, fetched directly) is used instead of
+        the DOM. Otherwise the page goes to the platform adapter that
+        recognises it, and to generic extraction when there is none or it
+        finds nothing.
+        """
+        captured = response.meta.get("captured_json")
+        if captured:
+            results = [record for payload in captured for record in payload["records"]]
+            page_url = response.meta.get("staff_json", {}).get("page", response.request.url)
+        else:
+            page_url = response.url
+            adapter = self.page_adapter(response)
+            results = adapter.parse(response) if adapter else []
+            if results:
+                self.crawler.stats.inc_value(f"adapters/{adapter.platform}/dispatched")
+            else:
+                results = self.email_extractor.extract_with_context(response, response.url)
+        yield from self.contact_items(response, results, page_url)
+
+    def contact_items(self, response, results, page_url):
+        """CoachItems, and the school's staff directory fact, for contacts found on a staff page.
+
+        `results` have the EmailExtractor.extract_with_context shape; platform
+        adapters and JSON capture produce the same records.
         """
         school_meta = response.meta.get("school", {})
-        results = self.email_extractor.extract_with_context(response, response.url)
+        budget = self.school_budget
+        if budget is not None and school_meta.get("id") and results:
+            if budget.record_page(school_meta["id"], [r["confidence"] for r in results]):
+                # Siblings still queued for this school are dropped by SchoolBudgetMiddleware
+                self.crawler.stats.inc_value("school_budget/stopped/enough_coaches")
+                logger.info(f"School budget: {school_meta.get('name')} satisfied by {response.url}")
+
+        if results:
+            yield from self.record_staff_directory(response, results, page_url)
+        if self.discover_only:
+            return
 
+        schools = self.schools_for(response) or [school_meta]
         for result in results:
             name_parts = self.name_extractor.parse(result.get("context_name"))
             role = self.role_extractor.classify(result.get("context_title"))
             sport = self.sport_classifier.classify(result.get("context_title") or "")
+            if not sport and result.get("context_sport"):
+                sport = self.sport_classifier.classify(result["context_sport"])
             if not sport:
-                sport = self.sport_classifier.classify_from_url(response.url)
-
-            item = CoachItem(
-                email=result["email"],
-                email_hash=email_hash(result["email"]),
-                first_name=name_parts["first_name"],
-                last_name=name_parts["last_name"],
-                full_name=name_parts["full_name"],
-                title=result.get("context_title"),
-                role_category=role,
-                sport=result.get("context_title"),
-                sport_normalized=sport,
-                school_id=school_meta.get("id"),
-                school_name=school_meta.get("name", ""),
-                level=school_meta.get("level", self.level or ""),
-                sub_level=school_meta.get("sub_level", self.sub_level or ""),
-                state=school_meta.get("state", self.state or ""),
-                source_url=response.url,
-                confidence_score=result["confidence"],
-            )
-            yield item
+                sport = self.sport_classifier.classify_from_url(page_url)
+
+            for school in self.attribute_contact(result, schools):
+                yield CoachItem(
+                    email=result["email"],
+                    email_hash=email_hash(result["email"]),
+                    first_name=name_parts["first_name"],
+                    last_name=name_parts["last_name"],
+                    full_name=name_parts["full_name"],
+                    title=result.get("context_title"),
+                    role_category=role,
+                    sport=result.get("context_title"),
+                    sport_normalized=sport,
+                    school_id=school.get("id"),
+                    school_name=school.get("name", ""),
+                    level=school.get("level", self.level or ""),
+                    sub_level=school.get("sub_level", self.sub_level or ""),
+                    state=school.get("state", self.state or ""),
+                    source_url=page_url,
+                    confidence_score=result["confidence"],
+                )
 
         logger.info(f"Extracted {len(results)} contacts from {response.url}")
@@ -2,6 +2,7 @@ import scrapy
 import logging
 from urllib.parse import urlparse
 
+from coach_crawler.adapters import adapter_for
 from coach_crawler.models import SessionLocal, School
 from coach_crawler.scrapy_project.spiders.base_staff_spider import BaseStaffSpider
 
@@ -30,70 +31,80 @@ class CollegeStaffSpider(BaseStaffSpider):
 
     name = "college_staff"
 
+    def school_query(self, session):
+        query = session.query(School).filter(School.level == "college")
+
+        if self.division:
+            query = query.filter(School.division == self.division)
+        if self.state:
+            query = query.filter(School.state == self.state)
+
+        query = query.filter(self.status_filter())
+
+        if self.discover_only:
+            # Facts already known — nothing left to discover for these
+            query = query.filter(School.staff_directory_url.is_(None))
+        return query
+
     def start_requests(self):
         session = SessionLocal()
         try:
-            query = session.query(School).filter(School.level == "college")
-
-            if self.division:
-                query = query.filter(School.division == self.division)
-            if self.state:
-                query = query.filter(School.state == self.state)
-
-            query = query.filter(School.crawl_status.in_(["pending", "failed"]))
-            query = query.order_by(School.id)
-
-            if self.limit:
-                query = query.limit(self.limit)
-
-            schools = query.all()
-            logger.warning(f"Starting crawl for {len(schools)} schools")
-
-            for school in schools:
-                meta = {
-                    "school": {
-                        "id": school.id,
-                        "name": school.name,
-                        "level": school.level,
-                        "sub_level": school.sub_level,
-                        "state": school.state,
-                        "division": school.division,
+            query = self.school_query(session)
+
+            logger.warning(f"Starting crawl for {self.count_schools(query)} schools")
+
+            for schools in self.stream_schools(query):
+                known = []
+                for school in schools:
+                    meta = {
+                        "school": {
+                            "id": school.id,
+                            "name": school.name,
+                            "level": school.level,
+                            "sub_level": school.sub_level,
+                            "state": school.state,
+                            "division": school.division,
+                        },
+                        "school_priority": self.planned_priority(school),
                     }
-                }
-
-                if school.staff_directory_url:
-                    yield scrapy.Request(
-                        school.staff_directory_url,
-                        callback=self.parse_staff_directory,
-                        meta=meta,
-                        errback=self.handle_error,
-                        dont_filter=True,
-                    )
-                elif school.athletics_url:
-                    # Try staff directory first, fall back to homepage
-                    url = school.athletics_url.rstrip("/")
-                    yield scrapy.Request(
-                        url + "/staff-directory",
-                        callback=self.parse_staff_directory,
-                        meta={**meta, "athletics_home": url},
-                        errback=self.handle_staff_dir_error,
-                        dont_filter=True,
-                    )
-                else:
-                    # No URL at all — try to Google it or skip
-                    # For now, try common patterns based on school name
-                    name_slug = school.slug.replace("-", "")
-                    for pattern in [
-                        f"https://{name_slug}athletics.com/staff-directory",
-                        f"https://www.{name_slug}.edu/athletics/staff-directory",
-                    ]:
-                        yield scrapy.Request(
-                            pattern,
+
+                    if school.staff_directory_url:
+                        known.append(scrapy.Request(
+                            school.staff_directory_url,
                             callback=self.parse_staff_directory,
                             meta=meta,
+                            priority=self.priority_for(meta, "staff_directory"),
                             errback=self.handle_error,
                             dont_filter=True,
-                        )
+                        ))
+                    elif school.athletics_url:
+                        # Try staff directory first, fall back to homepage
+                        url = school.athletics_url.rstrip("/")
+                        known.append(scrapy.Request(
+                            url + "/staff-directory",
+                            callback=self.parse_staff_directory,
+                            meta={**meta, "athletics_home": url},
+                            priority=self.priority_for(meta, "homepage"),
+                            errback=self.handle_staff_dir_error,
+                            dont_filter=True,
+                        ))
+                    else:
+                        # No URL at all — try to Google it or skip
+                        # For now, try common patterns based on school name
+                        name_slug = school.slug.replace("-", "")
+                        for pattern in [
+                            f"https://{name_slug}athletics.com/staff-directory",
+                            f"https://www.{name_slug}.edu/athletics/staff-directory",
+                        ]:
+                            yield scrapy.Request(
+                                pattern,
+                                callback=self.parse_staff_directory,
+                                meta=meta,
+                                priority=self.priority_for(meta, "suffix_probe"),
+                                errback=self.handle_error,
+                                dont_filter=True,
+                            )
+                yield from self.collapse_shared_sites(known)
         finally:
             session.close()
 
@@ -106,12 +117,21 @@ class CollegeStaffSpider(BaseStaffSpider):
                 athletics_home,
                 callback=self.parse_athletics_home,
                 meta=meta,
+                priority=self.priority_for(meta, "homepage"),
                 errback=self.handle_error,
                 dont_filter=True,
             )
 
     def parse_athletics_home(self, response):
         """Find staff directory link from athletics homepage."""
+        platform = self.detect_platform(response)
+        yield from self.record_facts(response, website_platform=platform)
+        adapter = adapter_for(platform)
+        if adapter is not None:
+            planned = yield from self.platform_site_requests(response, adapter)
+            if planned:
+                return
+
         candidates = self.page_classifier.find_staff_directory_links(response)
 
         if candidates:
@@ -120,18 +140,13 @@ class CollegeStaffSpider(BaseStaffSpider):
                 best["url"],
                 callback=self.parse_staff_directory,
                 meta=response.meta,
+                priority=self.priority_for(response.meta, "scored_link"),
                 errback=self.handle_error,
             )
         else:
-            # Try common suffixes
-            base = response.url.rstrip("/")
-            for suffix in STAFF_DIR_SUFFIXES[1:]:  # skip /staff-directory, already tried
-                yield scrapy.Request(
-                    base + suffix,
-                    callback=self.parse_staff_directory,
-                    meta=response.meta,
-                    errback=self.handle_error,
-                )
+            # Check the sitemap, falling back to common suffixes
+            # (skip /staff-directory, already tried)
+            yield from self.discover_staff_pages(response, STAFF_DIR_SUFFIXES[1:])
 
             # Also check if current page has emails
             confidence = self.page_classifier.is_staff_directory_page(response)
@@ -3,7 +3,9 @@ import scrapy
 import logging
 from urllib.parse import urlparse
 
+from coach_crawler.adapters import adapter_for
 from coach_crawler.models import SessionLocal, School
+from coach_crawler.planning import is_aggregator_url
 from coach_crawler.scrapy_project.spiders.base_staff_spider import BaseStaffSpider
 
 logger = logging.getLogger(__name__)
@@ -57,95 +59,106 @@ class HighSchoolStaffSpider(BaseStaffSpider):
         slug = re.sub(r'\s+', '-', slug)
         return slug.strip('-')
 
+    def school_query(self, session):
+        query = session.query(School).filter(
+            School.level == "high_school",
+            self.status_filter(),
+        )
+
+        if self.sub_level:
+            query = query.filter(School.sub_level == self.sub_level)
+        if self.state:
+            query = query.filter(School.state == self.state)
+        if self.discover_only:
+            # Facts already known — nothing left to discover for these
+            query = query.filter(School.staff_directory_url.is_(None))
+        return query
+
     def start_requests(self):
         session = SessionLocal()
         try:
-            query = session.query(School).filter(
-                School.level == "high_school",
-                School.crawl_status.in_(["pending", "failed"]),
-            )
-
-            if self.sub_level:
-                query = query.filter(School.sub_level == self.sub_level)
-            if self.state:
-                query = query.filter(School.state == self.state)
-            if self.limit:
-                query = query.limit(self.limit)
-
-            schools = query.all()
-            logger.warning(f"Starting HS crawl for {len(schools)} schools")
-
-            for school in schools:
-                meta = {
-                    "school": {
-                        "id": school.id,
-                        "name": school.name,
-                        "level": school.level,
-                        "sub_level": school.sub_level,
-                        "state": school.state,
-                    },
-                    "tried_urls": set(),
-                }
-
-                # If we have a direct staff directory URL, use it
-                if school.staff_directory_url:
-                    yield scrapy.Request(
-                        school.staff_directory_url,
-                        callback=self.parse_staff_directory,
-                        meta=meta,
-                        errback=self.handle_error,
-                        dont_filter=True,
-                    )
-                    continue
-
-                # If the URL is a real school website (not MaxPreps), try it
-                url = school.athletics_url or ""
-                if url and "maxpreps.com" not in url:
-                    yield scrapy.Request(
-                        url,
-                        callback=self.parse_school_home,
-                        meta=meta,
-                        errback=self.handle_error,
-                        dont_filter=True,
-                    )
-                    continue
-
-                # Construct likely school website URLs from name + state
-                slug = self._make_url_slug(school.name)
-                hyphen_slug = self._make_hyphen_slug(school.name)
-                state_lower = (school.state or "").lower()
-
-                if not slug:
-                    continue
-
-                urls_to_try = []
-
-                # State-specific patterns
-                state_upper = (school.state or "").upper()
-                if state_upper in STATE_DISTRICT_PATTERNS:
-                    for pattern in STATE_DISTRICT_PATTERNS[state_upper]:
-                        urls_to_try.append(pattern.format(slug=slug, state_lower=state_lower))
-
-                # General patterns
-                for pattern in HS_URL_PATTERNS:
-                    urls_to_try.append(pattern.format(slug=slug, state_lower=state_lower))
-
-                # Also try hyphenated k12 domain
-                urls_to_try.append(f"https://www.{hyphen_slug}.k12.{state_lower}.us")
-
-                # Yield first URL, store rest as fallbacks
-                if urls_to_try:
-                    meta["fallback_urls"] = urls_to_try[1:]
-                    yield scrapy.Request(
-                        urls_to_try[0],
-                        callback=self.parse_school_home,
-                        meta=meta,
-                        errback=self.try_next_url,
-                        dont_filter=True,
-                    )
+            query = self.school_query(session)
+
+            logger.warning(f"Starting HS crawl for {self.count_schools(query)} schools")
+
+            for schools in self.stream_schools(query):
+                known = []
+                guessed = []
+                for school in schools:
+                    meta = {
+                        "school": {
+                            "id": school.id,
+                            "name": school.name,
+                            "level": school.level,
+                            "sub_level": school.sub_level,
+                            "state": school.state,
+                        },
+                        "tried_urls": set(),
+                        "school_priority": self.planned_priority(school),
+                    }
+
+                    # If we have a direct staff directory URL, use it
+                    if school.staff_directory_url:
+                        known.append(scrapy.Request(
+                            school.staff_directory_url,
+                            callback=self.parse_staff_directory,
+                            meta=meta,
+                            priority=self.priority_for(meta, "staff_directory"),
+                            errback=self.handle_error,
+                            dont_filter=True,
+                        ))
+                        continue
+
+                    # If the URL is a real school website (not MaxPreps), try it
+                    url = school.athletics_url or ""
+                    if url and not is_aggregator_url(url):
+                        known.append(scrapy.Request(
+                            url,
+                            callback=self.parse_school_home,
+                            meta=meta,
+                            priority=self.priority_for(meta, "homepage"),
+                            errback=self.handle_error,
+                            dont_filter=True,
+                        ))
+                        continue
+
+                    # Construct likely school website URLs from name + state;
+                    # these are resolved in bulk before any request goes out
+                    urls_to_try = self._guess_urls(school)
+                    if urls_to_try:
+                        guessed.append((meta, urls_to_try))
+
+                # Schools sharing a district site are fetched once
+                yield from self.collapse_shared_sites(known)
+                yield from self.start_guessed_requests(guessed, self.parse_school_home, self.try_next_url)
         finally:
             session.close()
 
+    def _guess_urls(self, school) -> list[str]:
+        """Likely website URLs for a school with no known URL, most likely first."""
+        slug = self._make_url_slug(school.name)
+        hyphen_slug = self._make_hyphen_slug(school.name)
+        state_lower = (school.state or "").lower()
+
+        if not slug:
+            return []
+
+        urls_to_try = []
+
+        # State-specific patterns
+        state_upper = (school.state or "").upper()
+        if state_upper in STATE_DISTRICT_PATTERNS:
+            for pattern in STATE_DISTRICT_PATTERNS[state_upper]:
+                urls_to_try.append(pattern.format(slug=slug, state_lower=state_lower))
+
+        # General patterns
+        for pattern in HS_URL_PATTERNS:
+            urls_to_try.append(pattern.format(slug=slug, state_lower=state_lower))
+
+        # Also try hyphenated k12 domain
+        urls_to_try.append(f"https://www.{hyphen_slug}.k12.{state_lower}.us")
+        return urls_to_try
+
     def try_next_url(self, failure):
         """On failure, try the next URL in the fallback list."""
         meta = failure.request.meta
@@ -158,12 +171,22 @@ class HighSchoolStaffSpider(BaseStaffSpider):
                 next_url,
                 callback=self.parse_school_home,
                 meta=meta,
+                priority=self.priority_for(meta, "homepage"),
                 errback=self.try_next_url,
                 dont_filter=True,
             )
 
     def parse_school_home(self, response):
         """Found a school website — look for staff/coaches pages."""
+        yield from self.accept_guessed_home(response)
+        platform = self.detect_platform(response)
+        yield from self.record_facts(response, website_platform=platform)
+        adapter = adapter_for(platform)
+        if adapter is not None:
+            planned = yield from self.platform_site_requests(response, adapter, min_confidence=0.3)
+            if planned:
+                return
+
         # First check if this page itself has emails
         confidence = self.page_classifier.is_staff_directory_page(response)
         if confidence > 0.3:
@@ -179,19 +202,13 @@ class HighSchoolStaffSpider(BaseStaffSpider):
                 best["url"],
                 callback=self.parse_staff_directory,
                 meta=response.meta,
+                priority=self.priority_for(response.meta, "scored_link"),
                 errback=self.handle_error,
             )
             return
 
-        # Try common staff page suffixes on this domain
-        base = response.url.rstrip("/")
-        for suffix in STAFF_SUFFIXES:
-            yield scrapy.Request(
-                base + suffix,
-                callback=self.parse_staff_directory,
-                meta=response.meta,
-                errback=self.handle_error,
-            )
+        # Check the sitemap, falling back to common staff page suffixes on this domain
+        yield from self.discover_staff_pages(response, STAFF_SUFFIXES)
 
     def handle_error(self, failure):
         logger.debug(f"HS request failed: {failure.request.url}")
@@ -30,6 +30,8 @@ class LeagueAppsSeedSpider(BaseSeedSpider):
     """
 
     name = "leagueapps_seed"
+    # Platform allowlist for resource blocking on rendered pages
+    render_platform = "leagueapps"
 
     custom_settings = {
         **BaseSeedSpider.custom_settings,
@@ -31,6 +31,8 @@ class SportsEngineSeedSpider(BaseSeedSpider):
     """
 
     name = "sportsengine_seed"
+    # Platform allowlist for resource blocking on rendered pages
+    render_platform = "sportsengine"
 
     custom_settings = {
         **BaseSeedSpider.custom_settings,
@@ -2,6 +2,7 @@ import re
 import scrapy
 import logging
 
+from coach_crawler.adapters import adapter_for
 from coach_crawler.models import SessionLocal, School
 from coach_crawler.scrapy_project.spiders.base_staff_spider import BaseStaffSpider
 
@@ -51,70 +52,77 @@ class YouthStaffSpider(BaseStaffSpider):
         slug = re.sub(r'\s+', '', slug)
         return slug
 
+    def school_query(self, session):
+        query = session.query(School).filter(
+            School.level == "youth",
+            self.status_filter(),
+        )
+
+        if self.sub_level:
+            query = query.filter(School.sub_level == self.sub_level)
+        if self.state:
+            query = query.filter(School.state == self.state)
+        if self.discover_only:
+            # Facts already known — nothing left to discover for these
+            query = query.filter(School.staff_directory_url.is_(None))
+        return query
+
     def start_requests(self):
         session = SessionLocal()
         try:
-            query = session.query(School).filter(
-                School.level == "youth",
-                School.crawl_status.in_(["pending", "failed"]),
-            )
-
-            if self.sub_level:
-                query = query.filter(School.sub_level == self.sub_level)
-            if self.state:
-                query = query.filter(School.state == self.state)
-            if self.limit:
-                query = query.limit(self.limit)
-
-            schools = query.all()
-            logger.info(f"Starting youth crawl for {len(schools)} organizations")
-
-            for school in schools:
-                meta = {
-                    "school": {
-                        "id": school.id,
-                        "name": school.name,
-                        "level": school.level,
-                        "sub_level": school.sub_level,
-                        "state": school.state,
-                    },
-                    "depth": 0,
-                }
-
-                # Direct staff directory URL — best case
-                if school.staff_directory_url:
-                    yield scrapy.Request(
-                        school.staff_directory_url,
-                        callback=self.parse_staff_directory,
-                        meta={**meta, "playwright": True, "playwright_include_page": False},
-                        errback=self.handle_error,
-                    )
-                    continue
-
-                # Has a homepage/athletics URL
-                if school.athletics_url:
-                    yield scrapy.Request(
-                        school.athletics_url,
-                        callback=self.parse_youth_home,
-                        meta={**meta, "playwright": True, "playwright_include_page": False},
-                        errback=self.handle_error,
-                    )
-                    continue
-
-                # No URL — try domain guessing
-                slug = self._make_url_slug(school.name)
-                if not slug:
-                    continue
-
-                urls_to_try = [p.format(slug=slug) for p in YOUTH_URL_PATTERNS]
-                meta["fallback_urls"] = urls_to_try[1:]
-                yield scrapy.Request(
-                    urls_to_try[0],
-                    callback=self.parse_youth_home,
-                    meta=meta,
-                    errback=self.try_next_url,
-                    dont_filter=True,
-                )
+            query = self.school_query(session)
+
+            logger.info(f"Starting youth crawl for {self.count_schools(query)} organizations")
+
+            for schools in self.stream_schools(query):
+                known = []
+                guessed = []
+                for school in schools:
+                    meta = {
+                        "school": {
+                            "id": school.id,
+                            "name": school.name,
+                            "level": school.level,
+                            "sub_level": school.sub_level,
+                            "state": school.state,
+                        },
+                        "depth": 0,
+                        "school_priority": self.planned_priority(school),
+                        "website_platform": school.website_platform,
+                    }
+
+                    # Direct staff directory URL — best case
+                    if school.staff_directory_url:
+                        known.append(scrapy.Request(
+                            school.staff_directory_url,
+                            callback=self.parse_staff_directory,
+                            meta={**meta, "playwright": True, "playwright_include_page": False},
+                            priority=self.priority_for(meta, "staff_directory"),
+                            errback=self.handle_error,
+                        ))
+                        continue
+
+                    # Has a homepage/athletics URL
+                    if school.athletics_url:
+                        known.append(scrapy.Request(
+                            school.athletics_url,
+                            callback=self.parse_youth_home,
+                            meta={**meta, "playwright": True, "playwright_include_page": False},
+                            priority=self.priority_for(meta, "homepage"),
+                            errback=self.handle_error,
+                        ))
+                        continue
+
+                    # No URL — try domain guessing, resolved in bulk before requesting
+                    slug = self._make_url_slug(school.name)
+                    if not slug:
+                        continue
+
+                    guessed.append((meta, [p.format(slug=slug) for p in YOUTH_URL_PATTERNS]))
+
+                # Orgs sharing a SportsEngine/LeagueApps parent site are fetched once
+                yield from self.collapse_shared_sites(known)
+                yield from self.start_guessed_requests(guessed, self.parse_youth_home, self.try_next_url)
         finally:
             session.close()
 
@@ -130,6 +138,7 @@ class YouthStaffSpider(BaseStaffSpider):
                 next_url,
                 callback=self.parse_youth_home,
                 meta=meta,
+                priority=self.priority_for(meta, "homepage"),
                 errback=self.try_next_url,
                 dont_filter=True,
             )
@@ -137,17 +146,14 @@ class YouthStaffSpider(BaseStaffSpider):
     def parse_youth_home(self, response):
         """Find coaching/staff/about pages from youth org homepage."""
         # Check platform for optimized parsing
+        yield from self.accept_guessed_home(response)
         platform = self.detect_platform(response)
-        if platform == "sportsengine":
-            yield from self._parse_platform_site(response, [
-                "/staff", "/contacts", "/about/staff", "/page/show/staff",
-            ])
-            return
-        if platform == "leagueapps":
-            yield from self._parse_platform_site(response, [
-                "/staff", "/contacts", "/about", "/coaches",
-            ])
-            return
+        yield from self.record_facts(response, website_platform=platform)
+        adapter = adapter_for(platform) or adapter_for(response.meta.get("website_platform"))
+        if adapter is not None:
+            planned = yield from self.platform_site_requests(response, adapter)
+            if planned:
+                return
 
         # Try page classifier first — finds scored staff directory links
         candidates = self.page_classifier.find_staff_directory_links(response)
@@ -157,6 +163,7 @@ class YouthStaffSpider(BaseStaffSpider):
                 best["url"],
                 callback=self.parse_staff_directory,
                 meta=response.meta,
+                priority=self.priority_for(response.meta, "scored_link"),
                 errback=self.handle_error,
             )
             return
@@ -186,36 +193,15 @@ class YouthStaffSpider(BaseStaffSpider):
                         full_url,
                         callback=self.parse_staff_directory,
                         meta=response.meta,
+                        priority=self.priority_for(response.meta, "keyword_link"),
                         errback=self.handle_error,
                     )
 
         if found_any:
             return
 
-        # Try common staff page suffixes
-        base = response.url.rstrip("/")
-        for suffix in YOUTH_STAFF_SUFFIXES:
-            yield scrapy.Request(
-                base + suffix,
-                callback=self.parse_staff_directory,
-                meta=response.meta,
-                errback=self.handle_error,
-            )
-
-    def _parse_platform_site(self, response, staff_paths):
-        """For known platforms, try standardized staff page paths."""
-        base = response.url.rstrip("/")
-        for path in staff_paths:
-            yield scrapy.Request(
-                base + path,
-                callback=self.parse_staff_directory,
-                meta=response.meta,
-                errback=self.handle_error,
-            )
-        # Also check if the homepage itself has contacts
-        confidence = self.page_classifier.is_staff_directory_page(response)
-        if confidence > 0.15:
-            yield from self.parse_staff_directory(response)
+        # Check the sitemap, falling back to common staff page suffixes
+        yield from self.discover_staff_pages(response, YOUTH_STAFF_SUFFIXES)
 
     def handle_error(self, failure):
         logger.debug(f"Youth request failed: {failure.request.url}")
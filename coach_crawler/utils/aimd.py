@@ -0,0 +1,75 @@
+"""Additive-increase / multiplicative-decrease concurrency control per domain."""
+
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value, now: float | None = None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait."""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+class AIMDController:
+    """Concurrency limit for one domain.
+
+    Grows by roughly one request per window of healthy responses (fast and
+    mostly error-free), halves on 429/503/timeouts, and blocks the domain until
+    any Retry-After the server asked for has passed.
+    """
+
+    def __init__(self, concurrency: float = 1.0, min_concurrency: float = 1.0, max_concurrency: float = 8.0,
+                 target_latency: float = 3.0, decrease_factor: float = 0.5, max_error_rate: float = 0.1,
+                 window: int = 20, clock=time.time):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = min(max(concurrency, min_concurrency), max_concurrency)
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.max_error_rate = max_error_rate
+        self.clock = clock
+        self.blocked_until = 0.0
+        self.backoffs = 0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+
+    @property
+    def limit(self) -> int:
+        """Whole number of concurrent requests to allow right now."""
+        return max(int(self.concurrency), 1)
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def on_success(self, latency: float | None):
+        self._outcomes.append(True)
+        healthy = latency is None or latency <= self.target_latency
+        if healthy and self.error_rate() <= self.max_error_rate:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+
+    def on_backoff(self, retry_after: float | None = None):
+        """Record a 429/503/timeout; optionally block for `retry_after` seconds."""
+        self._outcomes.append(False)
+        self.backoffs += 1
+        self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, self.clock() + retry_after)
+
+    def wait_time(self) -> float:
+        """Seconds until the domain may be contacted again."""
+        return max(0.0, self.blocked_until - self.clock())
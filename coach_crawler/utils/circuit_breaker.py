@@ -0,0 +1,76 @@
+"""Per-host circuit breaker for hosts that keep failing at the connection level."""
+
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Track consecutive connection failures per host.
+
+    After `threshold` consecutive failures a host's circuit opens and requests
+    to it are refused. Once `cooldown` seconds have passed the circuit goes
+    half-open and lets a single probe through: success closes it, failure
+    re-opens it for another cooldown. A probe that ends without either (it was
+    ignored, redirected or dropped) is released, and one still unanswered
+    after `probe_timeout` seconds is given up on, so the next request probes.
+    """
+
+    def __init__(self, threshold: int = 3, cooldown: float = 300.0, probe_timeout: float = 120.0,
+                 clock=time.time):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self._failures: dict[str, int] = {}
+        self._state: dict[str, str] = {}
+        self._opened_at: dict[str, float] = {}
+        self._probe_started: dict[str, float] = {}
+
+    def state(self, host: str) -> str:
+        return self._state.get(host, CLOSED)
+
+    def allow(self, host: str) -> bool:
+        """Return True if a request to this host may go out now."""
+        state = self.state(host)
+        if state == CLOSED:
+            return True
+        if state == OPEN and self.clock() - self._opened_at[host] >= self.cooldown:
+            self._state[host] = HALF_OPEN
+            state = HALF_OPEN
+        if state == HALF_OPEN and not self._probe_pending(host):
+            self._probe_started[host] = self.clock()
+            return True
+        return False
+
+    def _probe_pending(self, host: str) -> bool:
+        started = self._probe_started.get(host)
+        return started is not None and self.clock() - started < self.probe_timeout
+
+    def release_probe(self, host: str):
+        """The half-open probe ended without showing whether the host is back; let the next request probe."""
+        self._probe_started.pop(host, None)
+
+    def record_success(self, host: str):
+        self._failures.pop(host, None)
+        self._state.pop(host, None)
+        self._opened_at.pop(host, None)
+        self._probe_started.pop(host, None)
+
+    def record_failure(self, host: str) -> bool:
+        """Count a failure; return True if this failure opened the circuit."""
+        self._probe_started.pop(host, None)
+        if self.state(host) == HALF_OPEN:
+            self._open(host)
+            return True
+        self._failures[host] = self._failures.get(host, 0) + 1
+        if self.state(host) == CLOSED and self._failures[host] >= self.threshold:
+            self._open(host)
+            return True
+        return False
+
+    def _open(self, host: str):
+        self._state[host] = OPEN
+        self._opened_at[host] = self.clock()
@@ -0,0 +1,132 @@
+"""Node-wide per-domain politeness budget shared by every crawler process.
+
+Each crawl started from the web UI or CLI runs in its own process, so Scrapy's
+per-domain delay only limits that one process. This module keeps a single
+"next free dispatch slot" timestamp per domain in Redis; every process reserves
+its slot there before downloading, so concurrent jobs split a domain's budget
+instead of each spending the full amount.
+"""
+
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Atomically reserve the next slot for a domain and return how long to wait.
+# Numbers are returned as strings because Redis truncates Lua floats to integers.
+_RESERVE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local ttl_ms = tonumber(ARGV[3])
+local nxt = tonumber(redis.call('GET', KEYS[1]) or '0')
+local slot = math.max(now, nxt)
+redis.call('SET', KEYS[1], tostring(slot + interval), 'PX', ttl_ms)
+return tostring(slot - now)
+"""
+
+
+def match_domain(host: str, domains) -> str | None:
+    """Return the configured domain that `host` belongs to (suffix match), if any."""
+    host = host.lower().split(":")[0]
+    for domain in domains:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return None
+
+
+class LocalSlotStore:
+    """In-process slot store, used for tests and when Redis is unreachable."""
+
+    blocking = False
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._next: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, interval: float) -> float:
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next.get(key, 0.0))
+            self._next[key] = slot + interval
+            return slot - now
+
+
+class RedisSlotStore:
+    """Slot store backed by a Redis key per domain; each reservation is a network round trip."""
+
+    blocking = True
+    KEY_PREFIX = "coach_crawler:budget:"
+
+    def __init__(self, client, clock=time.time):
+        self.client = client
+        self.clock = clock
+        self._reserve = client.register_script(_RESERVE_SCRIPT)
+
+    def reserve(self, key: str, interval: float) -> float:
+        # Let idle keys expire a minute after their last reserved slot
+        ttl_ms = int((interval + 60) * 1000)
+        wait = self._reserve(keys=[self.KEY_PREFIX + key], args=[self.clock(), interval, ttl_ms])
+        return float(wait)
+
+    @classmethod
+    def from_url(cls, url: str):
+        import redis
+        client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        client.ping()
+        return cls(client)
+
+
+class SharedDomainBudget:
+    """Per-domain dispatch spacing shared across processes.
+
+    The interval for a domain comes from DOMAIN_RATE_LIMITS (delay divided by
+    allowed concurrency) or, for unlisted hosts, the default delay and
+    per-domain concurrency.
+    """
+
+    def __init__(self, store, rate_limits: dict | None = None, default_delay: float = 1.0,
+                 default_concurrency: int = 2):
+        self.store = store
+        self.rate_limits = rate_limits or {}
+        self.default_interval = default_delay / max(default_concurrency, 1)
+        # Longest suffix first so "foo.sportsengine.com" beats a shorter match
+        self._domains = sorted(self.rate_limits, key=len, reverse=True)
+        self._fallback_lock = threading.Lock()
+
+    def budget_key(self, url: str) -> tuple[str, float]:
+        """Return (key, interval) for the domain a URL is charged against."""
+        host = urlparse(url).netloc.lower().split(":")[0]
+        domain = match_domain(host, self._domains)
+        if domain:
+            limits = self.rate_limits[domain]
+            return domain, limits.get("delay", 0.0) / max(limits.get("concurrent", 1), 1)
+        return host, self.default_interval
+
+    def reserve(self, url: str) -> float:
+        """Reserve the next dispatch slot for this URL's domain; return seconds to wait."""
+        key, interval = self.budget_key(url)
+        if not key or interval <= 0:
+            return 0.0
+        store = self.store
+        try:
+            return store.reserve(key, interval)
+        except Exception as e:
+            # Redis went away mid-crawl: keep crawling with a per-process budget.
+            # Reservations run in pool threads, so only the first failure swaps the store.
+            with self._fallback_lock:
+                if self.store is store:
+                    logger.warning(f"Shared budget store failed ({e}); falling back to local budget")
+                    self.store = LocalSlotStore()
+            return self.store.reserve(key, interval)
+
+    def reserve_deferred(self, url: str):
+        """reserve() as a Deferred that does the Redis round trip in the reactor's thread pool."""
+        from twisted.internet import defer
+        from twisted.internet.threads import deferToThread
+
+        if not self.store.blocking:
+            return defer.succeed(self.reserve(url))
+        return deferToThread(self.reserve, url)
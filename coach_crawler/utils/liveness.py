@@ -0,0 +1,110 @@
+"""Bulk hostname liveness checks for guessed school/org domains.
+
+Most guessed domains (``{slug}hs.org``, ``{slug}isd.net``...) do not exist.
+Resolving every candidate concurrently up front is far cheaper than letting
+Scrapy try them one at a time, each waiting for a DNS failure and retries.
+"""
+
+import asyncio
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+async def system_resolve(host: str) -> list:
+    """Resolve a hostname with the event loop's resolver (getaddrinfo)."""
+    loop = asyncio.get_running_loop()
+    return await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+
+
+class LivenessChecker:
+    """Resolve hostnames concurrently, optionally confirm a TCP connect, cache results with a TTL.
+
+    `resolver` is an async callable taking a hostname and returning a list of
+    addresses; it raises OSError (e.g. socket.gaierror) or returns an empty
+    list for hosts that do not resolve.
+    """
+
+    def __init__(self, resolver=None, concurrency: int = 100, timeout: float = 3.0,
+                 tcp_check: bool = False, tcp_port: int = 443, ttl: float = 3600.0, clock=time.monotonic):
+        self.resolver = resolver or system_resolve
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.tcp_check = tcp_check
+        self.tcp_port = tcp_port
+        self.ttl = ttl
+        self.clock = clock
+        self._cache: dict[str, tuple[bool, float]] = {}
+
+    def cached(self, host: str) -> bool | None:
+        entry = self._cache.get(host)
+        if entry and entry[1] > self.clock():
+            return entry[0]
+        return None
+
+    async def _is_alive(self, host: str) -> bool:
+        try:
+            addresses = await asyncio.wait_for(self.resolver(host), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        if not addresses:
+            return False
+        if not self.tcp_check:
+            return True
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, self.tcp_port), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def check_hosts(self, hosts) -> dict[str, bool]:
+        """Return {host: alive} for every host, resolving uncached ones concurrently."""
+        results = {}
+        pending = []
+        for host in dict.fromkeys(hosts):
+            cached = self.cached(host)
+            if cached is None:
+                pending.append(host)
+            else:
+                results[host] = cached
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(host):
+            async with semaphore:
+                return host, await self._is_alive(host)
+
+        expires = self.clock() + self.ttl
+        for host, alive in await asyncio.gather(*(check(h) for h in pending)):
+            self._cache[host] = (alive, expires)
+            results[host] = alive
+        return results
+
+    def check_hosts_sync(self, hosts) -> dict[str, bool]:
+        """Blocking wrapper around check_hosts.
+
+        Runs on a private event loop in a worker thread so it is safe to call
+        from inside Scrapy, where the reactor may already own the main loop.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.check_hosts(hosts)).result()
+
+    def prune(self, url_lists: list[list[str]]) -> list[list[str]]:
+        """Drop URLs whose host does not resolve, keeping each list's order. Blocks until resolved."""
+        hosts = [urlparse(url).hostname or "" for urls in url_lists for url in urls]
+        alive = self.check_hosts_sync(hosts)
+        return [[url for url in urls if alive.get(urlparse(url).hostname or "")] for urls in url_lists]
+
+    def prune_deferred(self, url_lists: list[list[str]]):
+        """prune() in a reactor thread-pool thread; returns a Deferred firing with the pruned lists.
+
+        Use this from the reactor thread, which must not wait on a DNS batch.
+        """
+        from twisted.internet.threads import deferToThread
+
+        return deferToThread(self.prune, url_lists)
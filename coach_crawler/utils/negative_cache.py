@@ -0,0 +1,126 @@
+"""Persistent negative-result cache for dead hosts and missing pages.
+
+Hosts that do not resolve or refuse connections, and URLs that returned
+404/410, are remembered in the negative_cache table with an expiry so later
+runs skip them without touching the network.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urldefrag, urlparse
+
+from coach_crawler.models import NegativeCacheEntry
+
+logger = logging.getLogger(__name__)
+
+HOST_KINDS = ("nxdomain", "refused")
+URL_KINDS = ("http_404", "http_410")
+
+# How long each kind of failure is trusted before the host/URL is retried
+DEFAULT_TTLS = {
+    "nxdomain": timedelta(days=7),
+    "refused": timedelta(days=1),
+    "http_404": timedelta(days=14),
+    "http_410": timedelta(days=30),
+}
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def url_key(url: str) -> str:
+    return urldefrag(url)[0]
+
+
+class NegativeCache:
+    """In-memory view of the negative_cache table, flushed back in batches."""
+
+    def __init__(self, ttls: dict | None = None, now=None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.now = now or (lambda: datetime.now(timezone.utc))
+        self._entries: dict[str, tuple[str, datetime]] = {}
+        self._pending: dict[str, tuple[str, str, datetime]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, url: str) -> str | None:
+        """Return the failure kind if this URL or its host is known-bad and unexpired."""
+        now = self.now()
+        for key in (urlparse(url).hostname or "", url_key(url)):
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+        return None
+
+    def add_host(self, host: str, kind: str):
+        self._add(host, host, kind)
+
+    def add_url(self, url: str, kind: str):
+        self._add(url_key(url), urlparse(url).hostname or "", kind)
+
+    def _add(self, key: str, host: str, kind: str):
+        expires_at = self.now() + self.ttls[kind]
+        self._entries[key] = (kind, expires_at)
+        self._pending[key] = (host, kind, expires_at)
+
+    def load(self, session):
+        rows = session.query(NegativeCacheEntry).filter(NegativeCacheEntry.expires_at > self.now()).all()
+        for row in rows:
+            self._entries[row.key] = (row.kind, _as_utc(row.expires_at))
+        return len(rows)
+
+    @property
+    def pending(self) -> int:
+        """Entries recorded but not yet written to the database."""
+        return len(self._pending)
+
+    def flush(self, session):
+        """Write entries recorded since the last flush; returns how many were written.
+
+        Entries go out in one transaction. If it fails they are retried one per
+        transaction, and any that still fail stay pending for the next flush
+        instead of being lost with the batch.
+        """
+        if not self._pending:
+            return 0
+        try:
+            self._write(session, self._pending)
+            session.commit()
+        except Exception:
+            session.rollback()
+            logger.warning("Negative cache: batch write failed, retrying entries one by one", exc_info=True)
+            return self._flush_each(session)
+        written = len(self._pending)
+        self._pending.clear()
+        return written
+
+    def _flush_each(self, session) -> int:
+        written = 0
+        for key, entry in list(self._pending.items()):
+            try:
+                self._write(session, {key: entry})
+                session.commit()
+            except Exception:
+                session.rollback()
+                continue
+            del self._pending[key]
+            written += 1
+        return written
+
+    def _write(self, session, entries):
+        keys = list(entries)
+        existing = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            for row in session.query(NegativeCacheEntry).filter(NegativeCacheEntry.key.in_(chunk)):
+                existing[row.key] = row
+        for key, (host, kind, expires_at) in entries.items():
+            row = existing.get(key)
+            if row is None:
+                session.add(NegativeCacheEntry(key=key, host=host, kind=kind, expires_at=expires_at))
+            else:
+                row.kind = kind
+                row.expires_at = expires_at
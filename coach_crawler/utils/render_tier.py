@@ -0,0 +1,81 @@
+"""Static-first rendering: decide when a page needs a headless browser.
+
+Pages are fetched with a plain HTTP request first. needs_js_render() looks at
+the static HTML and says whether rendering would add anything: pages that
+already list contacts never do, while an empty app shell or a known
+single-page-app marker without any contacts usually does. RenderTierPolicy
+remembers the outcome per host, so once a host is known to need rendering its
+later pages go straight to Playwright.
+"""
+
+import re
+
+TIER_STATIC = "static"
+TIER_RENDER = "render"
+
+REASON_EMPTY_SHELL = "empty_shell"
+REASON_SPA_MARKER = "spa_marker"
+
+CONTACT_RE = re.compile(rb"mailto:|[\w.+-]+@[\w-]+\.[\w.-]+", re.IGNORECASE)
+SCRIPT_STYLE_RE = re.compile(rb"<(script|style|noscript|template)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(rb"<[^>]+>")
+SPA_MARKERS = re.compile(
+    rb"""<div[^>]+id=["'](?:app|root|__nuxt|__next)["'][^>]*>\s*</div>"""
+    rb"|\bng-app\b|\bng-version=|\bdata-reactroot\b|\bv-cloak\b"
+    rb"|enable javascript|requires javascript|javascript is (?:disabled|required)",
+    re.IGNORECASE,
+)
+
+# Visible text below this many characters is treated as an empty app shell
+EMPTY_SHELL_CHARS = 400
+
+
+def visible_text_length(body: bytes) -> int:
+    text = TAG_RE.sub(b" ", SCRIPT_STYLE_RE.sub(b" ", body))
+    return len(b" ".join(text.split()))
+
+
+def needs_js_render(body: bytes) -> str | None:
+    """Why the static HTML needs a browser render, or None if it can be parsed as is."""
+    if CONTACT_RE.search(body):
+        return None
+    if visible_text_length(body) < EMPTY_SHELL_CHARS:
+        return REASON_EMPTY_SHELL
+    if SPA_MARKERS.search(body):
+        return REASON_SPA_MARKER
+    return None
+
+
+class RenderTierPolicy:
+    """Per-host static-vs-render decision learned from classified static fetches.
+
+    A host is rendered directly once at least `min_samples` of its static pages
+    were classified and most of them needed rendering. Decisions loaded from a
+    previous crawl (`known`) apply until this crawl has seen enough pages of
+    its own.
+    """
+
+    def __init__(self, min_samples: int = 2, known: dict[str, str] | None = None):
+        self.min_samples = min_samples
+        self.known = dict(known or {})
+        self.static_ok: dict[str, int] = {}
+        self.escalated: dict[str, int] = {}
+
+    def tier(self, host: str) -> str:
+        static_ok = self.static_ok.get(host, 0)
+        escalated = self.escalated.get(host, 0)
+        if static_ok + escalated < self.min_samples:
+            return self.known.get(host, TIER_STATIC)
+        return TIER_RENDER if escalated > static_ok else TIER_STATIC
+
+    def record(self, host: str, needed_render: bool):
+        counts = self.escalated if needed_render else self.static_ok
+        counts[host] = counts.get(host, 0) + 1
+
+    def decisions(self) -> dict[str, str]:
+        """Tier of every host this crawl has classified enough pages of."""
+        hosts = set(self.static_ok) | set(self.escalated)
+        return {
+            host: self.tier(host) for host in hosts
+            if self.static_ok.get(host, 0) + self.escalated.get(host, 0) >= self.min_samples
+        }
@@ -0,0 +1,82 @@
+"""Per-school crawl budget: cap the requests and bytes spent on one school and
+stop early once a page has already produced a full staff list."""
+
+from collections import Counter
+
+STOP_ENOUGH_COACHES = "enough_coaches"
+STOP_REQUEST_BUDGET = "request_budget"
+STOP_BYTE_BUDGET = "byte_budget"
+
+
+class SchoolCrawlState:
+    """What one school has cost so far in this crawl, and why it stopped (if it has)."""
+
+    __slots__ = ("requests", "bytes", "best_page_coaches", "stop_reason")
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.best_page_coaches = 0
+        self.stop_reason: str | None = None
+
+
+class SchoolBudget:
+    """Track SchoolCrawlState per school id and decide when a school is done.
+
+    A school stops when it has issued `max_requests` requests, downloaded
+    `max_bytes` bytes, or when a single page yielded at least `enough_coaches`
+    contacts with confidence >= `min_confidence`. Once stopped, the school's
+    remaining requests are not sent.
+    """
+
+    def __init__(self, max_requests: int = 25, max_bytes: int = 20 * 1024 * 1024,
+                 enough_coaches: int = 10, min_confidence: float = 0.8):
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.enough_coaches = enough_coaches
+        self.min_confidence = min_confidence
+        self.states: dict[int, SchoolCrawlState] = {}
+
+    def state(self, school_id: int) -> SchoolCrawlState:
+        state = self.states.get(school_id)
+        if state is None:
+            state = self.states[school_id] = SchoolCrawlState()
+        return state
+
+    def stop_reason(self, school_id: int) -> str | None:
+        state = self.states.get(school_id)
+        return state.stop_reason if state else None
+
+    def admit(self, school_id: int) -> bool:
+        """Count a request about to be sent; False if the school is stopped or out of requests."""
+        state = self.state(school_id)
+        if state.stop_reason:
+            return False
+        if state.requests >= self.max_requests:
+            state.stop_reason = STOP_REQUEST_BUDGET
+            return False
+        state.requests += 1
+        return True
+
+    def record_bytes(self, school_id: int, size: int) -> bool:
+        """Count downloaded bytes; return True if this exhausted the byte budget."""
+        state = self.state(school_id)
+        state.bytes += size
+        return self._stop(state, STOP_BYTE_BUDGET) if state.bytes >= self.max_bytes else False
+
+    def record_page(self, school_id: int, confidences) -> bool:
+        """Record one page's contact confidences; return True if it satisfied the school."""
+        state = self.state(school_id)
+        strong = sum(1 for c in confidences if c >= self.min_confidence)
+        state.best_page_coaches = max(state.best_page_coaches, strong)
+        return self._stop(state, STOP_ENOUGH_COACHES) if strong >= self.enough_coaches else False
+
+    def stop_reasons(self) -> Counter:
+        return Counter(s.stop_reason for s in self.states.values() if s.stop_reason)
+
+    @staticmethod
+    def _stop(state: SchoolCrawlState, reason: str) -> bool:
+        if state.stop_reason:
+            return False
+        state.stop_reason = reason
+        return True
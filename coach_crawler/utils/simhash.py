@@ -0,0 +1,37 @@
+"""SimHash fingerprints of page text for near-duplicate detection.
+
+Two pages whose visible text is nearly the same (a CMS serving its homepage
+or "page not found" template for any path) end up a few bits apart, while
+genuinely different pages differ in about half of the 64 bits.
+"""
+
+import hashlib
+import re
+
+WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3) -> list[str]:
+    """Overlapping `size`-word shingles of lowercased text."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str, size: int = 3) -> int:
+    """64-bit SimHash of the text's word shingles; 0 for empty text."""
+    hashes = [
+        format(int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big"), "064b")
+        for s in shingles(text, size)
+    ]
+    if not hashes:
+        return 0
+    # Column-wise majority vote over the bit strings (most significant bit first)
+    half = len(hashes) / 2
+    bits = "".join("1" if column.count("1") > half else "0" for column in zip(*hashes))
+    return int(bits, 2)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
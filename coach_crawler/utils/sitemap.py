@@ -0,0 +1,66 @@
+"""Streaming sitemap parsing for staff page discovery.
+
+Sitemaps can be tens of megabytes (and gzipped), so they are parsed
+incrementally with lxml's iterparse instead of being loaded into a tree.
+"""
+
+import gzip
+import io
+import logging
+import zlib
+from collections.abc import Iterator
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# The sitemaps.org protocol caps a single sitemap at 50,000 URLs
+MAX_SITEMAP_URLS = 50_000
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def sitemaps_from_robots(text: str) -> list[str]:
+    """Return the `Sitemap:` URLs declared in a robots.txt body, in order."""
+    urls = []
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            urls.append(value.strip())
+    return list(dict.fromkeys(urls))
+
+
+def iter_sitemap(body: bytes, max_urls: int = MAX_SITEMAP_URLS) -> Iterator[tuple[str, str]]:
+    """Yield (kind, loc) for each entry of a sitemap or sitemap index.
+
+    `kind` is "sitemap" for entries of a <sitemapindex> and "url" for entries
+    of a <urlset>. Gzipped bodies are decompressed on the fly. Parsing stops
+    quietly at `max_urls` entries or at the first malformed byte, keeping
+    whatever was read up to that point.
+    """
+    stream = io.BytesIO(body)
+    if body[:2] == GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream)
+
+    kind = None
+    count = 0
+    parser = etree.iterparse(stream, events=("start", "end"), resolve_entities=False, no_network=True)
+    try:
+        for event, elem in parser:
+            tag = etree.QName(elem).localname
+            if event == "start":
+                if kind is None:
+                    kind = "sitemap" if tag == "sitemapindex" else "url"
+                continue
+            if tag == "loc" and elem.text and elem.text.strip():
+                yield kind, elem.text.strip()
+                count += 1
+                if count >= max_urls:
+                    return
+            elif tag in ("url", "sitemap"):
+                # Drop finished entries so memory stays flat on large sitemaps
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    except (etree.XMLSyntaxError, OSError, EOFError, zlib.error) as e:
+        logger.debug(f"Sitemap parse stopped after {count} entries: {e}")
@@ -1,18 +1,42 @@
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl", "yclid", "igshid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
 
 
 def normalize_url(url: str) -> str:
-    """Normalize a URL for consistent comparison."""
+    """Normalize a URL for consistent comparison.
+
+    Lowercases scheme and host, strips a leading "www." and the default port,
+    drops the fragment, trailing slash and tracking parameters (utm_*, gclid...),
+    and sorts what is left of the query. Sites answering on both http/https or
+    with and without www map to the same string apart from the scheme.
+    """
     parsed = urlparse(url)
     # Ensure scheme
     if not parsed.scheme:
         url = "https://" + url
         parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").removeprefix("www.")
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
     # Remove trailing slash from path
     path = parsed.path.rstrip("/") or "/"
     # Remove common tracking parameters
-    return f"{parsed.scheme}://{parsed.netloc}{path}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return f"{scheme}://{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def site_key(url: str) -> str:
+    """Key identifying the same page across schools: the normalized URL without its scheme."""
+    return normalize_url(url).partition("://")[2]
 
 
 def get_domain(url: str) -> str:
@@ -1,10 +1,11 @@
 import multiprocessing
+import threading
 
 from fastapi import APIRouter
 from pydantic import BaseModel
 
 from coach_crawler.models import SessionLocal, CrawlJob
-from coach_crawler.web.crawl_runner import run_spider_process, run_all_spiders
+from coach_crawler.web.crawl_runner import run_spider_process, run_all_spiders, run_sharded_spider
 
 router = APIRouter()
 
@@ -29,6 +30,7 @@ class CrawlRequest(BaseModel):
     limit: int | None = None
     spider_name: str | None = None
     platform: str | None = None
+    shards: int = 1  # crawler processes, each on its own partition of the schools
 
 
 @router.post("/crawl")
@@ -56,6 +58,7 @@ def start_crawl(req: CrawlRequest):
                 "state": req.state,
                 "limit": req.limit,
                 "platform": req.platform,
+                "shards": req.shards,
             },
         )
         session.add(crawl_job)
@@ -75,14 +78,23 @@ def start_crawl(req: CrawlRequest):
     if req.limit:
         spider_kwargs["limit"] = str(req.limit)
 
-    process = multiprocessing.Process(
-        target=run_spider_process,
-        args=(crawl_id, spider_name, spider_kwargs),
-        daemon=True,
-    )
-    process.start()
+    shards = max(req.shards, 1)
+    if shards > 1:
+        # The coordinator only starts the shard processes and sums their progress
+        threading.Thread(
+            target=run_sharded_spider,
+            args=(crawl_id, spider_name, spider_kwargs, shards),
+            daemon=True,
+        ).start()
+    else:
+        process = multiprocessing.Process(
+            target=run_spider_process,
+            args=(crawl_id, spider_name, spider_kwargs),
+            daemon=True,
+        )
+        process.start()
 
-    return {"crawl_id": crawl_id, "status": "starting", "spider_name": spider_name}
+    return {"crawl_id": crawl_id, "status": "starting", "spider_name": spider_name, "shards": shards}
 
 
 @router.get("/crawl/{crawl_id}")
@@ -92,6 +104,7 @@ def get_crawl(crawl_id: int):
         job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
         if not job:
             return {"error": "Crawl not found"}
+        children = session.query(CrawlJob).filter(CrawlJob.parent_id == crawl_id).order_by(CrawlJob.shard).all()
         return {
             "id": job.id,
             "spider_name": job.spider_name,
@@ -103,6 +116,19 @@ def get_crawl(crawl_id: int):
             "urls_failed": job.urls_failed,
             "coaches_found": job.coaches_found,
             "config_snapshot": job.config_snapshot,
+            "parent_id": job.parent_id,
+            "shards": [
+                {
+                    "id": child.id,
+                    "shard": child.shard,
+                    "status": child.status,
+                    "urls_total": child.urls_total,
+                    "urls_completed": child.urls_completed,
+                    "urls_failed": child.urls_failed,
+                    "coaches_found": child.coaches_found,
+                }
+                for child in children
+            ],
         }
     finally:
         session.close()
@@ -125,9 +151,11 @@ YOUTH_SEED_SPIDERS = [
 
 @router.post("/crawl-all")
 def start_crawl_all():
-    """Start crawls for all levels sequentially in one background process.
+    """Start crawls for all levels in one background process.
 
-    Flow: college_staff → hs_staff → youth seed discovery → youth_staff
+    college_staff, hs_staff and the youth seed spiders are independent and run
+    concurrently (up to CRAWL_ALL_MAX_SPIDERS at once); youth_staff starts once
+    every seed spider has finished populating the youth orgs.
     """
     session = SessionLocal()
     crawl_jobs_list = []
@@ -146,17 +174,20 @@ def start_crawl_all():
         crawl_jobs_list.append({"crawl_id": job.id, "spider_name": "hs_staff", "spider_kwargs": {"level": "high_school"}, "level": "high_school"})
 
         # 3. Youth seed discovery (populate youth orgs in DB)
+        seed_ids = []
         for seed_spider in YOUTH_SEED_SPIDERS:
             job = CrawlJob(spider_name=seed_spider, status="queued", config_snapshot={"type": "seed_discovery"})
             session.add(job)
             session.flush()
             crawl_jobs_list.append({"crawl_id": job.id, "spider_name": seed_spider, "spider_kwargs": {}, "level": "youth_seed"})
+            seed_ids.append(job.id)
 
         # 4. Youth extraction (after seeds populate the table)
         job = CrawlJob(spider_name="youth_staff", status="queued", config_snapshot={"level": "youth"})
         session.add(job)
         session.flush()
-        crawl_jobs_list.append({"crawl_id": job.id, "spider_name": "youth_staff", "spider_kwargs": {"level": "youth"}, "level": "youth"})
+        crawl_jobs_list.append({"crawl_id": job.id, "spider_name": "youth_staff", "spider_kwargs": {"level": "youth"}, "level": "youth",
+                                "depends_on": seed_ids})
 
         session.commit()
     finally:
@@ -171,7 +202,11 @@ def start_crawl_all():
 
     return {
         "status": "starting",
-        "jobs": [{"crawl_id": j["crawl_id"], "spider_name": j["spider_name"], "level": j["level"]} for j in crawl_jobs_list],
+        "jobs": [
+            {"crawl_id": j["crawl_id"], "spider_name": j["spider_name"], "level": j["level"],
+             "depends_on": j.get("depends_on", [])}
+            for j in crawl_jobs_list
+        ],
     }
 
 
@@ -179,7 +214,8 @@ def start_crawl_all():
 def list_crawls():
     session = SessionLocal()
     try:
-        jobs = session.query(CrawlJob).order_by(CrawlJob.id.desc()).limit(50).all()
+        # Shard jobs are listed under their parent by GET /crawl/{id}
+        jobs = session.query(CrawlJob).filter(CrawlJob.parent_id.is_(None)).order_by(CrawlJob.id.desc()).limit(50).all()
         return [
             {
                 "id": j.id,
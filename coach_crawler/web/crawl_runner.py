@@ -1,139 +1,242 @@
 import os
 import sys
+import time
 import logging
+import multiprocessing
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
 
-def run_spider_process(crawl_id: int, spider_name: str, spider_kwargs: dict):
-    """Run a Scrapy spider in a separate process."""
+def run_spider_process(crawl_id: int, spider_name: str, spider_kwargs: dict, web_settings: bool = True):
+    """Run a Scrapy spider in a separate process.
+
+    `web_settings` applies the web UI's overrides (no Playwright, fixed
+    concurrency); the CLI runs shards with the project settings as they are.
+    """
     _setup_env()
     from scrapy.crawler import CrawlerProcess
     from scrapy.utils.project import get_project_settings
-    from coach_crawler.models import SessionLocal, CrawlJob, School
-    from sqlalchemy import func
-
-    # Mark job as running
-    session = SessionLocal()
-    try:
-        job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
-        if job:
-            job.status = "running"
-            job.started_at = datetime.now(timezone.utc)
-            if "seed" not in spider_name:
-                level = spider_kwargs.get("level", "college")
-                total = session.query(func.count(School.id)).filter(
-                    School.level == level,
-                    School.crawl_status.in_(["pending", "failed"]),
-                ).scalar() or 0
-                job.urls_total = total
-            session.commit()
-    finally:
-        session.close()
 
+    _mark_running(crawl_id, spider_name, spider_kwargs)
     spider_kwargs["crawl_job_id"] = str(crawl_id)
 
     try:
-        settings = _get_settings()
+        settings = _get_settings() if web_settings else get_project_settings()
         process = CrawlerProcess(settings)
         process.crawl(spider_name, **spider_kwargs)
         process.start()
-
-        session = SessionLocal()
-        try:
-            job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
-            if job:
-                job.status = "completed"
-                job.finished_at = datetime.now(timezone.utc)
-                session.commit()
-        finally:
-            session.close()
+        _mark_finished(crawl_id, "completed")
 
     except Exception as e:
         logger.exception(f"Spider {spider_name} failed: {e}")
-        session = SessionLocal()
-        try:
-            job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
-            if job:
-                job.status = "failed"
-                job.finished_at = datetime.now(timezone.utc)
-                session.commit()
-        finally:
-            session.close()
+        _mark_finished(crawl_id, "failed")
+
+
+def run_sharded_spider(crawl_id: int, spider_name: str, spider_kwargs: dict, shards: int,
+                       web_settings: bool = True, poll_interval: float = 5.0):
+    """Run `spider_name` as `shards` crawler processes, each on its own partition of the schools.
+
+    Schools are partitioned by the hash of their canonical domain (see
+    coach_crawler.planning.shards), so a domain is only ever crawled by one
+    process. Each shard gets a child CrawlJob under `crawl_id`; until every
+    shard process has exited, the parent's progress is kept as the sum of
+    its children's. Blocks until the crawl is over.
+    """
+    _setup_env()
+    from coach_crawler.planning import shard_limit
+
+    _mark_running(crawl_id, spider_name, spider_kwargs)
+    limit = int(spider_kwargs["limit"]) if spider_kwargs.get("limit") else None
+    processes = []
+    for shard, child_id in enumerate(_create_shard_jobs(crawl_id, spider_name, shards)):
+        kwargs = dict(spider_kwargs, shard=str(shard), shards=str(shards))
+        if limit:
+            share = shard_limit(limit, shard, shards)
+            if not share:
+                # Fewer schools asked for than there are shards
+                _mark_finished(child_id, "completed")
+                continue
+            kwargs["limit"] = str(share)
+        process = multiprocessing.Process(
+            target=run_spider_process,
+            args=(child_id, spider_name, kwargs, web_settings),
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    logger.info(f"Crawl {crawl_id}: {spider_name} running in {len(processes)} shard processes")
 
+    while any(process.is_alive() for process in processes):
+        time.sleep(poll_interval)
+        _aggregate_shards(crawl_id)
+    for process in processes:
+        process.join()
+    _aggregate_shards(crawl_id, final=True)
 
-def run_all_spiders(crawl_jobs: list[dict]):
-    """Run multiple spiders sequentially in a single process.
 
-    Each entry: {"crawl_id": int, "spider_name": str, "spider_kwargs": dict}
+def run_all_spiders(crawl_jobs: list[dict], max_concurrent: int | None = None):
+    """Run multiple spiders concurrently in a single process, in dependency order.
+
+    Each entry: {"crawl_id": int, "spider_name": str, "spider_kwargs": dict,
+    "depends_on": [crawl_id, ...]}. Up to `max_concurrent` (default
+    CRAWL_ALL_MAX_SPIDERS) spiders share the reactor at a time.
     """
     _setup_env()
     from scrapy.crawler import CrawlerRunner
-    from scrapy.utils.project import get_project_settings
-    from coach_crawler.models import SessionLocal, CrawlJob, School
-    from sqlalchemy import func
-    from twisted.internet import reactor, defer
+    from twisted.internet import reactor
 
     settings = _get_settings()
     runner = CrawlerRunner(settings)
+    d = crawl_dag(runner, crawl_jobs, max_concurrent or settings.getint("CRAWL_ALL_MAX_SPIDERS", 6))
+    d.addBoth(lambda _: reactor.stop())
+    reactor.run()
 
-    @defer.inlineCallbacks
-    def crawl_sequentially():
-        for entry in crawl_jobs:
-            crawl_id = entry["crawl_id"]
-            spider_name = entry["spider_name"]
-            spider_kwargs = entry["spider_kwargs"]
-            spider_kwargs["crawl_job_id"] = str(crawl_id)
 
-            # Mark as running
-            session = SessionLocal()
-            try:
-                job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
-                if job:
-                    job.status = "running"
-                    job.started_at = datetime.now(timezone.utc)
-                    if "seed" not in spider_name:
-                        level = spider_kwargs.get("level", "college")
-                        total = session.query(func.count(School.id)).filter(
-                            School.level == level,
-                            School.crawl_status.in_(["pending", "failed"]),
-                        ).scalar() or 0
-                        job.urls_total = total
-                    session.commit()
-            finally:
-                session.close()
-
-            # Run spider
+def crawl_dag(runner, crawl_jobs: list[dict], max_concurrent: int):
+    """Crawl `crawl_jobs` on `runner`, each once the jobs it depends on have finished.
+
+    Returns a Deferred that fires when every job has completed or failed.
+    """
+    from twisted.internet import defer
+
+    from coach_crawler.planning import CrawlDag
+
+    entries = {entry["crawl_id"]: entry for entry in crawl_jobs}
+    dag = CrawlDag()
+    for entry in crawl_jobs:
+        dag.add(entry["crawl_id"], entry.get("depends_on", ()))
+    done = defer.Deferred()
+
+    def start_ready():
+        for crawl_id in dag.next_jobs(max_concurrent):
+            entry = entries[crawl_id]
+            spider_name = entry["spider_name"]
+            spider_kwargs = dict(entry["spider_kwargs"], crawl_job_id=str(crawl_id))
             try:
-                yield runner.crawl(spider_name, **spider_kwargs)
-
-                session = SessionLocal()
-                try:
-                    job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
-                    if job:
-                        job.status = "completed"
-                        job.finished_at = datetime.now(timezone.utc)
-                        session.commit()
-                finally:
-                    session.close()
-
-            except Exception as e:
-                logger.exception(f"Spider {spider_name} failed: {e}")
-                session = SessionLocal()
-                try:
-                    job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
-                    if job:
-                        job.status = "failed"
-                        job.finished_at = datetime.now(timezone.utc)
-                        session.commit()
-                finally:
-                    session.close()
-
-        reactor.stop()
-
-    crawl_sequentially()
-    reactor.run()
+                _mark_running(crawl_id, spider_name, spider_kwargs)
+            except Exception:
+                logger.exception(f"Could not mark crawl job {crawl_id} running")
+            logger.info(f"Starting {spider_name} ({len(dag.running())} of {max_concurrent} running)")
+            d = runner.crawl(spider_name, **spider_kwargs)
+            d.addCallbacks(crawled, crawl_failed, callbackArgs=(crawl_id,), errbackArgs=(crawl_id,))
+        if dag.finished() and not done.called:
+            done.callback(None)
+
+    def finish(crawl_id, status):
+        # A bookkeeping error must not stop the remaining jobs or leave `done` unfired
+        try:
+            dag.finish(crawl_id, ok=status == "completed")
+            _mark_finished(crawl_id, status)
+        except Exception:
+            logger.exception(f"Could not mark crawl job {crawl_id} {status}")
+        finally:
+            start_ready()
+
+    def crawled(_, crawl_id):
+        finish(crawl_id, "completed")
+
+    def crawl_failed(failure, crawl_id):
+        logger.error(f"Spider {entries[crawl_id]['spider_name']} failed: {failure.getErrorMessage()}")
+        finish(crawl_id, "failed")
+
+    start_ready()
+    return done
+
+
+def _mark_running(crawl_id: int, spider_name: str, spider_kwargs: dict):
+    from coach_crawler.models import SessionLocal, CrawlJob
+
+    session = SessionLocal()
+    try:
+        job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
+        if job:
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            if "seed" not in spider_name:
+                job.urls_total = _count_pending_schools(session, spider_name, spider_kwargs)
+            session.commit()
+    finally:
+        session.close()
+
+
+def _count_pending_schools(session, spider_name: str, spider_kwargs: dict) -> int:
+    """Schools the staff spider `spider_name` with `spider_kwargs` will start.
+
+    Asks the spider itself, so its level and filters, refresh mode (the
+    recrawl plan within its budget), shard and limit all count.
+    """
+    from scrapy.spiderloader import get_spider_loader
+
+    settings = _get_settings()
+    spider = get_spider_loader(settings).load(spider_name)(**spider_kwargs)
+    spider.settings = settings
+    return spider.count_schools(spider.school_query(session))
+
+
+def _create_shard_jobs(crawl_id: int, spider_name: str, shards: int) -> list[int]:
+    """Queue one child CrawlJob per shard under `crawl_id` and return their ids in shard order."""
+    from coach_crawler.models import SessionLocal, CrawlJob
+
+    session = SessionLocal()
+    try:
+        parent = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
+        snapshot = dict(parent.config_snapshot or {}) if parent else {}
+        children = [
+            CrawlJob(spider_name=spider_name, status="queued", parent_id=crawl_id, shard=shard,
+                     config_snapshot={**snapshot, "shard": shard, "shards": shards})
+            for shard in range(shards)
+        ]
+        session.add_all(children)
+        session.commit()
+        return [child.id for child in children]
+    finally:
+        session.close()
+
+
+def _aggregate_shards(crawl_id: int, final: bool = False):
+    """Sum the shard jobs' progress into their parent; when `final`, also settle every status.
+
+    A shard whose process exited without marking its job finished died
+    mid-crawl and is failed; the parent completes only if every shard did.
+    """
+    from coach_crawler.models import SessionLocal, CrawlJob
+
+    session = SessionLocal()
+    try:
+        parent = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
+        if not parent:
+            return
+        children = session.query(CrawlJob).filter(CrawlJob.parent_id == crawl_id).all()
+        parent.urls_total = sum(child.urls_total or 0 for child in children)
+        parent.urls_completed = sum(child.urls_completed or 0 for child in children)
+        parent.urls_failed = sum(child.urls_failed or 0 for child in children)
+        parent.coaches_found = sum(child.coaches_found or 0 for child in children)
+        if final:
+            now = datetime.now(timezone.utc)
+            for child in children:
+                if child.status not in ("completed", "failed"):
+                    child.status = "failed"
+                    child.finished_at = now
+            parent.status = "completed" if all(child.status == "completed" for child in children) else "failed"
+            parent.finished_at = now
+        session.commit()
+    finally:
+        session.close()
+
+
+def _mark_finished(crawl_id: int, status: str):
+    from coach_crawler.models import SessionLocal, CrawlJob
+
+    session = SessionLocal()
+    try:
+        job = session.query(CrawlJob).filter(CrawlJob.id == crawl_id).first()
+        if job:
+            job.status = status
+            job.finished_at = datetime.now(timezone.utc)
+            session.commit()
+    finally:
+        session.close()
 
 
 def _setup_env():
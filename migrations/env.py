@@ -8,7 +8,7 @@ from sqlalchemy import engine_from_config, pool
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from coach_crawler.models.base import Base
-from coach_crawler.models import School, Coach, CrawlUrl, CrawlJob  # noqa: F401
+from coach_crawler.models import School, Coach, CrawlUrl, CrawlJob, DomainProfile, NegativeCacheEntry  # noqa: F401
 
 config = context.config
 target_metadata = Base.metadata
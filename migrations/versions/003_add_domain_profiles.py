@@ -0,0 +1,32 @@
+"""Add domain_profiles table for learned per-domain crawl limits.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "domain_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("domain", sa.String(255), nullable=False),
+        sa.Column("concurrency", sa.Float(), nullable=True),
+        sa.Column("backoff_count", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_domain_profiles_domain", "domain_profiles", ["domain"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_domain_profiles_domain", "domain_profiles")
+    op.drop_table("domain_profiles")
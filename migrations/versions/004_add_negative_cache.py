@@ -0,0 +1,38 @@
+"""Add negative_cache table for dead hosts and missing pages.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "negative_cache",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("key", sa.String(1000), nullable=False),
+        sa.Column("host", sa.String(255), nullable=False),
+        sa.Column("kind", sa.String(30), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_negative_cache_key", "negative_cache", ["key"], unique=True)
+    op.create_index("ix_negative_cache_host", "negative_cache", ["host"])
+    op.create_index("ix_negative_cache_kind", "negative_cache", ["kind"])
+    op.create_index("ix_negative_cache_expires_at", "negative_cache", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_negative_cache_expires_at", "negative_cache")
+    op.drop_index("ix_negative_cache_kind", "negative_cache")
+    op.drop_index("ix_negative_cache_host", "negative_cache")
+    op.drop_index("ix_negative_cache_key", "negative_cache")
+    op.drop_table("negative_cache")
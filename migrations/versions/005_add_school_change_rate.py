@@ -0,0 +1,22 @@
+"""Add schools.change_rate for freshness-driven recrawls.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("schools", sa.Column("change_rate", sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("schools", "change_rate")
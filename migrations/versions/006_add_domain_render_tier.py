@@ -0,0 +1,22 @@
+"""Add domain_profiles.render_tier for static-first rendering.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("domain_profiles", sa.Column("render_tier", sa.String(10), nullable=True))
+
+
+def downgrade():
+    op.drop_column("domain_profiles", "render_tier")
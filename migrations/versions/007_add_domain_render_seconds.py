@@ -0,0 +1,22 @@
+"""Add domain_profiles.render_seconds for learned render completion times.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("domain_profiles", sa.Column("render_seconds", sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("domain_profiles", "render_seconds")
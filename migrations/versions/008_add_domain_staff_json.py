@@ -0,0 +1,22 @@
+"""Add domain_profiles.staff_json for staff JSON endpoints found while rendering.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("domain_profiles", sa.Column("staff_json", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("domain_profiles", "staff_json")
@@ -0,0 +1,26 @@
+"""Add crawl_jobs.parent_id and shard for sharded crawls.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("crawl_jobs", sa.Column("parent_id", sa.Integer(), sa.ForeignKey("crawl_jobs.id"), nullable=True))
+    op.add_column("crawl_jobs", sa.Column("shard", sa.Integer(), nullable=True))
+    op.create_index("ix_crawl_jobs_parent_id", "crawl_jobs", ["parent_id"])
+
+
+def downgrade():
+    op.drop_index("ix_crawl_jobs_parent_id", "crawl_jobs")
+    op.drop_column("crawl_jobs", "shard")
+    op.drop_column("crawl_jobs", "parent_id")
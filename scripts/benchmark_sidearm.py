@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark SIDEARM staff extraction: static fetch + SidearmAdapter vs a Playwright render.
+
+For each staff directory URL (given on the command line, or taken from
+SIDEARM schools in the database) the page is fetched once over plain HTTP
+and once in headless Chromium, and SidearmAdapter parses both. Prints the
+contacts found and the time each path took, then totals.
+
+Usage:
+  python scripts/benchmark_sidearm.py https://gostate.com/staff-directory ...
+  python scripts/benchmark_sidearm.py --limit 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from scrapy.http import HtmlResponse
+
+from coach_crawler.adapters import SidearmAdapter
+from coach_crawler.adapters.sidearm import PERSON_CARDS
+from coach_crawler.render.blocking import LEAN_CONTEXT_OPTIONS, install_blocking
+from coach_crawler.render.completion import wait_until_rendered
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+
+def sidearm_urls(limit):
+    from coach_crawler.models import SessionLocal, School
+
+    session = SessionLocal()
+    try:
+        schools = session.query(School).filter(School.website_platform == "sidearm").limit(limit).all()
+        adapter = SidearmAdapter()
+        return [
+            s.staff_directory_url or adapter.staff_urls(s.athletics_url)[0]
+            for s in schools if s.staff_directory_url or s.athletics_url
+        ]
+    finally:
+        session.close()
+
+
+def parse(adapter, url, html):
+    return adapter.parse(HtmlResponse(url, body=html.encode("utf-8"), encoding="utf-8"))
+
+
+async def static_run(adapter, url, client):
+    started = time.monotonic()
+    try:
+        response = await client.get(url)
+        records = parse(adapter, str(response.url), response.text)
+    except httpx.HTTPError:
+        records = None
+    return records, time.monotonic() - started
+
+
+async def rendered_run(adapter, url, context):
+    started = time.monotonic()
+    page = await context.new_page()
+    try:
+        await install_blocking(page, "sidearm", {})
+        await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        await wait_until_rendered(page, PERSON_CARDS)
+        records = parse(adapter, page.url, await page.content())
+    except Exception:
+        records = None
+    finally:
+        await page.close()
+    return records, time.monotonic() - started
+
+
+def count(records):
+    return "error" if records is None else str(len(records))
+
+
+async def benchmark(urls):
+    from playwright.async_api import async_playwright
+
+    adapter = SidearmAdapter()
+    totals = {"static": 0.0, "rendered": 0.0}
+    print(f"{'url':60} {'static':>14} {'rendered':>14}")
+    async with httpx.AsyncClient(follow_redirects=True, timeout=30, headers={"User-Agent": USER_AGENT}) as client:
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=True)
+            context = await browser.new_context(user_agent=USER_AGENT, **LEAN_CONTEXT_OPTIONS)
+            for url in urls:
+                static, static_seconds = await static_run(adapter, url, client)
+                rendered, rendered_seconds = await rendered_run(adapter, url, context)
+                totals["static"] += static_seconds
+                totals["rendered"] += rendered_seconds
+                print(f"{url[:60]:60} {count(static):>6} {static_seconds:6.2f}s {count(rendered):>6} {rendered_seconds:6.2f}s")
+            await browser.close()
+
+    if urls:
+        speedup = totals["rendered"] / totals["static"] if totals["static"] else 0
+        print(f"\n{len(urls)} pages: static {totals['static']:.1f}s, rendered {totals['rendered']:.1f}s "
+              f"({speedup:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("urls", nargs="*", help="Staff directory URLs (default: SIDEARM schools in the database)")
+    parser.add_argument("--limit", type=int, default=10, help="Schools to take from the database")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.urls or sidearm_urls(args.limit)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Test the PrestoSports, SportsEngine and LeagueApps adapters and adapter page dispatch."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.python.failure import Failure
+
+from coach_crawler.adapters import (
+    LeagueAppsAdapter,
+    PrestoSportsAdapter,
+    SportsEngineAdapter,
+    adapter_for,
+)
+from coach_crawler.scrapy_project.items import CoachItem
+from coach_crawler.scrapy_project.spiders.youth_staff_spider import YouthStaffSpider
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+ORG = {"id": 9, "name": "Riverside Youth Soccer Club", "level": "youth", "state": "OH"}
+
+
+def fixture_response(name, url, meta=None):
+    request = Request(url, meta={"school": ORG, **(meta or {})})
+    return HtmlResponse(url, body=(FIXTURES / name).read_bytes(), encoding="utf-8", request=request)
+
+
+@pytest.fixture
+def spider():
+    spider = YouthStaffSpider()
+    spider.crawler = SimpleNamespace(stats=MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+    return spider
+
+
+class TestPlatformAdapters:
+    def test_registry(self):
+        assert isinstance(adapter_for("prestosports"), PrestoSportsAdapter)
+        assert adapter_for("custom") is None
+        assert adapter_for(None) is None
+
+    def test_prestosports_directory(self):
+        adapter = PrestoSportsAdapter()
+        response = fixture_response("prestosports/directory.html", "https://bayviewathletics.com/information/directory/index")
+        assert adapter.detect(response)
+        records = {r["email"]: r for r in adapter.parse(response)}
+        assert set(records) == {"kross@bayview.edu", "shill@bayview.edu", "lchen@bayview.edu"}
+        assert records["shill@bayview.edu"]["context_title"] == "Head Men's Basketball Coach"
+        assert records["lchen@bayview.edu"]["context_sport"] == "Men's Basketball"
+        assert adapter.staff_urls("https://bayviewathletics.com/landing/index") == [
+            "https://bayviewathletics.com/information/directory/index",
+            "https://bayviewathletics.com/staff-directory",
+        ]
+
+    def test_sportsengine_plans_from_navigation(self):
+        adapter = SportsEngineAdapter()
+        home = fixture_response("sportsengine/home.html", "https://www.riversidesoccer.org/")
+        assert adapter.detect(home)
+        assert adapter.parse(home) == []
+        assert set(adapter.staff_links(home)) == {
+            "https://www.riversidesoccer.org/page/show/1003-board-of-directors",
+            "https://www.riversidesoccer.org/page/show/1004-coaching-staff",
+        }
+
+    def test_sportsengine_contact_elements(self):
+        response = fixture_response("sportsengine/coaching_staff.html",
+                                    "https://www.riversidesoccer.org/page/show/1004-coaching-staff")
+        records = {r["email"]: r for r in SportsEngineAdapter().parse(response)}
+        assert records["mlopez@riversidesoccer.org"]["context_name"] == "Maria Lopez"
+        assert records["dprice@riversidesoccer.org"]["context_title"] == "U12 Boys Head Coach"
+
+    def test_leagueapps_staff_cards(self):
+        adapter = LeagueAppsAdapter()
+        response = fixture_response("leagueapps/staff.html", "https://northsidelax.leagueapps.com/staff")
+        assert adapter.detect(response)
+        records = {r["email"]: r for r in adapter.parse(response)}
+        assert set(records) == {"cward@northsidelax.com", "pmoore@northsidelax.com"}
+        assert records["pmoore@northsidelax.com"]["context_name"] == "Pat Moore"
+        assert records["pmoore@northsidelax.com"]["context_title"] == "Girls Program Head Coach"
+
+    def test_site_linking_to_a_platform_is_not_detected(self):
+        response = HtmlResponse("https://www.lincolnhs.org/", body=b"""<html><body>
+            <a href="https://lincoln.leagueapps.com/register">Register on LeagueApps</a>
+            <p>Our club scores are hosted by SportsEngine.</p>
+            <a href="https://www.sportsengine.com/org/lincoln">Lincoln on SportsEngine</a>
+        </body></html>""")
+        assert not LeagueAppsAdapter().detect(response)
+        assert not SportsEngineAdapter().detect(response)
+
+    def test_detected_on_platform_host_and_generator(self):
+        assert LeagueAppsAdapter().detect(HtmlResponse("https://northsidelax.leagueapps.com/", body=b"<html></html>"))
+        generated = b"<html><head><meta name='generator' content='PrestoSports'></head></html>"
+        assert PrestoSportsAdapter().detect(HtmlResponse("https://bayviewathletics.com/", body=generated))
+
+    def test_fallback_urls_without_a_homepage(self):
+        assert LeagueAppsAdapter().staff_urls("https://northsidelax.leagueapps.com/") == [
+            "https://northsidelax.leagueapps.com/staff", "https://northsidelax.leagueapps.com/contacts",
+        ]
+
+
+class TestAdapterDispatch:
+    def test_youth_platform_site_fetches_planned_pages_without_browser(self, spider):
+        home = fixture_response("sportsengine/home.html", "https://www.riversidesoccer.org/",
+                                meta={"playwright": True, "website_platform": "custom"})
+        requests = [r for r in spider.parse_youth_home(home) if isinstance(r, Request)]
+        assert len(requests) == 1
+        request = requests[0]
+        assert request.meta["playwright"] is False
+        assert request.meta["adapter"] == "sportsengine"
+        assert request.callback == spider.parse_adapter_page
+        assert len(request.meta["adapter_urls"]) == 1
+
+    def test_stored_platform_selects_adapter(self, spider):
+        home = HtmlResponse("https://northsidelax.com/", body=b"<html><body><a href='/staff'>Our Staff</a></body></html>",
+                            request=Request("https://northsidelax.com/", meta={"school": ORG, "website_platform": "leagueapps"}))
+        (request,) = [r for r in spider.parse_youth_home(home) if isinstance(r, Request)]
+        assert request.meta["adapter"] == "leagueapps"
+        assert request.url == "https://northsidelax.com/staff"
+
+    def test_site_without_linked_staff_pages_falls_back_to_discovery(self, spider):
+        spider.settings = Settings({"SITEMAP_DISCOVERY_ENABLED": False})
+        home = HtmlResponse("https://northsidelax.com/", body=b"<html><body><p>Spring season starts soon.</p></body></html>",
+                            request=Request("https://northsidelax.com/", meta={"school": ORG, "website_platform": "leagueapps"}))
+        requests = [r for r in spider.parse_youth_home(home) if isinstance(r, Request)]
+        assert "https://northsidelax.com/staff" in [r.url for r in requests]
+        assert all(r.callback == spider.parse_staff_directory and "adapter" not in r.meta for r in requests)
+
+    def test_adapter_page_yields_coaches(self, spider):
+        page = fixture_response("sportsengine/coaching_staff.html",
+                                "https://www.riversidesoccer.org/page/show/1004-coaching-staff",
+                                meta={"adapter": "sportsengine", "adapter_urls": []})
+        coaches = [i for i in spider.parse_adapter_page(page) if isinstance(i, CoachItem)]
+        assert {c["email"] for c in coaches} == {"mlopez@riversidesoccer.org", "dprice@riversidesoccer.org"}
+        assert spider.crawler.stats.get_value("adapters/sportsengine/static") == 1
+
+    def test_empty_page_moves_to_next_planned_page(self, spider):
+        url = "https://www.riversidesoccer.org/page/show/1003-board-of-directors"
+        empty = HtmlResponse(url, body=b"<html><body>" + b"<p>Our volunteer board meets monthly.</p>" * 20 + b"</body></html>",
+                             request=Request(url, meta={"school": ORG, "adapter": "sportsengine",
+                                                        "adapter_urls": ["https://www.riversidesoccer.org/page/show/1004-coaching-staff"]}))
+        (following,) = spider.parse_adapter_page(empty)
+        assert following.url.endswith("1004-coaching-staff")
+        assert following.meta["adapter_urls"] == []
+
+    def test_failed_page_moves_to_next_planned_page(self, spider):
+        request = Request("https://bayviewathletics.com/information/directory/index",
+                          meta={"adapter": "prestosports", "adapter_urls": ["https://bayviewathletics.com/staff-directory"]})
+        failure = Failure(Exception("404"))
+        failure.request = request
+        (following,) = spider.adapter_page_failed(failure)
+        assert following.url == "https://bayviewathletics.com/staff-directory"
@@ -0,0 +1,88 @@
+"""Test the platform adapter registry and dispatch from the generic staff spiders."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+from coach_crawler.adapters import PlatformAdapter, adapter_for, detect_adapter, register_adapter, registry
+from coach_crawler.adapters.base import staff_record
+from coach_crawler.scrapy_project.items import CoachItem
+from coach_crawler.scrapy_project.spiders.college_staff_spider import CollegeStaffSpider
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+SCHOOL = {"id": 5, "name": "State University", "level": "college", "state": "TX", "division": "D1"}
+
+
+def page(body, url="https://gostate.com/staff-directory", meta=None):
+    request = Request(url, meta={"school": SCHOOL, **(meta or {})})
+    return HtmlResponse(url, body=body, encoding="utf-8", request=request)
+
+
+@pytest.fixture
+def isolated_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_ADAPTERS", dict(registry._ADAPTERS))
+
+
+@pytest.fixture
+def spider():
+    spider = CollegeStaffSpider()
+    spider.crawler = SimpleNamespace(stats=MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+    return spider
+
+
+class TestRegistry:
+    def test_plugging_in_an_adapter(self, isolated_registry):
+        @register_adapter
+        class ClubhouseAdapter(PlatformAdapter):
+            platform = "clubhouse"
+
+            def detect(self, response):
+                return "clubhouse-site" in response.text
+
+            def parse(self, response):
+                return [staff_record("coach@club.org", "Al Coach", "Head Coach")]
+
+        assert isinstance(adapter_for("clubhouse"), ClubhouseAdapter)
+        assert detect_adapter(page(b"<html><body class='clubhouse-site'></body></html>")).platform == "clubhouse"
+
+    def test_adapter_needs_a_platform(self, isolated_registry):
+        with pytest.raises(ValueError):
+            register_adapter(type("Nameless", (PlatformAdapter,), {}))
+
+    def test_detection(self):
+        assert detect_adapter(page((FIXTURES / "sidearm" / "staff_directory_cards.html").read_bytes())).platform == "sidearm"
+        assert detect_adapter(page(b"<html><body>Welcome</body></html>")) is None
+
+
+class TestSpiderDispatch:
+    def test_detect_platform_uses_registry(self, spider):
+        body = (FIXTURES / "prestosports" / "directory.html").read_bytes()
+        assert spider.detect_platform(page(body)) == "prestosports"
+        assert spider.detect_platform(page(b"<html><script src='https://static.wixstatic.com/x.js'></script>wix.com</html>")) == "wix"
+
+    def test_staff_page_parsed_by_detected_adapter(self, spider):
+        response = page((FIXTURES / "sidearm" / "staff_directory_table.html").read_bytes())
+        coaches = {i["email"]: i for i in spider.parse_staff_directory(response) if isinstance(i, CoachItem)}
+        assert set(coaches) == {"mallen@state.edu", "jsmith@state.edu", "bjones@state.edu", "aruiz@state.edu"}
+        assert coaches["bjones@state.edu"]["title"] == "Offensive Coordinator"
+        assert coaches["aruiz@state.edu"]["sport_normalized"] == "womens_soccer"
+        assert spider.crawler.stats.get_value("adapters/sidearm/dispatched") == 1
+
+    def test_unknown_platform_uses_generic_extraction(self, spider):
+        body = b"<html><body><div><h3>Jane Smith</h3><a href='mailto:jsmith@state.edu'>Email</a></div></body></html>"
+        coaches = [i for i in spider.parse_staff_directory(page(body)) if isinstance(i, CoachItem)]
+        assert [c["email"] for c in coaches] == ["jsmith@state.edu"]
+        assert spider.crawler.stats.get_value("adapters/sidearm/dispatched") is None
+
+    def test_homepage_plans_adapter_pages(self, spider):
+        body = (b"<html><head><link href='https://bayviewathletics.com/css/presto-sports.css'></head><body>"
+                b"<a href='/information/directory/index'>Staff Directory</a></body></html>")
+        home = page(body, url="https://bayviewathletics.com/landing/index")
+        requests = [r for r in spider.parse_athletics_home(home) if isinstance(r, Request)]
+        assert [r.url for r in requests] == ["https://bayviewathletics.com/information/directory/index"]
+        assert requests[0].meta["adapter"] == "prestosports"
+        assert requests[0].meta["playwright"] is False
@@ -0,0 +1,158 @@
+"""Test the browserless SIDEARM adapter against saved staff directory pages."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from coach_crawler.adapters import SidearmAdapter
+from coach_crawler.models.base import Base
+from coach_crawler.models.school import School
+from coach_crawler.render.completion import wait_until_rendered
+from coach_crawler.scrapy_project.items import CoachItem, SchoolFactsItem
+from coach_crawler.scrapy_project.spiders import sidearm_spider
+from coach_crawler.scrapy_project.spiders.sidearm_spider import SidearmStaffSpider
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures" / "sidearm"
+SCHOOL = {"id": 5, "name": "State University", "level": "college", "state": "TX", "division": "D1"}
+
+
+def fixture_response(name, url="https://statesports.com/staff-directory", meta=None):
+    request = Request(url, meta={"school": SCHOOL, "adapter": "sidearm", **(meta or {})})
+    return HtmlResponse(url, body=(FIXTURES / name).read_bytes(), encoding="utf-8", request=request)
+
+
+@pytest.fixture
+def adapter():
+    return SidearmAdapter()
+
+
+@pytest.fixture
+def spider():
+    spider = SidearmStaffSpider()
+    spider.crawler = SimpleNamespace(stats=MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+    return spider
+
+
+class TestSidearmAdapter:
+    def test_table_layout(self, adapter):
+        records = {r["email"]: r for r in adapter.parse(fixture_response("staff_directory_table.html"))}
+        # Footer webmaster link is excluded, Tom Lee has no email
+        assert set(records) == {"mallen@state.edu", "jsmith@state.edu", "bjones@state.edu", "aruiz@state.edu"}
+        smith = records["jsmith@state.edu"]
+        assert (smith["context_name"], smith["context_title"], smith["context_sport"]) == (
+            "Jane Smith", "Head Coach", "Football",
+        )
+        assert records["aruiz@state.edu"]["context_sport"] == "Women's Soccer"
+        assert records["mallen@state.edu"]["context_title"] == "Director of Athletics"
+
+    def test_card_layout(self, adapter):
+        records = {r["email"]: r for r in adapter.parse(fixture_response("staff_directory_cards.html"))}
+        assert set(records) == {"cyoung@lakeside.edu", "dpark@lakeside.edu", "ecole@lakeside.edu"}
+        assert records["dpark@lakeside.edu"]["context_title"] == "Assistant Coach / Pitching"
+        assert records["ecole@lakeside.edu"]["context_name"] == "Erin Cole"
+        assert records["ecole@lakeside.edu"]["context_sport"] == "Volleyball"
+
+    def test_shell_has_nothing(self, adapter):
+        assert adapter.parse(fixture_response("staff_directory_shell.html")) == []
+
+    def test_detect_and_urls(self, adapter):
+        assert adapter.detect(fixture_response("staff_directory_cards.html"))
+        assert not adapter.detect(HtmlResponse("https://a.org/", body=b"<html><body>Hi</body></html>"))
+        assert adapter.staff_urls("https://statesports.com/index.aspx") == ["https://statesports.com/staff-directory"]
+
+
+class TestSidearmSpider:
+    def test_static_page_yields_coaches(self, spider):
+        output = list(spider.parse_adapter_page(fixture_response("staff_directory_table.html")))
+        coaches = {o["email"]: o for o in output if isinstance(o, CoachItem)}
+        assert len(coaches) == 4
+        assert coaches["jsmith@state.edu"]["sport_normalized"] == "football"
+        assert coaches["jsmith@state.edu"]["role_category"] == "head_coach"
+        assert any(isinstance(o, SchoolFactsItem) for o in output)
+        assert spider.crawler.stats.get_value("adapters/sidearm/static") == 1
+
+    def test_shell_falls_back_to_render_once(self, spider):
+        (request,) = spider.parse_adapter_page(fixture_response("staff_directory_shell.html"))
+        assert request.meta["playwright"] is True
+        assert request.meta["playwright_page_methods"][0].method is wait_until_rendered
+        assert request.dont_filter
+
+        rendered = fixture_response("staff_directory_shell.html", meta={"playwright": True})
+        assert not any(isinstance(o, Request) for o in spider.parse_adapter_page(rendered))
+
+
+@pytest.fixture
+def sidearm_db(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    for i in range(5):
+        session.add(School(name=f"State {i}", slug=f"state-{i}", level="college", state="TX",
+                           website_platform="sidearm", athletics_url=f"https://state{i}sports.com"))
+    session.add(School(name="Other", slug="other", level="college", state="TX", website_platform="prestosports",
+                       athletics_url="https://othersports.com"))
+    session.commit()
+    session.close()
+    monkeypatch.setattr(sidearm_spider, "SessionLocal", Session)
+    return Session
+
+
+def start_spider(**kwargs):
+    settings = kwargs.pop("settings", {})
+    spider = SidearmStaffSpider(**kwargs)
+    spider.settings = Settings({"START_CHUNK_SIZE": 2, **settings})
+    return spider
+
+
+class TestSidearmStartRequests:
+    def test_schools_stream_in_chunks(self, sidearm_db):
+        spider = start_spider()
+        chunks = []
+        stream_schools = spider.stream_schools
+
+        def recording(query):
+            for chunk in stream_schools(query):
+                chunks.append(len(chunk))
+                yield chunk
+
+        spider.stream_schools = recording
+        requests = list(spider.start_requests())
+        assert chunks == [2, 2, 1]
+        assert [r.url for r in requests] == [f"https://state{i}sports.com/staff-directory" for i in range(5)]
+        assert all(r.callback == spider.parse_adapter_page for r in requests)
+
+    def test_limit(self, sidearm_db):
+        assert len(list(start_spider(limit=3).start_requests())) == 3
+
+    def test_refresh_recrawls_planned_schools(self, sidearm_db):
+        session = sidearm_db()
+        crawled = session.query(School).filter(School.slug.in_(["state-1", "state-3"])).all()
+        for school in crawled:
+            school.crawl_status = "crawled"
+            school.last_crawled_at = datetime.now(timezone.utc) - timedelta(days=90)
+        session.commit()
+        session.close()
+
+        requests = list(start_spider(refresh=True, settings={"RECRAWL_DAILY_REQUESTS": 100}).start_requests())
+        assert sorted(r.url for r in requests) == [
+            "https://state1sports.com/staff-directory", "https://state3sports.com/staff-directory",
+        ]
+
+    def test_refresh_budget_limits_the_plan(self, sidearm_db):
+        session = sidearm_db()
+        for school in session.query(School).filter(School.website_platform == "sidearm"):
+            school.crawl_status = "crawled"
+            school.last_crawled_at = datetime.now(timezone.utc) - timedelta(days=90)
+        session.commit()
+        session.close()
+
+        # Schools with only a homepage cost REQUEST_COST["homepage"] requests each
+        assert len(list(start_spider(refresh=True, refresh_budget=12).start_requests())) == 2
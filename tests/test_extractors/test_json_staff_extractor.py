@@ -0,0 +1,38 @@
+import pytest
+from coach_crawler.extractors.json_staff_extractor import JsonStaffExtractor
+
+
+@pytest.fixture
+def extractor():
+    return JsonStaffExtractor()
+
+
+class TestJsonStaffExtractor:
+    def test_flat_list(self, extractor):
+        payload = [
+            {"firstName": "Jane", "lastName": "Smith", "title": "Head Coach", "email": "JSmith@State.edu"},
+            {"full_name": "Bob Jones", "position": "Assistant Coach", "email_address": "mailto:bjones@state.edu"},
+        ]
+        records = extractor.extract(payload)
+        assert [(r["email"], r["context_name"], r["context_title"]) for r in records] == [
+            ("jsmith@state.edu", "Jane Smith", "Head Coach"),
+            ("bjones@state.edu", "Bob Jones", "Assistant Coach"),
+        ]
+        assert records[0]["source_method"] == "json"
+
+    def test_groups_label_their_members(self, extractor):
+        payload = {"data": {"groups": [
+            {"title": "Football", "members": [{"name": "Jane Smith", "email": "jsmith@state.edu"}]},
+            {"title": "Soccer", "members": [{"name": "Al Ruiz", "email": "aruiz@state.edu", "sport": {"title": "Men's Soccer"}}]},
+        ]}}
+        sports = {r["email"]: r["context_sport"] for r in extractor.extract(payload)}
+        assert sports == {"jsmith@state.edu": "Football", "aruiz@state.edu": "Men's Soccer"}
+
+    def test_ignores_non_staff_payloads(self, extractor):
+        assert extractor.extract({"events": [{"name": "Home opener", "date": "2026-09-01"}]}) == []
+        assert extractor.extract([{"name": "Ticket office", "email": "info@state.edu"}]) == []
+        assert extractor.extract("not json") == []
+
+    def test_duplicates_collapsed(self, extractor):
+        person = {"name": "Jane Smith", "email": "jsmith@state.edu"}
+        assert len(extractor.extract({"featured": [person], "all": [person]})) == 1
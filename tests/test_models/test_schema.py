@@ -7,6 +7,7 @@ from sqlalchemy.orm import sessionmaker
 from coach_crawler.models.base import Base
 from coach_crawler.models.school import School
 from coach_crawler.models.coach import Coach
+from coach_crawler.models.domain_profile import DomainProfile
 
 
 @pytest.fixture
@@ -158,3 +159,12 @@ class TestCoachModel:
         db_session.add(coach)
         db_session.commit()
         assert coach.sub_level is None
+
+
+class TestDomainProfileModel:
+    def test_create_domain_profile(self, db_session):
+        profile = DomainProfile(domain="goheels.com", concurrency=4.5)
+        db_session.add(profile)
+        db_session.commit()
+        assert profile.id is not None
+        assert "goheels.com" in repr(profile)
@@ -0,0 +1,147 @@
+"""Test the crawl-all dependency graph and its concurrent scheduling."""
+
+import pytest
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from coach_crawler.planning import CrawlDag
+from coach_crawler.web import crawl_runner
+
+
+class TestCrawlDag:
+    def test_independent_jobs_are_ready_together(self):
+        dag = CrawlDag()
+        for key in ("college", "hs", "seed"):
+            dag.add(key)
+        assert dag.ready() == ["college", "hs", "seed"]
+
+    def test_dependent_waits_for_every_dependency(self):
+        dag = CrawlDag()
+        dag.add("seed_a")
+        dag.add("seed_b")
+        dag.add("youth", depends_on=["seed_a", "seed_b"])
+        assert dag.next_jobs(10) == ["seed_a", "seed_b"]
+        dag.finish("seed_a")
+        assert dag.ready() == []
+        dag.finish("seed_b", ok=False)
+        # A failed seed still counts as finished
+        assert dag.ready() == ["youth"]
+
+    def test_next_jobs_respects_the_cap(self):
+        dag = CrawlDag()
+        for i in range(5):
+            dag.add(i)
+        assert dag.next_jobs(2) == [0, 1]
+        assert dag.next_jobs(2) == []
+        dag.finish(0)
+        assert dag.next_jobs(2) == [2]
+        assert dag.running() == [1, 2]
+
+    def test_finished_once_every_job_is_done(self):
+        dag = CrawlDag()
+        dag.add("a")
+        assert not dag.finished()
+        dag.next_jobs(1)
+        dag.finish("a")
+        assert dag.finished()
+
+    def test_unknown_dependency_rejected(self):
+        dag = CrawlDag()
+        with pytest.raises(ValueError):
+            dag.add("youth", depends_on=["seed"])
+
+    def test_duplicate_job_rejected(self):
+        dag = CrawlDag()
+        dag.add("a")
+        with pytest.raises(ValueError):
+            dag.add("a")
+
+    def test_finish_requires_running_job(self):
+        dag = CrawlDag()
+        dag.add("a")
+        with pytest.raises(ValueError):
+            dag.finish("a")
+
+
+class FakeRunner:
+    """CrawlerRunner stand-in whose crawls finish when the test says so."""
+
+    def __init__(self):
+        self.crawls: dict[str, defer.Deferred] = {}
+        self.kwargs: dict[str, dict] = {}
+
+    def crawl(self, spider_name, **kwargs):
+        self.crawls[spider_name] = defer.Deferred()
+        self.kwargs[spider_name] = kwargs
+        return self.crawls[spider_name]
+
+    def running(self):
+        return sorted(name for name, d in self.crawls.items() if not d.called)
+
+
+@pytest.fixture
+def job_status(monkeypatch):
+    status = {}
+    monkeypatch.setattr(crawl_runner, "_mark_running", lambda crawl_id, *args: status.__setitem__(crawl_id, "running"))
+    monkeypatch.setattr(crawl_runner, "_mark_finished", status.__setitem__)
+    return status
+
+
+def crawl_all_jobs():
+    return [
+        {"crawl_id": 1, "spider_name": "college_staff", "spider_kwargs": {"level": "college"}},
+        {"crawl_id": 2, "spider_name": "hs_staff", "spider_kwargs": {"level": "high_school"}},
+        {"crawl_id": 3, "spider_name": "aau_seed", "spider_kwargs": {}},
+        {"crawl_id": 4, "spider_name": "ymca_seed", "spider_kwargs": {}},
+        {"crawl_id": 5, "spider_name": "youth_staff", "spider_kwargs": {"level": "youth"}, "depends_on": [3, 4]},
+    ]
+
+
+class TestCrawlDagScheduling:
+    def test_independent_spiders_run_concurrently(self, job_status):
+        runner = FakeRunner()
+        crawl_runner.crawl_dag(runner, crawl_all_jobs(), max_concurrent=10)
+        assert runner.running() == ["aau_seed", "college_staff", "hs_staff", "ymca_seed"]
+        assert runner.kwargs["college_staff"] == {"level": "college", "crawl_job_id": "1"}
+
+    def test_youth_staff_waits_for_seeds(self, job_status):
+        runner = FakeRunner()
+        done = crawl_runner.crawl_dag(runner, crawl_all_jobs(), max_concurrent=10)
+        runner.crawls["aau_seed"].callback(None)
+        assert "youth_staff" not in runner.crawls
+        runner.crawls["ymca_seed"].errback(Failure(RuntimeError("blocked")))
+        assert "youth_staff" in runner.crawls
+        assert job_status[3] == "completed" and job_status[4] == "failed"
+        assert not done.called
+
+        for name in ("college_staff", "hs_staff", "youth_staff"):
+            runner.crawls[name].callback(None)
+        assert done.called
+        assert job_status[5] == "completed"
+
+    def test_concurrency_cap(self, job_status):
+        runner = FakeRunner()
+        crawl_runner.crawl_dag(runner, crawl_all_jobs(), max_concurrent=2)
+        assert runner.running() == ["college_staff", "hs_staff"]
+        runner.crawls["hs_staff"].callback(None)
+        assert runner.running() == ["aau_seed", "college_staff"]
+
+    def test_bookkeeping_error_does_not_stall_the_graph(self, job_status, monkeypatch):
+        def mark_finished(crawl_id, status):
+            if crawl_id == 3:
+                raise RuntimeError("database is locked")
+            job_status[crawl_id] = status
+
+        monkeypatch.setattr(crawl_runner, "_mark_finished", mark_finished)
+        runner = FakeRunner()
+        done = crawl_runner.crawl_dag(runner, crawl_all_jobs(), max_concurrent=10)
+        runner.crawls["aau_seed"].callback(None)
+        runner.crawls["ymca_seed"].callback(None)
+        assert "youth_staff" in runner.crawls
+
+        for name in ("college_staff", "hs_staff", "youth_staff"):
+            runner.crawls[name].callback(None)
+        assert done.called
+
+    def test_empty_graph_finishes_immediately(self, job_status):
+        assert crawl_runner.crawl_dag(FakeRunner(), [], max_concurrent=2).called
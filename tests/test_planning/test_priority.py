@@ -0,0 +1,32 @@
+"""Test expected-yield scoring of schools and request priorities."""
+
+from coach_crawler.planning import expected_yield, request_priority, school_priority
+
+
+class TestExpectedYield:
+    def test_history_beats_prior(self):
+        assert expected_yield("high_school", coaches_found=40, has_homepage=True) > expected_yield(
+            "high_school", has_homepage=True)
+
+    def test_platform_prior(self):
+        assert expected_yield("college", "sidearm", has_homepage=True) > expected_yield("college", has_homepage=True)
+
+    def test_known_staff_directory_beats_guessed_domain(self):
+        assert expected_yield("youth", has_staff_directory=True) > expected_yield("youth", has_homepage=True) \
+            > expected_yield("youth")
+
+    def test_failed_crawl_is_penalized(self):
+        assert expected_yield("college", has_homepage=True, crawl_status="failed") == \
+            expected_yield("college", has_homepage=True) / 2
+
+
+class TestPriorities:
+    def test_school_priority_is_log_scaled(self):
+        assert school_priority(0) == 0
+        assert school_priority(15) == 40
+        assert school_priority(150) - school_priority(15) < 40
+
+    def test_request_kind_and_depth(self):
+        assert request_priority(40, "staff_directory") > request_priority(40, "scored_link") \
+            > request_priority(40, "homepage") > request_priority(40, "suffix_probe")
+        assert request_priority(40, "keyword_link", depth=2) == 30
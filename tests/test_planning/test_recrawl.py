@@ -0,0 +1,136 @@
+"""Test change-rate estimation and the freshness-driven recrawl planner."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from coach_crawler.models.base import Base
+from coach_crawler.models.coach import Coach
+from coach_crawler.models.school import School
+from coach_crawler.planning import load_recrawl_plan, plan_recrawl, staleness, update_change_rate
+from coach_crawler.planning.recrawl import RecrawlCandidate
+from coach_crawler.scrapy_project import pipelines
+from coach_crawler.scrapy_project.items import CoachItem
+from coach_crawler.utils.school_budget import SchoolBudget
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def add_school(session, slug, days_ago, change_rate=None, coaches=0, **fields):
+    school = School(name=slug, slug=slug, level="college", state="TX", crawl_status="crawled",
+                    last_crawled_at=NOW - timedelta(days=days_ago), change_rate=change_rate, **fields)
+    session.add(school)
+    session.flush()
+    for i in range(coaches):
+        session.add(Coach(email=f"c{i}@{slug}.edu", email_hash=f"{slug}{i}", school_id=school.id,
+                          level="college", state="TX", source_url=f"https://{slug}.edu/staff"))
+    session.commit()
+    return school
+
+
+class TestChangeRate:
+    def test_first_observation(self):
+        assert update_change_rate(None, 3, 30) == pytest.approx(0.1)
+
+    def test_ewma(self):
+        assert update_change_rate(0.1, 0, 30, alpha=0.5) == pytest.approx(0.05)
+
+    def test_staleness(self):
+        assert staleness(0.0, 100) == 0
+        assert staleness(0.1, 10) == pytest.approx(0.632, abs=1e-3)
+        assert staleness(0.01, 30) < staleness(0.01, 90)
+
+
+class TestPlanRecrawl:
+    def test_best_value_per_request_within_budget(self):
+        plan = plan_recrawl([
+            RecrawlCandidate(1, value=6.0, cost=6.0, age_days=30, change_rate=0.1),
+            RecrawlCandidate(2, value=4.0, cost=2.0, age_days=30, change_rate=0.1),
+            RecrawlCandidate(3, value=3.0, cost=6.0, age_days=30, change_rate=0.1),
+            RecrawlCandidate(4, value=0.0, cost=2.0, age_days=0, change_rate=0.1),
+        ], daily_requests=9)
+        # 2 (2/req), then 1 (1/req); 3 no longer fits, 4 is fresh
+        assert [c.school_id for c in plan] == [2, 1]
+
+    def test_load_plan_prefers_stale_fast_changing_schools(self, db_session):
+        add_school(db_session, "fresh", days_ago=1, change_rate=0.05, coaches=20)
+        add_school(db_session, "stale", days_ago=60, change_rate=0.05, coaches=20)
+        add_school(db_session, "static", days_ago=60, change_rate=0.0001, coaches=20)
+        db_session.add(School(name="new", slug="new", level="college", state="TX", crawl_status="pending"))
+        db_session.commit()
+
+        plan = load_recrawl_plan(db_session.query(School), daily_requests=12, now=NOW)
+        slugs = [db_session.get(School, c.school_id).slug for c in plan]
+        assert slugs == ["stale", "fresh"]
+
+
+class TestChangeRateUpdate:
+    def test_recrawl_diff_updates_change_rate(self, db_session, monkeypatch):
+        school = add_school(db_session, "tamu", days_ago=10, coaches=3)
+        monkeypatch.setattr(pipelines, "SessionLocal", lambda: db_session)
+        # close_spider closes the session; keep it usable for the assertions
+        monkeypatch.setattr(db_session, "close", lambda: None)
+        spider = SimpleNamespace(crawl_job_id=None, school_budget=None)
+
+        pipeline = pipelines.DatabasePipeline()
+        pipeline.open_spider(spider)
+        # tamu0 and tamu1 are seen again, tamu2 has left, one new coach appeared
+        for email_hash in ("tamu0", "tamu1", "tamu-new"):
+            pipeline.process_item(CoachItem(
+                email=f"{email_hash}@tamu.edu", email_hash=email_hash, school_id=school.id,
+                level="college", state="TX", source_url="https://tamu.edu/staff",
+            ), spider)
+        pipeline.close_spider(spider)
+
+        db_session.refresh(school)
+        assert school.change_rate == pytest.approx(2 / 10, rel=0.01)
+
+
+    def test_early_stop_counts_departures_only_on_pages_read(self, db_session, monkeypatch):
+        school = add_school(db_session, "tamu", days_ago=10, coaches=3)
+        # tamu2 was listed on a page this crawl never reached
+        db_session.query(Coach).filter(Coach.email_hash == "tamu2").update({"source_url": "https://tamu.edu/football"})
+        db_session.commit()
+        monkeypatch.setattr(pipelines, "SessionLocal", lambda: db_session)
+        monkeypatch.setattr(db_session, "close", lambda: None)
+        budget = SchoolBudget(enough_coaches=1)
+        assert budget.record_page(school.id, [0.95])
+        spider = SimpleNamespace(crawl_job_id=None, school_budget=budget)
+
+        pipeline = pipelines.DatabasePipeline()
+        pipeline.open_spider(spider)
+        # Only tamu0 is listed again on /staff: tamu1 left, tamu2 is unknown
+        pipeline.process_item(CoachItem(
+            email="tamu0@tamu.edu", email_hash="tamu0", school_id=school.id,
+            level="college", state="TX", source_url="https://tamu.edu/staff",
+        ), spider)
+        pipeline.close_spider(spider)
+
+        db_session.refresh(school)
+        assert school.change_rate == pytest.approx(1 / 10, rel=0.01)
+
+
+class TestRefreshMode:
+    def test_spider_streams_the_plan(self, db_session):
+        from scrapy.settings import Settings
+
+        from coach_crawler.scrapy_project.spiders.college_staff_spider import CollegeStaffSpider
+
+        add_school(db_session, "fresh", days_ago=0, change_rate=0.05, coaches=20)
+        add_school(db_session, "stale", days_ago=60, change_rate=0.05, coaches=20)
+        spider = CollegeStaffSpider(level="college", refresh="true", refresh_budget=10)
+        spider.settings = Settings({"START_CHUNK_SIZE": 10})
+        query = db_session.query(School).filter(spider.status_filter())
+        assert [[s.slug for s in chunk] for chunk in spider.stream_schools(query)] == [["stale"]]
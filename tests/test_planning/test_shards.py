@@ -0,0 +1,162 @@
+"""Test domain-hash school sharding and shard progress aggregation."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from scrapy.settings import Settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from coach_crawler.models.base import Base
+from coach_crawler.models.crawl_job import CrawlJob
+from coach_crawler.models.school import School
+from coach_crawler.planning import canonical_domain, is_aggregator_url, school_shard_key, shard_limit, shard_of
+from coach_crawler.scrapy_project.spiders.hs_staff_spider import HighSchoolStaffSpider
+from coach_crawler.web import crawl_runner
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(40):
+        session.add(School(name=f"School {i}", slug=f"school-{i}", level="high_school", state="TX",
+                           athletics_url=f"https://www.school{i % 20}.org" if i % 4 else None))
+    session.commit()
+    yield session
+    session.close()
+
+
+def make_spider(shard=None, shards=None, limit=None, **settings):
+    spider = HighSchoolStaffSpider(level="high_school", shard=shard, shards=shards, limit=limit)
+    spider.settings = Settings(settings)
+    return spider
+
+
+class TestShardKeys:
+    def test_canonical_domain_drops_www_and_port(self):
+        assert canonical_domain("https://WWW.GoState.com:8443/staff") == "gostate.com"
+
+    def test_shared_platform_subdomains_fold(self):
+        assert canonical_domain("https://eagles.leagueapps.com/staff", ["leagueapps.com"]) == "leagueapps.com"
+
+    def test_staff_directory_url_wins(self):
+        key = school_shard_key("https://athletics.state.edu/staff", "https://state.edu", "state")
+        assert key == "athletics.state.edu"
+
+    def test_slug_without_url(self):
+        assert school_shard_key(None, None, "central-high") == "central-high"
+
+    def test_seed_listing_is_not_the_schools_site(self):
+        assert is_aggregator_url("https://www.maxpreps.com/tx/allen/allen-eagles/")
+        assert school_shard_key(None, "https://www.maxpreps.com/tx/allen/allen-eagles/", "allen-high") == "allen-high"
+
+    def test_maxpreps_seeded_schools_spread_over_shards(self):
+        keys = [school_shard_key(None, f"https://www.maxpreps.com/tx/town{i}/school{i}/", f"school-{i}")
+                for i in range(200)]
+        assert {shard_of(key, 4) for key in keys} == {0, 1, 2, 3}
+
+    def test_shard_is_stable_and_in_range(self):
+        assert shard_of("gostate.com", 8) == shard_of("gostate.com", 8)
+        assert {shard_of(f"school{i}.org", 4) for i in range(100)} == {0, 1, 2, 3}
+
+    def test_limit_parts_add_up(self):
+        assert [shard_limit(10, shard, 4) for shard in range(4)] == [3, 3, 2, 2]
+        assert shard_limit(None, 0, 4) is None
+
+
+class TestShardedSpider:
+    def test_shards_partition_the_schools(self, db_session):
+        query = db_session.query(School)
+        seen = []
+        for shard in range(3):
+            spider = make_spider(shard=shard, shards=3, START_CHUNK_SIZE=7)
+            seen.append({s.id for chunk in spider.stream_schools(query) for s in chunk})
+            assert spider.count_schools(query) == len(seen[-1])
+        assert set().union(*seen) == set(range(1, 41))
+        assert sum(len(ids) for ids in seen) == 40
+
+    def test_same_domain_same_shard(self, db_session):
+        # school-1 and school-21 share www.school1.org
+        shards = {
+            shard for shard in range(4)
+            for chunk in make_spider(shard=shard, shards=4).stream_schools(db_session.query(School))
+            for s in chunk if s.slug in ("school-1", "school-21")
+        }
+        assert len(shards) == 1
+
+    def test_prioritized_stream_is_sharded(self, db_session):
+        query = db_session.query(School)
+        plain = make_spider(shard=1, shards=3)
+        ranked = make_spider(shard=1, shards=3, PRIORITIZE_SCHOOLS=True)
+        assert ({s.id for chunk in ranked.stream_schools(query) for s in chunk}
+                == {s.id for chunk in plain.stream_schools(query) for s in chunk})
+
+    def test_limit_applies_within_the_shard(self, db_session):
+        spider = make_spider(shard=0, shards=2, limit=3, START_CHUNK_SIZE=2)
+        schools = [s for chunk in spider.stream_schools(db_session.query(School)) for s in chunk]
+        assert len(schools) == 3
+        assert all(spider.in_shard(s) for s in schools)
+
+    def test_invalid_shard_rejected(self):
+        with pytest.raises(ValueError):
+            make_spider(shard=3, shards=3)
+
+
+class TestShardAggregation:
+    @pytest.fixture
+    def jobs(self, db_session, monkeypatch):
+        monkeypatch.setattr(crawl_runner, "_get_settings",
+                            lambda: Settings({"SPIDER_MODULES": ["coach_crawler.scrapy_project.spiders"]}))
+        monkeypatch.setattr("coach_crawler.models.SessionLocal", lambda: db_session)
+        monkeypatch.setattr(db_session, "close", lambda: None)
+        parent = CrawlJob(spider_name="hs_staff", status="running", config_snapshot={"level": "high_school"})
+        db_session.add(parent)
+        db_session.commit()
+        return parent
+
+    def test_children_created_per_shard(self, db_session, jobs):
+        child_ids = crawl_runner._create_shard_jobs(jobs.id, "hs_staff", 3)
+        children = db_session.query(CrawlJob).filter(CrawlJob.id.in_(child_ids)).order_by(CrawlJob.shard).all()
+        assert [c.shard for c in children] == [0, 1, 2]
+        assert all(c.parent_id == jobs.id and c.status == "queued" for c in children)
+        assert children[2].config_snapshot == {"level": "high_school", "shard": 2, "shards": 3}
+
+    def test_shard_totals_add_up(self, db_session, jobs):
+        totals = [
+            crawl_runner._count_pending_schools(db_session, "hs_staff", {"shard": shard, "shards": 3})
+            for shard in range(3)
+        ]
+        assert sum(totals) == crawl_runner._count_pending_schools(db_session, "hs_staff", {}) == 40
+        # Counted by the spider: the level is the hs_staff spider's, not a default
+        assert crawl_runner._count_pending_schools(db_session, "college_staff", {}) == 0
+
+    def test_refresh_run_counts_the_recrawl_plan(self, db_session, jobs):
+        for school in db_session.query(School).filter(School.id <= 10):
+            school.crawl_status = "crawled"
+            school.last_crawled_at = datetime.now(timezone.utc) - timedelta(days=90)
+        db_session.commit()
+        assert crawl_runner._count_pending_schools(db_session, "hs_staff", {}) == 30
+        assert crawl_runner._count_pending_schools(db_session, "hs_staff", {"refresh": "true"}) == 10
+        totals = [
+            crawl_runner._count_pending_schools(db_session, "hs_staff", {"refresh": "true", "shard": shard, "shards": 2})
+            for shard in range(2)
+        ]
+        assert sum(totals) == 10
+        # The daily request budget bounds the plan
+        assert crawl_runner._count_pending_schools(db_session, "hs_staff", {"refresh": "true", "refresh_budget": 12}) < 10
+
+    def test_progress_summed_into_parent(self, db_session, jobs):
+        for shard, (status, completed) in enumerate([("completed", 5), ("running", 3)]):
+            db_session.add(CrawlJob(spider_name="hs_staff", status=status, parent_id=jobs.id, shard=shard,
+                                    urls_total=10, urls_completed=completed, coaches_found=completed * 2))
+        db_session.commit()
+
+        crawl_runner._aggregate_shards(jobs.id)
+        assert (jobs.urls_total, jobs.urls_completed, jobs.coaches_found, jobs.status) == (20, 8, 16, "running")
+
+        # The second shard's process exited without finishing its job
+        crawl_runner._aggregate_shards(jobs.id, final=True)
+        assert jobs.status == "failed"
+        assert db_session.query(CrawlJob).filter(CrawlJob.shard == 1).one().status == "failed"
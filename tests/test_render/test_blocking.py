@@ -0,0 +1,94 @@
+"""Test resource blocking on rendered pages."""
+
+import asyncio
+from types import SimpleNamespace
+
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+from coach_crawler.render.blocking import (
+    REASON_RESOURCE_TYPE,
+    REASON_TRACKER,
+    block_reason,
+    install_blocking,
+)
+from coach_crawler.render.capture import init_page
+from coach_crawler.scrapy_project.middlewares import ResourceBlockingMiddleware
+
+
+class TestBlockReason:
+    def test_heavy_resource_types(self):
+        assert block_reason("image", "https://a.org/logo.png") == REASON_RESOURCE_TYPE
+        assert block_reason("font", "https://fonts.gstatic.com/x.woff2") == REASON_RESOURCE_TYPE
+        assert block_reason("stylesheet", "https://a.org/site.css") == REASON_RESOURCE_TYPE
+
+    def test_trackers(self):
+        assert block_reason("script", "https://www.googletagmanager.com/gtm.js") == REASON_TRACKER
+        assert block_reason("xhr", "https://stats.g.doubleclick.net/collect") == REASON_TRACKER
+
+    def test_page_scripts_and_data_calls_pass(self):
+        assert block_reason("document", "https://a.org/staff") is None
+        assert block_reason("script", "https://a.org/app.js") is None
+        assert block_reason("fetch", "https://a.org/api/staff") is None
+
+    def test_platform_allowlist(self):
+        url = "https://images.sidearmdev.com/crop?url=staff.jpg"
+        assert block_reason("image", url) == REASON_RESOURCE_TYPE
+        assert block_reason("image", url, platform="sidearm") is None
+
+
+class FakeRoute:
+    def __init__(self):
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "abort"
+
+    async def fallback(self):
+        self.outcome = "fallback"
+
+
+class FakePage:
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+class TestInstallBlocking:
+    def test_counts_blocked_and_allowed(self):
+        async def scenario():
+            page, counts = FakePage(), {}
+            await install_blocking(page, None, counts)
+            routes = []
+            for resource_type, url in [("image", "https://a.org/a.png"), ("script", "https://a.org/app.js"),
+                                       ("script", "https://www.google-analytics.com/analytics.js")]:
+                routes.append(FakeRoute())
+                await page.handler(routes[-1], SimpleNamespace(resource_type=resource_type, url=url))
+            return counts, [r.outcome for r in routes]
+
+        counts, outcomes = asyncio.run(scenario())
+        assert outcomes == ["abort", "fallback", "abort"]
+        assert counts == {"blocked/image": 1, "allowed": 1, "blocked/tracker": 1}
+
+
+class TestResourceBlockingMiddleware:
+    def test_rendered_requests_get_policy_and_stats(self):
+        mw = ResourceBlockingMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+        spider = SimpleNamespace(render_platform="sidearm")
+        request = Request("https://a.org/staff", meta={"playwright": True})
+        mw.process_request(request, spider)
+        assert request.meta["resource_blocking"] == {"platform": "sidearm"}
+        assert request.meta["playwright_page_init_callback"] is init_page
+
+        request.meta["resource_blocking"]["counts"] = {"blocked/image": 12, "allowed": 4}
+        request.meta["download_latency"] = 2.5
+        mw.process_response(request, HtmlResponse(request.url, body=b"<html></html>", request=request), spider)
+        assert mw.stats.get_value("resource_blocking/blocked/image") == 12
+        assert mw.stats.get_value("resource_blocking/render_seconds") == 2.5
+        assert mw.stats.get_value("resource_blocking/pages") == 1
+
+    def test_static_requests_untouched(self):
+        mw = ResourceBlockingMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+        request = Request("https://a.org/staff", meta={"playwright": False})
+        mw.process_request(request, None)
+        assert "resource_blocking" not in request.meta
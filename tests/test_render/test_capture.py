@@ -0,0 +1,190 @@
+"""Test JSON data-call capture on rendered pages."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from scrapy.http import HtmlResponse, Request, TextResponse
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+from coach_crawler.render import make_job
+from coach_crawler.render.capture import collect_json, init_page, install_json_capture, is_json_candidate
+from coach_crawler.scrapy_project.items import CoachItem
+from coach_crawler.scrapy_project.middlewares import JsonCaptureMiddleware, RenderStateResetMiddleware
+from coach_crawler.scrapy_project.spiders.college_staff_spider import CollegeStaffSpider
+
+STAFF = [
+    {"firstName": "Jane", "lastName": "Smith", "title": "Head Football Coach", "email": "jsmith@state.edu"},
+    {"firstName": "Bob", "lastName": "Jones", "title": "Assistant Coach", "email": "bjones@state.edu"},
+]
+
+
+class FakeResponse:
+    def __init__(self, url, body, resource_type="xhr", content_type="application/json", status=200):
+        self.url = url
+        self._body = body
+        self.request = SimpleNamespace(resource_type=resource_type)
+        self.headers = {"content-type": content_type}
+        self.status = status
+
+    async def body(self):
+        await asyncio.sleep(0)
+        return self._body
+
+
+class FakePage:
+    def on(self, event, handler):
+        self.handler = handler
+
+
+def middleware():
+    return JsonCaptureMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+
+
+def staff_request(url, **meta):
+    return Request(url, callback=CollegeStaffSpider().parse_staff_directory, meta=meta)
+
+
+class TestCapture:
+    def test_json_candidates(self):
+        assert is_json_candidate("fetch", "application/json; charset=utf-8", 200)
+        assert not is_json_candidate("script", "application/json", 200)
+        assert not is_json_candidate("xhr", "text/html", 200)
+        assert not is_json_candidate("xhr", "application/json", 500)
+
+    def test_records_json_data_calls(self):
+        async def scenario():
+            page, capture = FakePage(), {}
+            await init_page(page, SimpleNamespace(meta={"json_capture": capture}))
+            page.handler(FakeResponse("https://a.org/api/staff", json.dumps(STAFF).encode()))
+            page.handler(FakeResponse("https://a.org/app.js", b"x", resource_type="script"))
+            page.handler(FakeResponse("https://a.org/api/broken", b"{nope"))
+            assert await collect_json(page, capture) == 1
+            return capture
+
+        capture = asyncio.run(scenario())
+        assert capture["responses"] == [{"url": "https://a.org/api/staff", "data": STAFF}]
+        assert not capture["pending"]
+
+    def test_capture_is_bounded(self):
+        async def scenario():
+            page, captured, pending = FakePage(), [], set()
+            install_json_capture(page, captured, pending)
+            for i in range(30):
+                page.handler(FakeResponse(f"https://a.org/api/{i}", b"{}"))
+            await asyncio.gather(*pending)
+            return captured
+
+        assert len(asyncio.run(scenario())) == 20
+
+    def test_farm_job_flag(self):
+        assert make_job("https://a.org/staff", 30, json_capture=True)["json_capture"] is True
+
+
+class TestJsonCaptureMiddleware:
+    def test_rendered_page_staff_and_endpoint_remembered(self):
+        mw = middleware()
+        request = Request("https://a.org/staff", meta={"playwright": True, "playwright_page_methods": []})
+        assert mw.process_request(request, None) is None
+        assert request.meta["playwright_page_methods"][-1].method is collect_json
+        assert request.meta["playwright_page_init_callback"] is init_page
+
+        request.meta["json_capture"]["responses"] = [
+            {"url": "https://a.org/api/staff?sport=all", "data": {"staff": STAFF}},
+            {"url": "https://a.org/api/scores", "data": {"games": []}},
+        ]
+        mw.process_response(request, HtmlResponse(request.url, body=b"<html></html>", request=request), None)
+        assert [c["url"] for c in request.meta["captured_json"]] == ["https://a.org/api/staff?sport=all"]
+        assert mw.updated == {"a.org": {"page": "https://a.org/staff", "endpoint": "https://a.org/api/staff?sport=all"}}
+        assert mw.stats.get_value("json_capture/records") == 2
+
+    def test_known_endpoint_fetched_without_browser(self):
+        mw = middleware()
+        mw.endpoints = {"a.org": {"page": "https://a.org/staff/", "endpoint": "https://a.org/api/staff"}}
+        direct = mw.process_request(staff_request("https://a.org/staff", playwright=True), None)
+        assert direct.url == "https://a.org/api/staff"
+        assert direct.meta["playwright"] is False
+
+        response = TextResponse(direct.url, body=json.dumps(STAFF).encode(), request=direct)
+        assert mw.process_response(direct, response, None) is response
+        assert len(direct.meta["captured_json"][0]["records"]) == 2
+
+    def test_stale_endpoint_falls_back_to_render(self):
+        mw = middleware()
+        mw.endpoints = {"a.org": {"page": "https://a.org/staff", "endpoint": "https://a.org/api/staff"}}
+        direct = mw.process_request(staff_request("https://a.org/staff", playwright=True), None)
+        retry = mw.process_response(direct, TextResponse(direct.url, status=404, body=b"", request=direct), None)
+        assert retry.url == "https://a.org/staff"
+        assert retry.meta["playwright"] is True
+        assert "staff_json" not in retry.meta
+        assert mw.updated == {"a.org": None}
+        # Rendered (and captured) again rather than sent back to the endpoint
+        assert mw.process_request(retry, None) is None
+        assert "json_capture" in retry.meta
+
+    def test_other_pages_untouched(self):
+        mw = middleware()
+        mw.endpoints = {"a.org": {"page": "https://a.org/staff", "endpoint": "https://a.org/api/staff"}}
+        assert mw.process_request(Request("https://a.org/", meta={"playwright": True}), None) is None
+        assert mw.process_request(Request("https://a.org/staff"), None) is None
+
+    def test_endpoint_only_for_staff_directory_callbacks(self):
+        mw = middleware()
+        mw.endpoints = {"a.org": {"page": "https://a.org/staff", "endpoint": "https://a.org/api/staff"}}
+        spider = CollegeStaffSpider()
+        request = Request("https://a.org/staff", callback=spider.parse_adapter_page, meta={"playwright": True})
+        assert mw.process_request(request, None) is None
+        assert "json_capture" in request.meta
+
+
+class TestSpiderUsesCapturedJson:
+    def test_coaches_from_direct_fetch(self):
+        spider = CollegeStaffSpider()
+        school = {"id": 3, "name": "State", "level": "college", "state": "TX"}
+        request = Request("https://a.org/api/staff", meta={
+            "school": school,
+            "staff_json": {"page": "https://a.org/staff", "endpoint": "https://a.org/api/staff"},
+        })
+        request.meta["captured_json"] = [{"url": request.url, "records": middleware().extractor.extract(STAFF)}]
+        response = TextResponse(request.url, body=json.dumps(STAFF).encode(), request=request)
+        coaches = [i for i in spider.parse_staff_directory(response) if isinstance(i, CoachItem)]
+        assert {c["email"] for c in coaches} == {"jsmith@state.edu", "bjones@state.edu"}
+        smith = next(c for c in coaches if c["email"] == "jsmith@state.edu")
+        assert smith["full_name"] == "Jane Smith"
+        assert smith["sport_normalized"] == "football"
+        assert smith["source_url"] == "https://a.org/staff"
+
+
+class TestRenderStateReset:
+    def test_child_page_reads_its_own_dom(self):
+        spider = CollegeStaffSpider()
+        school = {"id": 3, "name": "State", "level": "college", "state": "TX"}
+        parent = Request("https://a.org/staff", meta={"school": school, "playwright": True})
+        capture_mw = middleware()
+        capture_mw.process_request(parent, None)
+        parent.meta["json_capture"]["responses"] = [{"url": "https://a.org/api/staff", "data": STAFF}]
+        parent.meta["resource_blocking"] = {"platform": None, "counts": {"image": 4}}
+        parent_response = capture_mw.process_response(
+            parent, HtmlResponse(parent.url, body=b"<html></html>", request=parent), None,
+        )
+
+        # The parent's callback follows a link, handing its meta on
+        child = Request("https://a.org/staff/football", callback=spider.parse_staff_directory,
+                        meta=parent_response.meta)
+        reset = RenderStateResetMiddleware(SimpleNamespace())
+        (child,) = reset.process_spider_output(parent_response, [child])
+        assert not {"captured_json", "json_capture", "resource_blocking"} & child.meta.keys()
+        assert not any(pm.method is collect_json for pm in child.meta["playwright_page_methods"])
+        assert child.meta["school"] == school
+        assert parent_response.meta["captured_json"]
+
+        body = b"""<html><body><table><tr><td>Pat Lee</td><td>Head Football Coach</td>
+            <td><a href="mailto:plee@state.edu">plee@state.edu</a></td></tr></table></body></html>"""
+        items = spider.parse_staff_directory(HtmlResponse(child.url, body=body, request=child))
+        assert {c["email"] for c in items if isinstance(c, CoachItem)} == {"plee@state.edu"}
+
+    def test_clean_requests_untouched(self):
+        request = Request("https://a.org/staff", meta={"school": {"id": 3}})
+        reset = RenderStateResetMiddleware(SimpleNamespace())
+        assert list(reset.process_spider_output(None, [request])) == [request]
@@ -0,0 +1,133 @@
+"""Test adaptive render completion and learned per-domain timeouts."""
+
+import asyncio
+from types import SimpleNamespace
+
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy_playwright.page import PageMethod
+
+from coach_crawler.render import make_job
+from coach_crawler.render.completion import (
+    OUTCOME_CONTACTS,
+    OUTCOME_NETWORK_IDLE,
+    OUTCOME_TIMEOUT,
+    RenderTimeouts,
+    wait_until_rendered,
+)
+from coach_crawler.scrapy_project.middlewares import RenderCompletionMiddleware
+
+
+class FakePage:
+    """Each wait resolves after the given delay in seconds, or never when None."""
+
+    def __init__(self, selector=None, network_idle=None, dom_stable=None):
+        self.delays = {"selector": selector, "network_idle": network_idle, "dom_stable": dom_stable}
+        self.selectors = []
+
+    async def _wait(self, name):
+        delay = self.delays[name]
+        if delay is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(delay)
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        self.selectors.append(selector)
+        await self._wait("selector")
+
+    async def wait_for_load_state(self, state=None, timeout=None):
+        await self._wait("network_idle")
+
+    async def wait_for_function(self, expression, arg=None, polling=None, timeout=None):
+        await self._wait("dom_stable")
+
+
+class TestWaitUntilRendered:
+    def test_contacts_end_the_wait(self):
+        page = FakePage(selector=0.01, network_idle=5)
+        result = asyncio.run(wait_until_rendered(page, ".s-person-card", timeout=2))
+        assert result["outcome"] == OUTCOME_CONTACTS
+        assert result["seconds"] < 1
+        assert page.selectors == ["a[href^='mailto:'], .s-person-card"]
+
+    def test_network_idle_wins_when_first(self):
+        result = asyncio.run(wait_until_rendered(FakePage(network_idle=0.01), timeout=2))
+        assert result["outcome"] == OUTCOME_NETWORK_IDLE
+
+    def test_nothing_fires_within_timeout(self):
+        result = asyncio.run(wait_until_rendered(FakePage(), timeout=0.05))
+        assert result["outcome"] == OUTCOME_TIMEOUT
+
+    def test_failed_wait_does_not_end_the_race(self):
+        class ErrorPage(FakePage):
+            async def wait_for_load_state(self, state=None, timeout=None):
+                raise RuntimeError("target closed")
+
+        result = asyncio.run(wait_until_rendered(ErrorPage(dom_stable=0.02), timeout=2))
+        assert result["outcome"] == "dom_stable"
+
+
+class TestRenderTimeouts:
+    def test_unknown_host_gets_default(self):
+        assert RenderTimeouts(default=10).timeout("a.org") == 10
+
+    def test_learned_timeout_is_clamped(self):
+        timeouts = RenderTimeouts(min_timeout=3, max_timeout=20, headroom=2)
+        timeouts.record("fast.org", 0.4)
+        timeouts.record("slow.org", 15)
+        timeouts.record("mid.org", 4)
+        assert timeouts.timeout("fast.org") == 3
+        assert timeouts.timeout("slow.org") == 20
+        assert timeouts.timeout("mid.org") == 8
+        assert timeouts.updated == {"fast.org", "slow.org", "mid.org"}
+
+    def test_timeouts_count_as_max(self):
+        timeouts = RenderTimeouts(max_timeout=20, alpha=0.5, known={"a.org": 2.0})
+        timeouts.record("a.org", 6, timed_out=True)
+        assert timeouts.typical["a.org"] == 11.0
+
+
+class TestRenderCompletionMiddleware:
+    def test_sets_timeout_and_records_outcome(self):
+        mw = RenderCompletionMiddleware(
+            MemoryStatsCollector(SimpleNamespace(settings=Settings())),
+            RenderTimeouts(known={"a.org": 2.0}),
+        )
+        pm = PageMethod(wait_until_rendered, ".card")
+        request = Request("https://a.org/staff", meta={"playwright": True, "playwright_page_methods": [pm]})
+        mw.process_request(request, None)
+        (pm,) = request.meta["playwright_page_methods"]
+        assert pm.kwargs["timeout"] == 4.0
+
+        pm.result = {"outcome": OUTCOME_CONTACTS, "seconds": 1.5}
+        mw.process_response(request, HtmlResponse(request.url, body=b"<html></html>", request=request), None)
+        assert mw.stats.get_value("render_completion/outcome/contacts") == 1
+        assert mw.stats.get_value("render_completion/wait_seconds") == 1.5
+        assert "a.org" in mw.timeouts.updated
+
+    def test_shared_page_methods_not_modified(self):
+        mw = RenderCompletionMiddleware(
+            MemoryStatsCollector(SimpleNamespace(settings=Settings())),
+            RenderTimeouts(known={"a.org": 2.0, "b.org": 6.0}),
+        )
+        shared = [PageMethod(wait_until_rendered, ".card")]
+        a = Request("https://a.org/staff", meta={"playwright": True, "playwright_page_methods": shared})
+        b = Request("https://b.org/staff", meta={"playwright": True, "playwright_page_methods": shared})
+        mw.process_request(a, None)
+        mw.process_request(b, None)
+        assert shared[0].kwargs == {}
+        assert a.meta["playwright_page_methods"][0].kwargs["timeout"] == 4.0
+        assert b.meta["playwright_page_methods"][0].kwargs["timeout"] == 12.0
+        assert a.meta["playwright_page_methods"][0].args == (".card",)
+
+    def test_other_page_methods_untouched(self):
+        mw = RenderCompletionMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())), RenderTimeouts())
+        pm = PageMethod("wait_for_selector", ".card", timeout=15000)
+        request = Request("https://a.org/staff", meta={"playwright": True, "playwright_page_methods": [pm]})
+        mw.process_request(request, None)
+        assert pm.kwargs == {"timeout": 15000}
+
+    def test_farm_job_carries_completion_wait(self):
+        job = make_job("https://a.org/staff", 30, [PageMethod(wait_until_rendered, ".card", timeout=4.0)])
+        assert job["page_methods"] == [["wait_until_rendered", [".card"], {"timeout": 4.0}]]
@@ -0,0 +1,208 @@
+"""Test the render farm queue, warm context pool, worker loop and crawler middleware."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy_playwright.page import PageMethod
+
+from coach_crawler.render import ContextPool, LocalRenderQueue, RenderWorker, make_job
+from coach_crawler.scrapy_project.middlewares import RenderFarmMiddleware
+
+
+class FakePage:
+    def __init__(self, fail=False):
+        self.url = None
+        self.fail = fail
+        self.calls = []
+
+    async def goto(self, url, **kwargs):
+        if self.fail:
+            raise TimeoutError("navigation timed out")
+        self.url = url
+        return SimpleNamespace(status=200)
+
+    async def wait_for_selector(self, selector, **kwargs):
+        self.calls.append(("wait_for_selector", selector))
+
+    async def content(self):
+        return f"<html><body>{self.url}</body></html>"
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, fail=False):
+        self.closed = False
+        self.fail = fail
+
+    async def new_page(self):
+        return FakePage(self.fail)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, fail=False):
+        self.contexts = []
+        self.fail = fail
+
+    async def new_context(self, **options):
+        self.contexts.append(FakeContext(self.fail))
+        return self.contexts[-1]
+
+
+class TestMakeJob:
+    def test_only_wait_methods_are_forwarded(self):
+        job = make_job("https://a.org/staff", 30, [
+            PageMethod("wait_for_selector", ".s-person-card", timeout=15000),
+            PageMethod("screenshot", path="/tmp/x.png"),
+        ])
+        assert job["page_methods"] == [["wait_for_selector", [".s-person-card"], {"timeout": 15000}]]
+
+
+class TestContextPool:
+    def test_contexts_recycled_after_page_limit(self):
+        async def scenario():
+            browser = FakeBrowser()
+            pool = ContextPool(browser, size=1, pages_per_context=2)
+            await pool.start()
+            first = await pool.acquire()
+            await pool.release(first)
+            assert (await pool.acquire()) is first
+            await pool.release(first)
+            second = await pool.acquire()
+            return browser, first, second, pool
+
+        browser, first, second, pool = asyncio.run(scenario())
+        assert first.context.closed and second.context is browser.contexts[1]
+        assert pool.recycled == 1
+
+
+def run_worker(queue, jobs, fail=False):
+    async def scenario():
+        pool = ContextPool(FakeBrowser(fail), size=2, pages_per_context=10)
+        await pool.start()
+        worker = RenderWorker(queue, worker_id="test")
+        for job in jobs:
+            queue.submit(job)
+        stop = asyncio.Event()
+        serving = asyncio.create_task(worker.serve(pool, stop))
+        results = [await asyncio.to_thread(queue.wait_result, job["id"], 5) for job in jobs]
+        stop.set()
+        await serving
+        return worker, results
+
+    return asyncio.run(scenario())
+
+
+class TestRenderWorker:
+    def test_renders_jobs_and_heartbeats(self):
+        queue = LocalRenderQueue()
+        jobs = [make_job(f"https://a.org/{i}", 30, [PageMethod("wait_for_selector", ".card")]) for i in range(3)]
+        worker, results = run_worker(queue, jobs)
+        assert [r["html"] for r in results] == [f"<html><body>https://a.org/{i}</body></html>" for i in range(3)]
+        assert worker.rendered == 3
+        assert queue.live_workers() == 1
+
+    def test_navigation_error_is_reported(self):
+        queue = LocalRenderQueue()
+        worker, (result,) = run_worker(queue, [make_job("https://a.org/", 30)], fail=True)
+        assert result["error"].startswith("TimeoutError")
+        assert worker.failed == 1
+
+    def test_expired_jobs_are_skipped(self):
+        queue = LocalRenderQueue()
+        queue.submit(make_job("https://a.org/old", -1))
+        worker, (result,) = run_worker(queue, [make_job("https://a.org/new", 30)])
+        assert result["url"] == "https://a.org/new"
+        assert worker.expired == 1
+
+
+class SlowPage(FakePage):
+    async def goto(self, url, **kwargs):
+        await asyncio.sleep(1.5)
+        return await super().goto(url, **kwargs)
+
+
+class SlowBrowser(FakeBrowser):
+    async def new_context(self, **options):
+        context = await super().new_context(**options)
+        context.new_page = lambda: asyncio.sleep(0, result=SlowPage())
+        return context
+
+
+class TestWorkerHeartbeat:
+    def test_heartbeat_outlives_a_render_longer_than_its_ttl(self):
+        async def scenario():
+            queue = LocalRenderQueue()
+            pool = ContextPool(SlowBrowser(), size=1, pages_per_context=10)
+            await pool.start()
+            worker = RenderWorker(queue, worker_id="slow", heartbeat_interval=0.1, heartbeat_ttl=1)
+            job = make_job("https://a.org/slow", 30)
+            queue.submit(job)
+            stop = asyncio.Event()
+            serving = asyncio.create_task(worker.serve(pool, stop))
+            # The only context is busy for 1.5s, past the 1s TTL
+            await asyncio.sleep(1.3)
+            alive_mid_render = queue.live_workers()
+            result = await asyncio.to_thread(queue.wait_result, job["id"], 5)
+            stop.set()
+            await serving
+            return alive_mid_render, result
+
+        alive_mid_render, result = asyncio.run(scenario())
+        assert alive_mid_render == 1
+        assert result["url"] == "https://a.org/slow"
+
+
+class AnsweringQueue(LocalRenderQueue):
+    """Answers every job at once, like a farm with an idle worker."""
+
+    def __init__(self, answer):
+        super().__init__()
+        self.answer = answer
+        self.submitted = []
+
+    def submit(self, job):
+        self.submitted.append(job)
+        if self.answer is not None:
+            self.put_result(job["id"], {"id": job["id"], **self.answer})
+        return job["id"]
+
+
+def farm(answer, timeout=1):
+    return RenderFarmMiddleware(AnsweringQueue(answer), MemoryStatsCollector(SimpleNamespace(settings=Settings())),
+                                timeout=timeout)
+
+
+class TestRenderFarmMiddleware:
+    def test_rendered_html_becomes_the_response(self):
+        mw = farm({"url": "https://a.org/staff", "status": 200, "html": "<p>coach@a.org</p>", "render_seconds": 1.5})
+        request = Request("https://a.org/staff", meta={"playwright": True}, headers={"User-Agent": "CoachCrawler"})
+        response = asyncio.run(mw.process_request(request, None))
+        assert isinstance(response, HtmlResponse) and b"coach@a.org" in response.body
+        assert mw.queue.submitted[0]["headers"] == {"User-Agent": "CoachCrawler"}
+        assert mw.stats.get_value("render_farm/rendered") == 1
+
+    def test_plain_requests_are_not_sent(self):
+        mw = farm({"url": "", "status": 200, "html": ""})
+        assert asyncio.run(mw.process_request(Request("https://a.org/"), None)) is None
+        assert mw.queue.submitted == []
+
+    def test_render_error_ignores_request(self):
+        mw = farm({"url": "https://a.org/", "error": "TimeoutError: navigation timed out"})
+        with pytest.raises(IgnoreRequest):
+            asyncio.run(mw.process_request(Request("https://a.org/", meta={"playwright": True}), None))
+
+    def test_timeout_without_workers_falls_back_in_process(self):
+        mw = farm(None)
+        assert asyncio.run(mw.process_request(Request("https://a.org/", meta={"playwright": True}), None)) is None
+        assert mw.available is False
+        assert mw.stats.get_value("render_farm/timeouts") == 1
@@ -0,0 +1,52 @@
+"""Test redirect-aware canonical URL dedup."""
+
+from types import SimpleNamespace
+
+import pytest
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+from coach_crawler.scrapy_project.middlewares import CanonicalDedupMiddleware
+
+
+@pytest.fixture
+def mw():
+    return CanonicalDedupMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+
+
+def request_for(url, school_id=7, redirect_urls=()):
+    meta = {"school": {"id": school_id}}
+    if redirect_urls:
+        meta["redirect_urls"] = list(redirect_urls)
+    return Request(url, meta=meta, dont_filter=True)
+
+
+def respond(mw, request, status=200):
+    response = HtmlResponse(request.url, body=b"<html></html>", status=status, request=request)
+    return mw.process_response(request, response, None)
+
+
+class TestCanonicalDedup:
+    def test_redirect_sources_are_not_fetched_again(self, mw):
+        final = request_for("https://www.allen.org/", redirect_urls=["https://allen.org", "http://allen.net/"])
+        respond(mw, final)
+        for url in ("http://allen.org/", "https://ALLEN.org", "http://allen.net"):
+            with pytest.raises(IgnoreRequest):
+                mw.process_request(request_for(url), None)
+        assert mw.stats.get_value("canonical_dedup/requests_skipped") == 3
+
+    def test_redirect_onto_fetched_page_is_dropped(self, mw):
+        respond(mw, request_for("https://allen.org/"))
+        with pytest.raises(IgnoreRequest):
+            respond(mw, request_for("https://www.allen.org/", redirect_urls=["https://allen.net/"]))
+        assert mw.stats.get_value("canonical_dedup/responses_dropped") == 1
+
+    def test_keyed_per_school(self, mw):
+        respond(mw, request_for("https://allenisd.org/staff", school_id=1))
+        assert mw.process_request(request_for("https://allenisd.org/staff", school_id=2), None) is None
+
+    def test_errors_are_not_remembered(self, mw):
+        respond(mw, request_for("https://allen.org/"), status=503)
+        assert mw.process_request(request_for("https://allen.org/"), None) is None
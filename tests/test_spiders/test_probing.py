@@ -0,0 +1,136 @@
+"""Test parallel first-wins probing of guessed school domains."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from coach_crawler.scrapy_project.items import SchoolFactsItem
+from coach_crawler.scrapy_project.spiders.base_staff_spider import GuessedBatch
+from coach_crawler.scrapy_project.spiders.hs_staff_spider import HighSchoolStaffSpider
+from coach_crawler.utils.liveness import LivenessChecker
+from tests.test_utils.test_liveness import StubResolver
+
+
+@pytest.fixture
+def spider():
+    spider = HighSchoolStaffSpider(level="high_school", probe_mode="parallel")
+    spider.settings = Settings({"LIVENESS_PREFILTER_ENABLED": False, "PROBE_DOWNLOAD_TIMEOUT": 5})
+    spider.crawler = SimpleNamespace(stats=MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+    return spider
+
+
+def school_meta():
+    return {"school": {"id": 7, "name": "Allen High School", "level": "high_school", "sub_level": None, "state": "TX"}}
+
+
+def response_for(request, body=b"<html><body>Welcome</body></html>"):
+    return HtmlResponse(request.url, body=body, request=request)
+
+
+class TestParallelProbing:
+    def test_all_candidates_probed_at_once(self, spider):
+        urls = ["https://www.allenisd.org", "https://www.allen.org", "https://allen.org"]
+        requests = list(spider.start_guessed_requests([(school_meta(), urls)], spider.parse_school_home, spider.try_next_url))
+        assert [r.url.rstrip("/") for r in requests] == urls
+        assert all(r.meta["probe_group"] == 7 for r in requests)
+        assert all(r.meta["dont_retry"] and r.meta["download_timeout"] == 5 for r in requests)
+
+    def test_first_response_wins_and_is_recorded(self, spider):
+        urls = ["https://www.allenisd.org", "https://www.allen.org"]
+        first, second = spider.start_guessed_requests([(school_meta(), urls)], spider.parse_school_home, spider.try_next_url)
+
+        output = list(spider.accept_probe(response_for(second)))
+        facts = [o for o in output if isinstance(o, SchoolFactsItem)]
+        assert facts and facts[0]["athletics_url"] == "https://www.allen.org"
+        assert spider.probe_groups[7]["winner"] == "https://www.allen.org"
+
+        # Pages found from the winner must not inherit the probe settings
+        follow_ups = [o for o in output if isinstance(o, Request)]
+        assert follow_ups and all("probe_group" not in r.meta and "dont_retry" not in r.meta for r in follow_ups)
+
+        # A late response for the same school is ignored
+        assert list(spider.accept_probe(response_for(first))) == []
+
+    def test_all_probes_failing_is_counted(self, spider):
+        requests = list(spider.start_guessed_requests(
+            [(school_meta(), ["https://a.org", "https://b.org"])], spider.parse_school_home, spider.try_next_url,
+        ))
+        for request in requests:
+            failure = Failure(ConnectionError("refused"))
+            failure.request = request
+            spider.probe_failed(failure)
+        assert spider.crawler.stats.get_value("probe/no_live_homepage") == 1
+
+    def test_sequential_mode_keeps_fallbacks(self, spider):
+        spider.probe_mode = "sequential"
+        requests = list(spider.start_guessed_requests(
+            [(school_meta(), ["https://a.org", "https://b.org"])], spider.parse_school_home, spider.try_next_url,
+        ))
+        assert len(requests) == 1
+        assert requests[0].meta["fallback_urls"] == ["https://b.org"]
+
+    def test_sequential_hit_is_recorded(self, spider):
+        spider.probe_mode = "sequential"
+        (request,) = spider.start_guessed_requests(
+            [(school_meta(), ["https://a.org", "https://b.org"])], spider.parse_school_home, spider.try_next_url,
+        )
+        # a.org failed; the fallback answers with the last candidate
+        retry = next(spider.try_next_url(SimpleNamespace(request=request)))
+        assert retry.meta["fallback_urls"] == []
+
+        output = list(spider.parse_school_home(response_for(retry)))
+        facts = [o for o in output if isinstance(o, SchoolFactsItem) and "athletics_url" in o]
+        assert facts and facts[0]["athletics_url"] == "https://b.org"
+        follow_ups = [o for o in output if isinstance(o, Request)]
+        assert all("fallback_urls" not in r.meta for r in follow_ups)
+
+    def test_known_homepage_not_recorded_again(self, spider):
+        request = Request("https://www.allenisd.org", meta=school_meta())
+        output = list(spider.parse_school_home(response_for(request)))
+        assert not any(isinstance(o, SchoolFactsItem) and "athletics_url" in o for o in output)
+
+
+class TestLivenessOffReactor:
+    @pytest.fixture
+    def checked_spider(self, spider, monkeypatch):
+        spider.probe_mode = "sequential"
+        spider.settings = Settings({"LIVENESS_PREFILTER_ENABLED": True})
+        spider._liveness = LivenessChecker(resolver=StubResolver({"www.allenisd.org"}))
+        resolved_in = []
+
+        def prune_deferred(url_lists):
+            resolved_in.append("thread")
+            return defer.succeed(spider.liveness.prune(url_lists))
+
+        monkeypatch.setattr(spider._liveness, "prune_deferred", prune_deferred)
+        spider.resolved_in = resolved_in
+        return spider
+
+    def test_start_resolves_guessed_batches_off_start_requests(self, checked_spider):
+        spider = checked_spider
+        urls = ["https://www.allen.org", "https://www.allenisd.org"]
+        spider.start_requests = lambda: spider.start_guessed_requests(
+            [(school_meta(), urls)], spider.parse_school_home, spider.try_next_url,
+        )
+
+        async def scenario():
+            return [request async for request in spider.start()]
+
+        (request,) = asyncio.run(scenario())
+        assert request.url.rstrip("/") == "https://www.allenisd.org"
+        assert spider.resolved_in == ["thread"]
+        assert spider.crawler.stats.get_value("liveness/candidates_pruned") == 1
+
+    def test_start_requests_yields_batch_for_start(self, checked_spider):
+        spider = checked_spider
+        spider._resolve_in_start = True
+        (item,) = spider.start_guessed_requests([(school_meta(), ["https://a.org"])], spider.parse_school_home,
+                                                spider.try_next_url)
+        assert isinstance(item, GuessedBatch)
+        assert spider.resolved_in == []
@@ -0,0 +1,106 @@
+"""Test recording discovered site facts and the discover-only mode."""
+
+from scrapy.http import HtmlResponse, Request
+
+from coach_crawler.scrapy_project.items import CoachItem, SchoolFactsItem
+from coach_crawler.scrapy_project.pipelines import SchoolFactsPipeline
+from coach_crawler.scrapy_project.spiders.hs_staff_spider import HighSchoolStaffSpider
+
+STAFF_PAGE = b"""
+<html><body>
+  <table>
+    <tr><td>John Smith</td><td>Head Football Coach</td><td><a href="mailto:jsmith@allenisd.org">jsmith@allenisd.org</a></td></tr>
+    <tr><td>Jane Doe</td><td>Head Volleyball Coach</td><td><a href="mailto:jdoe@allenisd.org">jdoe@allenisd.org</a></td></tr>
+  </table>
+</body></html>
+"""
+
+
+CONTACT_PAGE = b"""
+<html><body><p>Athletic Director: <a href="mailto:ad@allenisd.org">ad@allenisd.org</a></p></body></html>
+"""
+
+
+def staff_response(url="https://www.allenisd.org/staff", body=STAFF_PAGE):
+    request = Request(url, meta={"school": {"id": 7, "name": "Allen High School", "level": "high_school"}})
+    return HtmlResponse(url, body=body, request=request)
+
+
+def directory_facts(output):
+    return [o["staff_directory_url"] for o in output if isinstance(o, SchoolFactsItem) and "staff_directory_url" in o]
+
+
+class TestRecordFacts:
+    def test_staff_directory_recorded_once(self):
+        spider = HighSchoolStaffSpider(level="high_school")
+        output = list(spider.parse_staff_directory(staff_response()))
+        facts = [o for o in output if isinstance(o, SchoolFactsItem)]
+        assert len(facts) == 1
+        assert facts[0]["staff_directory_url"] == "https://www.allenisd.org/staff"
+        assert facts[0]["staff_directory_contacts"] == 2
+        assert any(isinstance(o, CoachItem) for o in output)
+
+        again = list(spider.parse_staff_directory(staff_response()))
+        assert not any(isinstance(o, SchoolFactsItem) for o in again)
+
+    def test_page_with_one_contact_is_not_a_directory(self):
+        spider = HighSchoolStaffSpider(level="high_school")
+        output = list(spider.parse_staff_directory(staff_response("https://www.allenisd.org/contact", CONTACT_PAGE)))
+        assert directory_facts(output) == []
+        assert any(isinstance(o, CoachItem) for o in output)
+
+    def test_only_a_stronger_page_replaces_the_directory(self):
+        spider = HighSchoolStaffSpider(level="high_school")
+        bigger = STAFF_PAGE.replace(b"</table>", b"""<tr><td>Sam Roe</td><td>Head Baseball Coach</td>
+            <td><a href="mailto:sroe@allenisd.org">sroe@allenisd.org</a></td></tr></table>""")
+        assert directory_facts(spider.parse_staff_directory(staff_response())) == ["https://www.allenisd.org/staff"]
+        assert directory_facts(spider.parse_staff_directory(staff_response("https://www.allenisd.org/fb"))) == []
+        assert directory_facts(spider.parse_staff_directory(staff_response("https://www.allenisd.org/all", bigger))) \
+            == ["https://www.allenisd.org/all"]
+
+    def test_discover_only_skips_extraction(self):
+        spider = HighSchoolStaffSpider(level="high_school", discover_only="true")
+        output = list(spider.parse_staff_directory(staff_response()))
+        assert [type(o) for o in output] == [SchoolFactsItem]
+
+
+class TestSchoolFactsPipeline:
+    def test_facts_merged_per_school(self):
+        pipeline = SchoolFactsPipeline(batch_size=10)
+        pipeline.open_spider(None)
+        pipeline.process_item(SchoolFactsItem(school_id=7, athletics_url="https://allenisd.org"), None)
+        pipeline.process_item(SchoolFactsItem(school_id=7, website_platform="custom"), None)
+        assert pipeline.pending == {7: {"athletics_url": "https://allenisd.org", "website_platform": "custom"}}
+
+    def test_weaker_directory_never_overwrites(self):
+        pipeline = SchoolFactsPipeline(batch_size=1)
+        pipeline.open_spider(None)
+        flushed = []
+        pipeline._flush = lambda: (flushed.append(dict(pipeline.pending)), pipeline.pending.clear())
+        pipeline.process_item(SchoolFactsItem(school_id=7, staff_directory_url="https://a.org/staff",
+                                              staff_directory_contacts=12), None)
+        pipeline.process_item(SchoolFactsItem(school_id=7, staff_directory_url="https://a.org/contact",
+                                              staff_directory_contacts=2, website_platform="custom"), None)
+        pipeline.process_item(SchoolFactsItem(school_id=7, staff_directory_url="https://a.org/coaches",
+                                              staff_directory_contacts=20), None)
+        assert flushed == [
+            {7: {"staff_directory_url": "https://a.org/staff"}},
+            {7: {"website_platform": "custom"}},
+            {7: {"staff_directory_url": "https://a.org/coaches"}},
+        ]
+
+    def test_coach_items_pass_through(self):
+        pipeline = SchoolFactsPipeline()
+        pipeline.open_spider(None)
+        item = CoachItem(email="a@b.org")
+        assert pipeline.process_item(item, None) is item
+        assert pipeline.pending == {}
+
+    def test_full_batch_is_flushed(self):
+        pipeline = SchoolFactsPipeline(batch_size=2)
+        pipeline.open_spider(None)
+        flushed = []
+        pipeline._flush = lambda: (flushed.append(dict(pipeline.pending)), pipeline.pending.clear())
+        pipeline.process_item(SchoolFactsItem(school_id=1, website_platform="sidearm"), None)
+        pipeline.process_item(SchoolFactsItem(school_id=2, website_platform="custom"), None)
+        assert flushed == [{1: {"website_platform": "sidearm"}, 2: {"website_platform": "custom"}}]
@@ -0,0 +1,60 @@
+"""Test fetching a site shared by several schools once and attributing its contacts."""
+
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+
+from coach_crawler.scrapy_project.items import CoachItem
+from coach_crawler.scrapy_project.spiders.hs_staff_spider import HighSchoolStaffSpider
+from coach_crawler.utils.url_utils import site_key
+
+ALLEN = {"id": 1, "name": "Allen High School", "level": "high_school", "state": "TX"}
+LOWERY = {"id": 2, "name": "Lowery Freshman Center", "level": "high_school", "state": "TX"}
+
+DISTRICT_DIRECTORY = b"""
+<html><body><main>
+  <div><section><div class="staff-card"><h3>John Smith</h3><span class="title">Head Football Coach, Allen</span>
+    <p><a href="mailto:jsmith@allenisd.org">Email</a></p></div></section></div>
+  <div><section><div class="staff-card"><h3>Jane Doe</h3><span class="title">District Athletic Director</span>
+    <p><a href="mailto:jdoe@allenisd.org">Email</a></p></div></section></div>
+</main></body></html>
+"""
+
+
+@pytest.fixture
+def spider():
+    spider = HighSchoolStaffSpider(level="high_school")
+    spider.settings = Settings()
+    spider.crawler = SimpleNamespace(stats=MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+    return spider
+
+
+def test_site_key_ignores_www_and_trailing_slash():
+    assert site_key("https://www.AllenISD.org/athletics/") == site_key("http://allenisd.org/athletics")
+
+
+class TestSharedSites:
+    def test_schools_on_one_district_site_share_a_request(self, spider):
+        requests = [
+            Request("https://www.allenisd.org/", callback=spider.parse_school_home, meta={"school": ALLEN}),
+            Request("https://allenisd.org", callback=spider.parse_school_home, meta={"school": LOWERY}),
+            Request("https://www.planoisd.net/", callback=spider.parse_school_home, meta={"school": {"id": 3}}),
+        ]
+        collapsed = list(spider.collapse_shared_sites(requests))
+        assert len(collapsed) == 2
+        assert collapsed[0].meta["schools"] == [ALLEN, LOWERY]
+        assert spider.crawler.stats.get_value("shared_sites/requests_saved") == 1
+
+    def test_contacts_attributed_by_school_name(self, spider):
+        url = "https://www.allenisd.org/staff"
+        request = Request(url, meta={"school": ALLEN, "schools": [ALLEN, LOWERY]})
+        response = HtmlResponse(url, body=DISTRICT_DIRECTORY, request=request)
+        coaches = [i for i in spider.parse_staff_directory(response) if isinstance(i, CoachItem)]
+        by_email = {}
+        for coach in coaches:
+            by_email.setdefault(coach["email"], set()).add(coach["school_id"])
+        # Named school only; unmatched district-wide staff go to every school on the site
+        assert by_email == {"jsmith@allenisd.org": {1}, "jdoe@allenisd.org": {1, 2}}
@@ -0,0 +1,76 @@
+"""Test sitemap-first staff page discovery in the staff spiders."""
+
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request, TextResponse, XmlResponse
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.python.failure import Failure
+
+from coach_crawler.scrapy_project.spiders.hs_staff_spider import STAFF_SUFFIXES, HighSchoolStaffSpider
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://www.allenisd.org/calendar</loc></url>
+  <url><loc>https://www.allenisd.org/athletics/coaches</loc></url>
+  <url><loc>https://other.org/staff</loc></url>
+</urlset>
+"""
+
+
+@pytest.fixture
+def spider():
+    spider = HighSchoolStaffSpider(level="high_school")
+    spider.settings = Settings({"SITEMAP_DISCOVERY_ENABLED": True, "SITEMAP_MAX_FOLLOW": 5})
+    spider.crawler = SimpleNamespace(stats=MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+    return spider
+
+
+def home_response(school_id=7):
+    url = "https://www.allenisd.org"
+    request = Request(url, meta={"school": {"id": school_id, "name": "Allen High School", "level": "high_school"}})
+    return HtmlResponse(url, body=b"<html><body>Welcome</body></html>", request=request)
+
+
+def reply(request, body, cls=TextResponse):
+    return cls(request.url, body=body, request=request)
+
+
+class TestSitemapDiscovery:
+    def test_sitemap_replaces_suffix_probing(self, spider):
+        robots_request, = spider.discover_staff_pages(home_response(), STAFF_SUFFIXES)
+        assert robots_request.url == "https://www.allenisd.org/robots.txt"
+
+        sitemap_request, = spider.parse_robots_sitemaps(reply(robots_request, b"User-agent: *\nDisallow:\n"))
+        assert sitemap_request.url == "https://www.allenisd.org/sitemap.xml"
+
+        staff_requests = list(spider.parse_sitemap(reply(sitemap_request, SITEMAP, XmlResponse)))
+        assert [r.url for r in staff_requests] == ["https://www.allenisd.org/athletics/coaches"]
+        assert staff_requests[0].meta["school"]["id"] == 7
+        assert spider.crawler.stats.get_value("sitemap/requests_saved") == len(STAFF_SUFFIXES) - 1
+
+    def test_second_school_on_host_reuses_sitemap(self, spider):
+        robots_request, = spider.discover_staff_pages(home_response(7), STAFF_SUFFIXES)
+        # Arrives while the sitemap is still being read: waits, no new fetch
+        assert list(spider.discover_staff_pages(home_response(8), STAFF_SUFFIXES)) == []
+
+        sitemap_request, = spider.parse_robots_sitemaps(reply(robots_request, b""))
+        staff_requests = list(spider.parse_sitemap(reply(sitemap_request, SITEMAP, XmlResponse)))
+        assert sorted(r.meta["school"]["id"] for r in staff_requests) == [7, 8]
+
+    def test_falls_back_to_suffixes_without_sitemap(self, spider):
+        robots_request, = spider.discover_staff_pages(home_response(), STAFF_SUFFIXES)
+        failure = Failure(ConnectionError("404"))
+        failure.request = robots_request
+        sitemap_request, = spider.sitemap_failed(failure)
+        failure = Failure(ConnectionError("404"))
+        failure.request = sitemap_request
+        fallback = list(spider.sitemap_failed(failure))
+        assert [r.url for r in fallback] == ["https://www.allenisd.org" + s for s in STAFF_SUFFIXES]
+        assert spider.crawler.stats.get_value("sitemap/fallback_to_suffixes") == 1
+
+    def test_disabled(self, spider):
+        spider.settings = Settings({"SITEMAP_DISCOVERY_ENABLED": False})
+        requests = list(spider.discover_staff_pages(home_response(), STAFF_SUFFIXES))
+        assert len(requests) == len(STAFF_SUFFIXES)
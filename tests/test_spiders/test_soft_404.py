@@ -0,0 +1,153 @@
+"""Test soft-404 and duplicate-page detection for staff page probes."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.conf import build_component_list
+
+from coach_crawler.scrapy_project import middlewares
+from coach_crawler.scrapy_project.middlewares import SoftNotFoundMiddleware
+
+HOME = b"""<html><body><nav>Home News Athletics Calendar</nav>
+<h1>Welcome to Allen High School</h1><p>Home of the Eagles. Latest news, upcoming events,
+bell schedule, lunch menu and enrollment information for families.</p>
+<script>var tracking = "ignored";</script></body></html>"""
+
+STAFF = b"""<html><body><nav>Home News Athletics Calendar</nav><table>
+<tr><td>John Smith</td><td>Head Football Coach</td><td><a href="mailto:jsmith@allenisd.org">Email</a></td></tr>
+<tr><td>Jane Doe</td><td>Head Volleyball Coach</td><td><a href="mailto:jdoe@allenisd.org">Email</a></td></tr>
+</table></body></html>"""
+
+
+@pytest.fixture
+def mw():
+    return SoftNotFoundMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())))
+
+
+def fetch(mw, url, body, probe=False, status=200):
+    request = Request(url, meta={"staff_probe": True} if probe else {})
+    response = HtmlResponse(url, body=body, status=status, request=request)
+    return mw.process_response(request, response, None)
+
+
+class TestSoftNotFoundMiddleware:
+    def test_probe_returning_homepage_is_dropped(self, mw):
+        fetch(mw, "https://allenisd.org/", HOME)
+        with pytest.raises(IgnoreRequest):
+            fetch(mw, "https://allenisd.org/staff", HOME.replace(b"Latest", b"Recent"), probe=True)
+        assert mw.stats.get_value("soft404/dropped/duplicate_page") == 1
+        assert mw.stats.get_value("soft404/bytes_skipped") > 0
+
+    def test_real_staff_page_passes(self, mw):
+        fetch(mw, "https://allenisd.org/", HOME)
+        assert fetch(mw, "https://allenisd.org/staff", STAFF, probe=True).status == 200
+
+    def test_not_found_template_served_as_200(self, mw):
+        template = b"<html><body><h1>Page not found</h1><p>Sorry, we could not find that page on our site.</p></body></html>"
+        fetch(mw, "https://allenisd.org/missing", template, status=404)
+        with pytest.raises(IgnoreRequest):
+            fetch(mw, "https://allenisd.org/coaches", template, probe=True)
+        assert mw.stats.get_value("soft404/dropped/not_found_template") == 1
+
+    def test_second_identical_probe_is_dropped(self, mw):
+        fetch(mw, "https://allenisd.org/staff", STAFF, probe=True)
+        with pytest.raises(IgnoreRequest):
+            fetch(mw, "https://allenisd.org/coaches", STAFF, probe=True)
+        assert mw.stats.get_value("soft404/emails_skipped") == 2
+
+    def test_hosts_are_independent(self, mw):
+        fetch(mw, "https://allenisd.org/", HOME)
+        assert fetch(mw, "https://planoisd.net/staff", HOME, probe=True).status == 200
+
+
+NOT_FOUND = b"""<html><body><nav>Home News Athletics Calendar</nav>
+<h2>Oops! We can't find the page you are looking for.</h2><p>Try the search box or return to the homepage.</p>
+</body></html>"""
+
+
+class TestMiddlewareOrder:
+    def test_meta_refresh_is_followed_before_judging(self):
+        settings = Settings()
+        settings.setmodule("coach_crawler.scrapy_project.settings")
+        merged = settings.getwithbase("DOWNLOADER_MIDDLEWARES")
+        order = build_component_list(merged)
+        soft = "coach_crawler.scrapy_project.middlewares.SoftNotFoundMiddleware"
+        meta_refresh = "scrapy.downloadermiddlewares.redirect.MetaRefreshMiddleware"
+        # Responses travel back in reverse order, so a lower slot sees them later
+        assert order.index(soft) < order.index(meta_refresh)
+        assert list(merged.values()).count(merged[soft]) == 1
+
+
+class FakeEngine:
+    """Answers the fingerprint request with the host's "not found" page, through the middleware."""
+
+    def __init__(self, mw, status=200, body=NOT_FOUND, delay=0.0):
+        self.mw = mw
+        self.status = status
+        self.body = body
+        self.delay = delay
+        self.downloads = []
+
+    async def download_async(self, request):
+        self.downloads.append(request)
+        await asyncio.sleep(self.delay)
+        if self.status is None:
+            raise IgnoreRequest("connection refused")
+        response = HtmlResponse(request.url, body=self.body, status=self.status, request=request)
+        return self.mw.process_response(request, response, None)
+
+
+@pytest.fixture
+def probing_mw(monkeypatch):
+    # As under the asyncio reactor
+    monkeypatch.setattr(middlewares, "maybe_deferred_to_future", lambda d: d.asFuture(asyncio.get_running_loop()))
+    mw = SoftNotFoundMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())),
+                                crawler=SimpleNamespace())
+    mw.crawler.engine = FakeEngine(mw)
+    return mw
+
+
+def probe_request(url):
+    return Request(url, meta={"staff_probe": True})
+
+
+class TestFingerprintProbe:
+    def test_not_found_page_learned_before_first_probe(self, probing_mw):
+        asyncio.run(probing_mw.process_request(probe_request("https://allenisd.org/coaches"), None))
+        (fingerprint,) = probing_mw.crawler.engine.downloads
+        assert fingerprint.url.startswith("https://allenisd.org/") and fingerprint.meta["dont_negative_cache"]
+
+        with pytest.raises(IgnoreRequest):
+            fetch(probing_mw, "https://allenisd.org/coaches", NOT_FOUND, probe=True)
+        assert probing_mw.stats.get_value("soft404/dropped/not_found_template") == 1
+        assert fetch(probing_mw, "https://allenisd.org/staff", STAFF, probe=True).status == 200
+
+    def test_one_fingerprint_per_host(self, probing_mw):
+        probing_mw.crawler.engine.delay = 0.05
+
+        async def scenario():
+            await asyncio.gather(*(
+                probing_mw.process_request(probe_request(f"https://allenisd.org/{path}"), None)
+                for path in ("staff", "coaches", "athletics/staff")
+            ))
+            await probing_mw.process_request(probe_request("https://allenisd.org/directory"), None)
+            await probing_mw.process_request(probe_request("https://planoisd.net/staff"), None)
+
+        asyncio.run(scenario())
+        assert [r.url.split("/")[2] for r in probing_mw.crawler.engine.downloads] == ["allenisd.org", "planoisd.net"]
+        assert probing_mw.stats.get_value("soft404/fingerprint_probes") == 2
+
+    def test_non_probe_requests_do_not_wait(self, probing_mw):
+        asyncio.run(probing_mw.process_request(Request("https://allenisd.org/"), None))
+        assert probing_mw.crawler.engine.downloads == []
+
+    def test_failed_fingerprint_lets_probes_through(self, probing_mw):
+        probing_mw.crawler.engine.status = None
+        asyncio.run(probing_mw.process_request(probe_request("https://allenisd.org/staff"), None))
+        assert probing_mw.stats.get_value("soft404/fingerprint_failed") == 1
+        assert fetch(probing_mw, "https://allenisd.org/staff", NOT_FOUND, probe=True).status == 200
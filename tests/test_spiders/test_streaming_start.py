@@ -0,0 +1,85 @@
+"""Test chunked school streaming and the start request admission window."""
+
+from types import SimpleNamespace
+
+import pytest
+from scrapy.settings import Settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from coach_crawler.models.base import Base
+from coach_crawler.models.coach import Coach
+from coach_crawler.models.school import School
+from coach_crawler.scrapy_project.spiders.hs_staff_spider import HighSchoolStaffSpider
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(7):
+        session.add(School(name=f"School {i}", slug=f"school-{i}", level="high_school", state="TX"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def make_spider(limit=None, **settings):
+    spider = HighSchoolStaffSpider(level="high_school", limit=limit)
+    spider.settings = Settings(settings)
+    return spider
+
+
+class TestStreamSchools:
+    def test_id_ordered_chunks(self, db_session):
+        spider = make_spider(START_CHUNK_SIZE=3)
+        chunks = [[s.id for s in chunk] for chunk in spider.stream_schools(db_session.query(School))]
+        assert chunks == [[1, 2, 3], [4, 5, 6], [7]]
+
+    def test_limit_spans_chunks(self, db_session):
+        spider = make_spider(limit=4, START_CHUNK_SIZE=3)
+        query = db_session.query(School)
+        assert [len(chunk) for chunk in spider.stream_schools(query)] == [3, 1]
+        assert spider.count_schools(query) == 4
+
+    def test_finished_chunks_leave_the_session(self, db_session):
+        spider = make_spider(START_CHUNK_SIZE=3)
+        for _ in spider.stream_schools(db_session.query(School)):
+            pass
+        assert len(db_session.identity_map) == 0
+
+
+class TestPrioritizedStream:
+    @pytest.fixture
+    def ranked_session(self, db_session):
+        schools = db_session.query(School).order_by(School.id).all()
+        schools[4].athletics_url = "https://www.school4.org"
+        schools[5].staff_directory_url = "https://www.school5.org/staff"
+        schools[6].athletics_url = "https://www.school6.org"
+        for i in range(30):
+            db_session.add(Coach(email=f"c{i}@school6.org", email_hash=f"h{i}", school_id=schools[6].id,
+                                 level="high_school", state="TX", source_url="https://www.school6.org/staff"))
+        db_session.commit()
+        return db_session
+
+    def test_highest_expected_yield_first(self, ranked_session):
+        spider = make_spider(START_CHUNK_SIZE=2, PRIORITIZE_SCHOOLS=True)
+        chunks = [[s.id for s in chunk] for chunk in spider.stream_schools(ranked_session.query(School))]
+        assert chunks == [[7, 6], [5, 1], [2, 3], [4]]
+
+    def test_planned_priority_comes_from_the_ranking(self, ranked_session):
+        spider = make_spider(limit=1, PRIORITIZE_SCHOOLS=True)
+        ranking = dict(spider.rank_schools(ranked_session.query(School)))
+        for chunk in spider.stream_schools(ranked_session.query(School)):
+            # Includes school 7's 30 past coaches, which the row alone does not show
+            assert spider.planned_priority(chunk[0]) == ranking[7] > ranking[1]
+
+
+class TestRequestsInFlight:
+    def test_counts_queue_and_downloads(self):
+        spider = make_spider()
+        spider.crawler = SimpleNamespace(engine=SimpleNamespace(
+            scheduler=[object()] * 5, downloader=SimpleNamespace(active={object(), object()}),
+        ))
+        assert spider.requests_in_flight() == 7
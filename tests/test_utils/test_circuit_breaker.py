@@ -0,0 +1,152 @@
+"""Test the per-host circuit breaker."""
+
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Spider
+from scrapy.downloadermiddlewares.redirect import RedirectMiddleware
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.misc import load_object
+from scrapy.utils.test import get_crawler
+from twisted.internet.error import ConnectError
+
+from coach_crawler.scrapy_project.middlewares import CircuitBreakerMiddleware
+from coach_crawler.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(threshold=3)
+        assert not breaker.record_failure("dead.org")
+        assert not breaker.record_failure("dead.org")
+        assert breaker.record_failure("dead.org")
+        assert breaker.state("dead.org") == OPEN
+        assert not breaker.allow("dead.org")
+
+    def test_success_resets_count(self):
+        breaker = CircuitBreaker(threshold=2)
+        breaker.record_failure("flaky.org")
+        breaker.record_success("flaky.org")
+        assert not breaker.record_failure("flaky.org")
+        assert breaker.allow("flaky.org")
+
+    def test_hosts_are_independent(self):
+        breaker = CircuitBreaker(threshold=1)
+        breaker.record_failure("dead.org")
+        assert breaker.allow("alive.org")
+
+    def test_half_open_allows_single_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, cooldown=60, clock=clock)
+        breaker.record_failure("dead.org")
+        clock.now += 61
+        assert breaker.allow("dead.org")
+        assert breaker.state("dead.org") == HALF_OPEN
+        assert not breaker.allow("dead.org")
+
+    def test_half_open_probe_success_closes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, cooldown=60, clock=clock)
+        breaker.record_failure("back.org")
+        clock.now += 61
+        breaker.allow("back.org")
+        breaker.record_success("back.org")
+        assert breaker.state("back.org") == CLOSED
+
+    def test_half_open_probe_failure_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=3, cooldown=60, clock=clock)
+        for _ in range(3):
+            breaker.record_failure("dead.org")
+        clock.now += 61
+        breaker.allow("dead.org")
+        assert breaker.record_failure("dead.org")
+        assert not breaker.allow("dead.org")
+
+    def test_released_probe_lets_the_next_request_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, cooldown=60, clock=clock)
+        breaker.record_failure("dead.org")
+        clock.now += 61
+        assert breaker.allow("dead.org")
+        breaker.release_probe("dead.org")
+        assert breaker.state("dead.org") == HALF_OPEN
+        assert breaker.allow("dead.org")
+
+    def test_unanswered_probe_times_out(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, cooldown=60, probe_timeout=30, clock=clock)
+        breaker.record_failure("dead.org")
+        clock.now += 61
+        assert breaker.allow("dead.org")
+        clock.now += 29
+        assert not breaker.allow("dead.org")
+        clock.now += 2
+        assert breaker.allow("dead.org")
+
+
+class TestCircuitBreakerMiddleware:
+    def test_ignored_probe_is_released(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, cooldown=60, clock=clock)
+        stats = MemoryStatsCollector(SimpleNamespace(settings=Settings()))
+        middleware = CircuitBreakerMiddleware(breaker, stats)
+        spider = Spider("test")
+
+        first = Request("https://dead.org/staff")
+        middleware.process_request(first, spider)
+        middleware.process_exception(first, ConnectError(), spider)
+        clock.now += 61
+
+        probe = Request("https://dead.org/staff")
+        middleware.process_request(probe, spider)
+        with pytest.raises(IgnoreRequest):
+            middleware.process_request(Request("https://dead.org/coaches"), spider)
+
+        # A later middleware drops the probe before it is sent
+        middleware.process_exception(probe, IgnoreRequest("soft 404"), spider)
+        retry = Request("https://dead.org/coaches")
+        assert middleware.process_request(retry, spider) is None
+        middleware.process_response(retry, HtmlResponse(retry.url, body=b"", request=retry), spider)
+        assert breaker.state("dead.org") == CLOSED
+
+    @pytest.mark.filterwarnings("ignore::scrapy.exceptions.ScrapyDeprecationWarning")
+    def test_redirect_counts_as_success_in_project_order(self):
+        settings = Settings()
+        settings.setmodule("coach_crawler.scrapy_project.settings")
+        breaker = CircuitBreaker(threshold=2)
+        stats = MemoryStatsCollector(SimpleNamespace(settings=Settings()))
+        instances = {
+            RedirectMiddleware: RedirectMiddleware.from_crawler(get_crawler(Spider)),
+            CircuitBreakerMiddleware: CircuitBreakerMiddleware(breaker, stats),
+        }
+        chain = [instances[cls] for cls in map(load_object, build_component_list(settings.getwithbase("DOWNLOADER_MIDDLEWARES")))
+                 if cls in instances]
+        spider = Spider("test")
+
+        breaker.record_failure("flaky.org")
+        request = Request("https://flaky.org/staff")
+        for middleware in chain:
+            if hasattr(middleware, "process_request"):
+                middleware.process_request(request, spider)
+        result = HtmlResponse(request.url, status=301, headers={"Location": "/coaches"}, request=request)
+        # Responses travel back from the downloader in reverse order
+        for middleware in reversed(chain):
+            result = middleware.process_response(request, result, spider)
+            if isinstance(result, Request):
+                break
+        assert isinstance(result, Request)
+        # The earlier failure was cleared, so one more does not open the circuit
+        assert not breaker.record_failure("flaky.org")
@@ -0,0 +1,130 @@
+"""Test the shared per-domain politeness budget."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Spider
+from scrapy.http import Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.internet import defer, threads
+
+from coach_crawler.scrapy_project import middlewares
+from coach_crawler.scrapy_project.middlewares import SharedDomainBudgetMiddleware
+from coach_crawler.utils.domain_budget import LocalSlotStore, SharedDomainBudget, match_domain
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class RemoteStore(LocalSlotStore):
+    """LocalSlotStore that reports itself as blocking, like RedisSlotStore, and records the calling thread."""
+
+    blocking = True
+
+    def __init__(self, clock):
+        super().__init__(clock)
+        self.threads = []
+
+    def reserve(self, key, interval):
+        self.threads.append(threading.current_thread().name)
+        return super().reserve(key, interval)
+
+
+def run_in_thread(f, *args):
+    result = []
+    worker = threading.Thread(target=lambda: result.append(f(*args)), name="budget-worker")
+    worker.start()
+    worker.join()
+    return defer.succeed(result[0])
+
+
+class TestMatchDomain:
+    def test_exact_and_subdomain(self):
+        assert match_domain("ncaa.org", ["ncaa.org"]) == "ncaa.org"
+        assert match_domain("www.ncaa.org", ["ncaa.org"]) == "ncaa.org"
+
+    def test_no_partial_suffix_match(self):
+        assert match_domain("notncaa.org", ["ncaa.org"]) is None
+
+
+class TestSharedDomainBudget:
+    def test_first_request_does_not_wait(self, clock):
+        budget = SharedDomainBudget(LocalSlotStore(clock), default_delay=1.0, default_concurrency=1)
+        assert budget.reserve("https://school.edu/staff") == 0.0
+
+    def test_concurrent_jobs_split_budget(self, clock):
+        store = LocalSlotStore(clock)
+        # Two "processes" sharing one store
+        job_a = SharedDomainBudget(store, default_delay=1.0, default_concurrency=1)
+        job_b = SharedDomainBudget(store, default_delay=1.0, default_concurrency=1)
+        assert job_a.reserve("https://school.edu/a") == 0.0
+        assert job_b.reserve("https://school.edu/b") == pytest.approx(1.0)
+        assert job_a.reserve("https://school.edu/c") == pytest.approx(2.0)
+
+    def test_domains_are_independent(self, clock):
+        budget = SharedDomainBudget(LocalSlotStore(clock), default_delay=1.0, default_concurrency=1)
+        budget.reserve("https://a.edu/")
+        assert budget.reserve("https://b.edu/") == 0.0
+
+    def test_uses_domain_rate_limits(self, clock):
+        limits = {"maxpreps.com": {"delay": 5.0, "concurrent": 1}}
+        budget = SharedDomainBudget(LocalSlotStore(clock), rate_limits=limits)
+        assert budget.budget_key("https://www.maxpreps.com/tx/") == ("maxpreps.com", 5.0)
+        budget.reserve("https://www.maxpreps.com/tx/")
+        assert budget.reserve("https://maxpreps.com/ca/") == pytest.approx(5.0)
+
+    def test_slot_frees_up_as_time_passes(self, clock):
+        budget = SharedDomainBudget(LocalSlotStore(clock), default_delay=2.0, default_concurrency=2)
+        budget.reserve("https://school.edu/")
+        clock.now += 5
+        assert budget.reserve("https://school.edu/") == 0.0
+
+
+class TestOffReactor:
+    def test_local_store_reserves_inline(self, clock):
+        budget = SharedDomainBudget(LocalSlotStore(clock), default_delay=1.0, default_concurrency=1)
+        budget.reserve("https://school.edu/a")
+        d = budget.reserve_deferred("https://school.edu/b")
+        assert d.called and d.result == pytest.approx(1.0)
+
+    def test_remote_store_reserves_in_a_thread(self, clock, monkeypatch):
+        monkeypatch.setattr(threads, "deferToThread", run_in_thread)
+        store = RemoteStore(clock)
+        budget = SharedDomainBudget(store, default_delay=1.0, default_concurrency=1)
+        budget.reserve_deferred("https://school.edu/a")
+        d = budget.reserve_deferred("https://school.edu/b")
+        assert d.result == pytest.approx(1.0)
+        assert store.threads == ["budget-worker", "budget-worker"]
+
+    def test_middleware_waits_with_a_delay(self, clock, monkeypatch):
+        monkeypatch.setattr(threads, "deferToThread", run_in_thread)
+        waits = []
+
+        async def sleep(seconds):
+            waits.append(seconds)
+
+        monkeypatch.setattr(middlewares, "_sleep", sleep)
+        stats = MemoryStatsCollector(SimpleNamespace(settings=Settings()))
+        budget = SharedDomainBudget(RemoteStore(clock), default_delay=1.0, default_concurrency=1)
+        middleware = SharedDomainBudgetMiddleware(budget, stats)
+
+        async def scenario():
+            for path in ("a", "b"):
+                await middleware.process_request(Request(f"https://school.edu/{path}"), Spider("test"))
+
+        asyncio.run(scenario())
+        assert waits == [pytest.approx(1.0)]
+        assert stats.get_value("shared_budget/delayed") == 1
@@ -0,0 +1,90 @@
+"""Test the bulk domain liveness prefilter with a local stub resolver."""
+
+import asyncio
+import socket
+
+from coach_crawler.utils.liveness import LivenessChecker
+
+
+class StubResolver:
+    """Resolves only the hosts it was given; records every lookup."""
+
+    def __init__(self, live_hosts, delay=0.0):
+        self.live_hosts = set(live_hosts)
+        self.delay = delay
+        self.lookups = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, host):
+        self.lookups.append(host)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if host not in self.live_hosts:
+                raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", 0))]
+        finally:
+            self.in_flight -= 1
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestLivenessChecker:
+    def test_prune_keeps_only_live_hosts_in_order(self):
+        resolver = StubResolver({"www.allenisd.org", "www.allen.net"})
+        checker = LivenessChecker(resolver=resolver)
+        pruned = checker.prune([
+            ["https://www.allenisd.org", "https://www.allen.org", "https://www.allen.net"],
+            ["https://www.nowhere.org"],
+        ])
+        assert pruned == [["https://www.allenisd.org", "https://www.allen.net"], []]
+
+    def test_resolves_concurrently(self):
+        resolver = StubResolver(set(), delay=0.05)
+        checker = LivenessChecker(resolver=resolver, concurrency=10)
+        checker.check_hosts_sync([f"school{i}.org" for i in range(20)])
+        assert resolver.max_in_flight == 10
+
+    def test_duplicate_hosts_resolved_once(self):
+        resolver = StubResolver({"a.org"})
+        checker = LivenessChecker(resolver=resolver)
+        checker.prune([["https://a.org", "https://a.org/staff"], ["http://a.org"]])
+        assert resolver.lookups == ["a.org"]
+
+    def test_cache_respects_ttl(self):
+        clock = FakeClock()
+        resolver = StubResolver({"a.org"})
+        checker = LivenessChecker(resolver=resolver, ttl=60, clock=clock)
+        checker.check_hosts_sync(["a.org"])
+        checker.check_hosts_sync(["a.org"])
+        assert len(resolver.lookups) == 1
+        clock.now += 61
+        checker.check_hosts_sync(["a.org"])
+        assert len(resolver.lookups) == 2
+
+    def test_resolver_timeout_counts_as_dead(self):
+        resolver = StubResolver({"slow.org"}, delay=1.0)
+        checker = LivenessChecker(resolver=resolver, timeout=0.01)
+        assert checker.check_hosts_sync(["slow.org"]) == {"slow.org": False}
+
+    def test_tcp_check_against_local_server(self):
+        async def scenario():
+            server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            resolver = StubResolver({"127.0.0.1"})
+            checker = LivenessChecker(resolver=resolver, tcp_check=True, tcp_port=port)
+            try:
+                return await checker.check_hosts(["127.0.0.1"])
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        assert asyncio.run(scenario()) == {"127.0.0.1": True}
@@ -0,0 +1,107 @@
+"""Test the persistent negative-result cache."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from coach_crawler.models.base import Base
+from coach_crawler.models.negative_cache import NegativeCacheEntry
+from coach_crawler.utils.negative_cache import NegativeCache
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+class FakeNow:
+    def __init__(self):
+        self.value = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.value
+
+
+class TestNegativeCache:
+    def test_host_entry_blocks_every_url_on_host(self):
+        cache = NegativeCache()
+        cache.add_host("www.allenhs.org", "nxdomain")
+        assert cache.lookup("https://www.allenhs.org/staff") == "nxdomain"
+        assert cache.lookup("https://www.allen.org/staff") is None
+
+    def test_url_entry_blocks_only_that_path(self):
+        cache = NegativeCache()
+        cache.add_url("https://www.allen.org/coaches#top", "http_404")
+        assert cache.lookup("https://www.allen.org/coaches") == "http_404"
+        assert cache.lookup("https://www.allen.org/staff") is None
+
+    def test_entries_expire(self):
+        now = FakeNow()
+        cache = NegativeCache(ttls={"refused": timedelta(days=1)}, now=now)
+        cache.add_host("down.org", "refused")
+        now.value += timedelta(days=2)
+        assert cache.lookup("https://down.org/") is None
+
+    def test_round_trip_through_database(self, db_session):
+        now = FakeNow()
+        cache = NegativeCache(now=now)
+        cache.add_host("gone.org", "nxdomain")
+        cache.add_url("https://alive.org/board", "http_410")
+        assert cache.flush(db_session) == 2
+        assert cache.flush(db_session) == 0
+
+        fresh = NegativeCache(now=now)
+        assert fresh.load(db_session) == 2
+        assert fresh.lookup("https://gone.org/staff") == "nxdomain"
+        assert fresh.lookup("https://alive.org/board") == "http_410"
+
+    def test_flush_refreshes_existing_entry(self, db_session):
+        now = FakeNow()
+        cache = NegativeCache(now=now)
+        cache.add_url("https://a.org/staff", "http_404")
+        cache.flush(db_session)
+        now.value += timedelta(days=3)
+        cache.add_url("https://a.org/staff", "http_410")
+        cache.flush(db_session)
+        rows = db_session.query(NegativeCacheEntry).all()
+        assert len(rows) == 1
+        assert rows[0].kind == "http_410"
+
+    def test_failed_entry_does_not_lose_the_batch(self, db_session):
+        cache = NegativeCache(now=FakeNow())
+        cache.add_host("gone.org", "nxdomain")
+        cache.add_url("https://alive.org/board", "http_410")
+        # A row the database rejects (host is NOT NULL)
+        cache._pending["broken.org"] = (None, "nxdomain", FakeNow()() + timedelta(days=1))
+        assert cache.flush(db_session) == 2
+        assert cache.pending == 1
+        assert {row.key for row in db_session.query(NegativeCacheEntry)} == {"gone.org", "https://alive.org/board"}
+
+    def test_entries_kept_for_next_flush_when_database_fails(self, db_session, monkeypatch):
+        cache = NegativeCache(now=FakeNow())
+        cache.add_host("gone.org", "nxdomain")
+        commit = db_session.commit
+
+        def locked():
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(db_session, "commit", locked)
+        assert cache.flush(db_session) == 0
+        assert cache.pending == 1
+
+        monkeypatch.setattr(db_session, "commit", commit)
+        assert cache.flush(db_session) == 1
+        assert cache.pending == 0
+
+    def test_load_skips_expired(self, db_session):
+        now = FakeNow()
+        db_session.add(NegativeCacheEntry(key="old.org", host="old.org", kind="nxdomain",
+                                          expires_at=now.value - timedelta(days=1)))
+        db_session.commit()
+        assert NegativeCache(now=now).load(db_session) == 0
@@ -0,0 +1,140 @@
+"""Test static-first rendering decisions."""
+
+import gzip
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.misc import load_object
+
+from coach_crawler.scrapy_project.middlewares import RenderTierMiddleware
+from coach_crawler.utils.render_tier import (
+    REASON_EMPTY_SHELL,
+    REASON_SPA_MARKER,
+    TIER_RENDER,
+    TIER_STATIC,
+    RenderTierPolicy,
+    needs_js_render,
+)
+
+FILLER = b"<p>" + b"Athletics news, schedules, tickets and team rosters. " * 20 + b"</p>"
+STATIC_STAFF = b"<html><body><h1>Staff</h1>" + FILLER + b'<a href="mailto:coach@tamu.edu">Email</a></body></html>'
+APP_SHELL = b'<html><head><script src="/app.js"></script></head><body><div id="app"></div></body></html>'
+SPA_WITH_TEXT = b"<html><body ng-app='staff'><nav>" + FILLER + b"</nav><staff-list></staff-list></body></html>"
+PLAIN_PAGE = b"<html><body>" + FILLER + b"</body></html>"
+
+
+class TestNeedsJsRender:
+    def test_contacts_never_need_render(self):
+        assert needs_js_render(STATIC_STAFF) is None
+
+    def test_empty_app_shell(self):
+        assert needs_js_render(APP_SHELL) == REASON_EMPTY_SHELL
+
+    def test_spa_marker_without_contacts(self):
+        assert needs_js_render(SPA_WITH_TEXT) == REASON_SPA_MARKER
+
+    def test_plain_page_without_contacts_stays_static(self):
+        assert needs_js_render(PLAIN_PAGE) is None
+
+
+class TestRenderTierPolicy:
+    def test_host_switches_to_render_after_samples(self):
+        policy = RenderTierPolicy(min_samples=2)
+        policy.record("a.org", needed_render=True)
+        assert policy.tier("a.org") == TIER_STATIC
+        policy.record("a.org", needed_render=True)
+        assert policy.tier("a.org") == TIER_RENDER
+        assert policy.decisions() == {"a.org": TIER_RENDER}
+
+    def test_known_decision_until_enough_samples(self):
+        policy = RenderTierPolicy(min_samples=2, known={"a.org": TIER_RENDER})
+        assert policy.tier("a.org") == TIER_RENDER
+        assert policy.decisions() == {}
+
+
+@pytest.fixture
+def mw():
+    return RenderTierMiddleware(MemoryStatsCollector(SimpleNamespace(settings=Settings())), min_samples=1)
+
+
+def fetch(mw, url, body):
+    request = Request(url, meta={"playwright": True, "playwright_page_methods": ["wait"]})
+    mw.process_request(request, None)
+    return request, mw.process_response(request, HtmlResponse(url, body=body, request=request), None)
+
+
+class TestRenderTierMiddleware:
+    def test_static_page_is_not_rendered(self, mw):
+        request, result = fetch(mw, "https://www.tamu.edu/staff", STATIC_STAFF)
+        assert request.meta["playwright"] is False
+        assert isinstance(result, HtmlResponse)
+        assert mw.stats.get_value("render_tier/static_ok") == 1
+
+    def test_app_shell_escalates_with_page_methods(self, mw):
+        _, result = fetch(mw, "https://12thman.com/staff-directory", APP_SHELL)
+        assert isinstance(result, Request)
+        assert result.meta["playwright"] is True
+        assert result.meta["playwright_page_methods"] == ["wait"]
+        assert mw.stats.get_value("render_tier/escalated/empty_shell") == 1
+        # The escalated request goes straight through to Playwright
+        assert mw.process_request(result, None) is None and result.meta["playwright"] is True
+
+    def test_render_host_skips_static_fetch(self, mw):
+        fetch(mw, "https://12thman.com/staff-directory", APP_SHELL)
+        request = Request("https://12thman.com/coaches", meta={"playwright": True})
+        mw.process_request(request, None)
+        assert request.meta["playwright"] is True
+        assert mw.stats.get_value("render_tier/rendered_directly") == 1
+
+    def test_plain_requests_untouched(self, mw):
+        request = Request("https://www.tamu.edu/")
+        mw.process_request(request, None)
+        assert "render_tier" not in request.meta
+
+
+@pytest.mark.filterwarnings("ignore::scrapy.exceptions.ScrapyDeprecationWarning")
+class TestMiddlewareOrder:
+    """RenderTierMiddleware must classify the decoded body, not the gzipped one."""
+
+    @staticmethod
+    def project_chain():
+        from scrapy.downloadermiddlewares.httpcompression import HttpCompressionMiddleware
+        from scrapy.utils.conf import build_component_list
+
+        settings = Settings()
+        settings.setmodule("coach_crawler.scrapy_project.settings")
+        stats = MemoryStatsCollector(SimpleNamespace(settings=Settings()))
+        instances = {
+            HttpCompressionMiddleware: HttpCompressionMiddleware(stats),
+            RenderTierMiddleware: RenderTierMiddleware(stats, min_samples=1),
+        }
+        order = [
+            cls for cls in map(load_object, build_component_list(settings.getwithbase("DOWNLOADER_MIDDLEWARES")))
+            if cls in instances
+        ]
+        return [instances[cls] for cls in order]
+
+    def fetch_gzipped(self, url, body):
+        chain = self.project_chain()
+        request = Request(url, meta={"playwright": True})
+        for middleware in chain:
+            middleware.process_request(request, None)
+        response = HtmlResponse(url, body=gzip.compress(body), request=request,
+                                headers={"Content-Encoding": "gzip", "Content-Type": "text/html"})
+        # Responses travel back from the downloader in reverse order
+        for middleware in reversed(chain):
+            response = middleware.process_response(request, response, None)
+            if isinstance(response, Request):
+                break
+        return response
+
+    def test_gzipped_app_shell_escalates(self):
+        assert isinstance(self.fetch_gzipped("https://12thman.com/staff-directory", APP_SHELL), Request)
+
+    def test_gzipped_static_staff_page_is_not_rendered(self):
+        result = self.fetch_gzipped("https://www.tamu.edu/staff", STATIC_STAFF)
+        assert isinstance(result, HtmlResponse)
+        assert b"coach@tamu.edu" in result.body
@@ -0,0 +1,39 @@
+"""Test the per-school crawl budget."""
+
+from coach_crawler.utils.school_budget import (
+    STOP_BYTE_BUDGET,
+    STOP_ENOUGH_COACHES,
+    STOP_REQUEST_BUDGET,
+    SchoolBudget,
+)
+
+
+class TestSchoolBudget:
+    def test_request_budget(self):
+        budget = SchoolBudget(max_requests=2)
+        assert budget.admit(1) and budget.admit(1)
+        assert not budget.admit(1)
+        assert budget.stop_reason(1) == STOP_REQUEST_BUDGET
+        # Other schools are unaffected
+        assert budget.admit(2)
+
+    def test_byte_budget(self):
+        budget = SchoolBudget(max_bytes=1000)
+        assert not budget.record_bytes(1, 600)
+        assert budget.record_bytes(1, 600)
+        assert not budget.admit(1)
+        assert budget.stop_reason(1) == STOP_BYTE_BUDGET
+
+    def test_enough_high_confidence_coaches_on_one_page(self):
+        budget = SchoolBudget(enough_coaches=3, min_confidence=0.8)
+        assert not budget.record_page(1, [0.95, 0.95, 0.7, 0.7])
+        assert budget.record_page(1, [0.95, 0.8, 0.95])
+        assert not budget.admit(1)
+        assert budget.stop_reason(1) == STOP_ENOUGH_COACHES
+
+    def test_first_stop_reason_is_kept(self):
+        budget = SchoolBudget(max_requests=1, enough_coaches=1)
+        budget.admit(1)
+        budget.record_page(1, [0.95])
+        assert not budget.record_bytes(1, 10**9)
+        assert budget.stop_reasons() == {STOP_ENOUGH_COACHES: 1}
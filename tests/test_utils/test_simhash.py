@@ -0,0 +1,24 @@
+"""Test SimHash page fingerprints."""
+
+from coach_crawler.utils.simhash import hamming_distance, shingles, simhash
+
+HOME = ("Welcome to Allen High School home of the Eagles. Latest news, upcoming events, "
+        "bell schedule, lunch menu and enrollment information for families.")
+
+
+class TestSimhash:
+    def test_identical_text(self):
+        assert simhash(HOME) == simhash(HOME)
+
+    def test_near_duplicate_is_close(self):
+        # Same template with a rotating banner word changed
+        assert hamming_distance(simhash(HOME), simhash(HOME.replace("Latest", "Recent"))) <= 12
+
+    def test_different_pages_are_far(self):
+        staff = ("John Smith Head Football Coach jsmith@allenisd.org Jane Doe Assistant Coach "
+                 "Volleyball jdoe@allenisd.org Athletic Director Bob Jones bjones@allenisd.org")
+        assert hamming_distance(simhash(HOME), simhash(staff)) > 12
+
+    def test_empty(self):
+        assert simhash("") == 0
+        assert shingles("two words") == ["two words"]
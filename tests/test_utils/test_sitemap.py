@@ -0,0 +1,70 @@
+"""Test streaming sitemap parsing and sitemap URL scoring."""
+
+import gzip
+
+from coach_crawler.extractors import PageClassifier
+from coach_crawler.utils.sitemap import iter_sitemap, sitemaps_from_robots
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://www.allenisd.org/</loc></url>
+  <url><loc>https://www.allenisd.org/athletics/coaches</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc> https://www.allenisd.org/news/2024/game-recap </loc></url>
+</urlset>
+"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://www.allenisd.org/page-sitemap.xml</loc></sitemap>
+  <sitemap><loc>https://www.allenisd.org/post-sitemap.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+
+class TestIterSitemap:
+    def test_urlset(self):
+        assert list(iter_sitemap(URLSET)) == [
+            ("url", "https://www.allenisd.org/"),
+            ("url", "https://www.allenisd.org/athletics/coaches"),
+            ("url", "https://www.allenisd.org/news/2024/game-recap"),
+        ]
+
+    def test_sitemap_index(self):
+        assert [kind for kind, _ in iter_sitemap(INDEX)] == ["sitemap", "sitemap"]
+
+    def test_gzip(self):
+        assert len(list(iter_sitemap(gzip.compress(URLSET)))) == 3
+
+    def test_max_urls(self):
+        assert len(list(iter_sitemap(URLSET, max_urls=2))) == 2
+
+    def test_truncated_body_keeps_what_was_read(self):
+        entries = list(iter_sitemap(URLSET[:URLSET.index(b"<url><loc> https")]))
+        assert [loc for _, loc in entries][-1] == "https://www.allenisd.org/athletics/coaches"
+
+    def test_html_error_page(self):
+        assert list(iter_sitemap(b"<html><body>Not Found</body></html>")) == []
+
+
+class TestSitemapsFromRobots:
+    def test_sitemap_lines(self):
+        robots = "User-agent: *\nDisallow: /admin\nSitemap: https://a.org/sitemap.xml\nsitemap: https://a.org/s2.xml\n"
+        assert sitemaps_from_robots(robots) == ["https://a.org/sitemap.xml", "https://a.org/s2.xml"]
+
+    def test_no_sitemaps(self):
+        assert sitemaps_from_robots("User-agent: *\nDisallow:\n") == []
+
+
+class TestSitemapScoring:
+    def test_directory_beats_bio_page(self):
+        classifier = PageClassifier()
+        directory = classifier.score_sitemap_url("https://a.org/athletics/coaches")
+        bio = classifier.score_sitemap_url("https://a.org/staff/john-smith")
+        assert directory > bio > 0
+        assert classifier.score_sitemap_url("https://a.org/news/2024/game-recap") == 0
+
+    def test_rank_limits_and_orders(self):
+        ranked = PageClassifier().rank_sitemap_urls([
+            "https://a.org/staff/john-smith", "https://a.org/staff-directory", "https://a.org/events",
+        ], limit=1)
+        assert ranked == [{"url": "https://a.org/staff-directory", "score": 1.0}]
@@ -0,0 +1,21 @@
+"""Test URL normalization used for canonical dedup."""
+
+from coach_crawler.utils.url_utils import normalize_url, site_key
+
+
+class TestNormalizeUrl:
+    def test_host_case_www_and_default_port(self):
+        assert normalize_url("HTTPS://WWW.AllenISD.org:443/Athletics/") == "https://allenisd.org/Athletics"
+
+    def test_non_default_port_kept(self):
+        assert normalize_url("http://allenisd.org:8080/") == "http://allenisd.org:8080/"
+
+    def test_tracking_params_and_fragment_dropped(self):
+        url = "https://allenisd.org/staff?utm_source=fb&b=2&fbclid=abc&a=1#coaches"
+        assert normalize_url(url) == "https://allenisd.org/staff?a=1&b=2"
+
+    def test_missing_scheme(self):
+        assert normalize_url("allenisd.org") == "https://allenisd.org/"
+
+    def test_site_key_ignores_scheme(self):
+        assert site_key("http://www.allenisd.org/") == site_key("https://allenisd.org") == "allenisd.org/"